@@ -0,0 +1,193 @@
+"""
+Búsqueda anytime con ARA* (Anytime Repairing A*).
+
+Un epsilon fijo obliga a elegir de antemano entre velocidad y calidad.
+ARA* devuelve primero un camino con un peso alto (rápido) y, mientras
+quede tiempo, lo mejora bajando el peso hasta 1. Cada iteración reutiliza
+los g de la anterior: solo se vuelven a abrir los nodos cuyo g mejoró
+después de cerrarse (los "inconsistentes"), en lugar de empezar de cero.
+
+Con un presupuesto en milisegundos se obtiene el mejor camino encontrado
+dentro de ese tiempo, junto con su cota: costo <= epsilon * óptimo.
+
+Referencia: Likhachev, Gordon y Thrun, "ARA*: Anytime A* with Provable
+Bounds on Sub-Optimality" (NIPS 2003).
+"""
+
+import heapq
+import math
+import time
+
+from busqueda import COSTO_DIAGONAL, COSTO_RECTO, ResultadoBusqueda, como_mapa, costo_camino, reconstruir_camino
+
+# Peso de la primera iteración y cuánto baja en cada mejora
+EPSILON_INICIAL = 2.0
+DECREMENTO = 0.2
+
+# Cada cuántas expansiones se revisa el reloj
+REVISAR_CADA = 256
+
+
+class _TiempoAgotado(Exception):
+    pass
+
+
+def ara_estrella(mapa, inicio, fin, epsilon=EPSILON_INICIAL, observador=None, presupuesto_ms=None,
+                 decremento=DECREMENTO, heuristica=None):
+    """
+    Busca con pesos decrecientes y devuelve el mejor camino dentro del presupuesto.
+
+    Args:
+        mapa: Mapa (o cuadrícula que acepte como_mapa) con las paredes
+        inicio: Posición (fila, col) de partida
+        fin: Posición (fila, col) objetivo
+        epsilon: Peso de la primera iteración
+        observador: Igual que en a_estrella ('abierto' / 'cerrado')
+        presupuesto_ms: Tiempo máximo; None sigue hasta el óptimo (peso 1)
+        decremento: Cuánto baja el peso entre iteraciones
+        heuristica: Función opcional heuristica(id), como en a_estrella
+
+    Returns:
+        ResultadoBusqueda con el mejor camino encontrado. Las estadísticas
+        incluyen 'epsilon' (cota de suboptimalidad del camino devuelto),
+        'iteraciones', 'soluciones' (lista de (epsilon, costo, tiempo_ms)),
+        'tiempo_agotado' y, como a_estrella, 'expandidos', 'generados' y
+        'tiempo_ms'. Si el tiempo se acaba antes del primer camino,
+        encontrado es False.
+    """
+    t0 = time.perf_counter()
+    limite = None if presupuesto_ms is None else t0 + presupuesto_ms / 1000
+    mapa = como_mapa(mapa)
+    id_inicio = mapa.id(*inicio)
+    id_fin = mapa.id(*fin)
+    if heuristica is None:
+        cols = mapa.cols
+        fila_fin, col_fin = fin
+
+        def heuristica(id_nodo):
+            # Octile (misma fórmula que busqueda.h) sobre el id plano
+            fila, col = divmod(id_nodo, cols)
+            dx = abs(fila - fila_fin)
+            dy = abs(col - col_fin)
+            if dx < dy:
+                return COSTO_DIAGONAL * dx + COSTO_RECTO * (dy - dx)
+            return COSTO_DIAGONAL * dy + COSTO_RECTO * (dx - dy)
+
+    memoria = mapa.memoria()
+    generacion = memoria.nueva_busqueda()
+    g_score = memoria.g
+    padre = memoria.padre
+    marca = memoria.marca
+    g_score[id_inicio] = 0
+    padre[id_inicio] = id_inicio
+    marca[id_inicio] = generacion
+    sucesores = mapa.sucesores
+    vecindad = mapa.plano_vecindad
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    cuenta = 0
+    pasos = 0
+    abiertos = [(epsilon * heuristica(id_inicio), 0, id_inicio, 0)]  # (f, cuenta, id, g)
+    inconsistentes = set()
+    soluciones = []
+    mejor = None  # (camino, costo, epsilon)
+
+    def g_de(id_nodo):
+        return g_score[id_nodo] if marca[id_nodo] == generacion else math.inf
+
+    def mejorar_camino(epsilon, cerrados):
+        """Expande hasta que ningún abierto pueda mejorar el fin con este peso"""
+        nonlocal cuenta, pasos
+        while abiertos:
+            f, _, actual, g_actual = abiertos[0]
+            if g_actual != g_score[actual] or actual in cerrados:
+                heappop(abiertos)
+                continue  # Entrada obsoleta
+            if g_de(id_fin) <= f:
+                return
+            heappop(abiertos)
+            cerrados.add(actual)
+            pasos += 1
+            if limite is not None and pasos % REVISAR_CADA == 0 and time.perf_counter() > limite:
+                raise _TiempoAgotado
+            if observador is not None and actual != id_inicio:
+                observador('cerrado', mapa.pos(actual), g_actual, heuristica(actual))
+
+            for delta, costo_movimiento in sucesores[vecindad[actual]]:
+                vecino = actual + delta
+                nuevo_g = g_actual + costo_movimiento
+                if marca[vecino] != generacion or nuevo_g < g_score[vecino]:
+                    marca[vecino] = generacion
+                    g_score[vecino] = nuevo_g
+                    padre[vecino] = actual
+                    if vecino in cerrados:
+                        # Ya se expandió con este peso: se reabre en la próxima iteración
+                        inconsistentes.add(vecino)
+                    else:
+                        h_vecino = heuristica(vecino)
+                        cuenta += 1
+                        heappush(abiertos, (nuevo_g + epsilon * h_vecino, cuenta, vecino, nuevo_g))
+                        if observador is not None:
+                            observador('abierto', mapa.pos(vecino), nuevo_g, h_vecino)
+
+    def vigentes(cerrados):
+        """Ids de los abiertos válidos (sin entradas obsoletas ni repetidas)"""
+        return {id_nodo for _, _, id_nodo, g in abiertos
+                if g == g_score[id_nodo] and id_nodo not in cerrados}
+
+    tiempo_agotado = False
+    cerrados = set()
+    try:
+        while True:
+            mejorar_camino(epsilon, cerrados)
+            if g_de(id_fin) == math.inf:
+                break  # Sin camino: ningún peso menor lo va a encontrar
+
+            # El camino por padre puede pasar ya por nodos inconsistentes cuyo
+            # g bajó después, así que cuesta <= g(fin): se reporta lo que
+            # cuesta de verdad el camino que se devuelve
+            camino = [mapa.pos(n) for n in reconstruir_camino(padre, id_inicio, id_fin)]
+            costo = costo_camino(camino)
+
+            # Cota real: el costo no puede superar epsilon' veces el óptimo
+            pendientes = vigentes(cerrados) | inconsistentes
+            minimo = min((g_score[n] + heuristica(n) for n in pendientes), default=costo)
+            cota = min(epsilon, costo / minimo) if minimo > 0 else epsilon
+            cota = max(cota, 1)
+            if mejor is None or costo < mejor[1]:
+                mejor = (camino, costo, cota)
+            else:
+                mejor = (mejor[0], mejor[1], min(mejor[2], cota))
+            soluciones.append((cota, costo, (time.perf_counter() - t0) * 1000))
+            if cota <= 1 or epsilon <= 1:
+                break
+
+            # Siguiente iteración: peso menor (sin pasar de la cota ya
+            # garantizada), reabrir inconsistentes y reordenar
+            epsilon = max(1, round(min(epsilon - decremento, cota), 9))
+            cuenta += 1
+            abiertos[:] = [(g_score[n] + epsilon * heuristica(n), cuenta, n, g_score[n])
+                           for n in pendientes]
+            heapq.heapify(abiertos)
+            inconsistentes.clear()
+            cerrados = set()
+            if limite is not None and time.perf_counter() > limite:
+                raise _TiempoAgotado
+    except _TiempoAgotado:
+        tiempo_agotado = True
+
+    estadisticas = {
+        'expandidos': pasos,
+        'generados': cuenta,
+        'iteraciones': len(soluciones),
+        'soluciones': soluciones,
+        'tiempo_agotado': tiempo_agotado,
+        'tiempo_ms': (time.perf_counter() - t0) * 1000,
+    }
+    if mejor is None:
+        estadisticas['epsilon'] = None
+        return ResultadoBusqueda(False, [], 0, estadisticas)
+    camino, costo, cota = mejor
+    estadisticas['epsilon'] = cota
+    return ResultadoBusqueda(True, camino, costo, estadisticas)
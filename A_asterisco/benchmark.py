@@ -0,0 +1,214 @@
+"""
+Benchmark de las búsquedas sobre mapas y escenarios estándar.
+
+Para cada consulta mide nodos expandidos, tiempo de reloj, costo del
+camino contra una referencia y memoria pico, y guarda todo en JSON.
+
+La referencia es el óptimo del .scen cuando la consulta sale de uno (con
+diagonal sqrt(2) en lugar de COSTO_DIAGONAL, una diferencia de 0.015%) y
+si no A* con epsilon = 1. Theta* mide longitudes euclídeas, que pueden
+ser menores que el óptimo sobre la cuadrícula, así que se compara con
+Theta* con epsilon = 1. Comparar el JSON con el de una versión anterior detecta pérdidas
+de rendimiento antes de que lleguen a la interfaz.
+
+Uso:
+    python benchmark.py mapa.map --scen mapa.map.scen --salida actual.json
+    python benchmark.py "EJERCICIO DISTANCIA MANHATTAN 1.xlsx" --algoritmo jps
+    python benchmark.py mapa.map --aleatorias 200 --comparar anterior.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from busqueda import EPSILON, a_estrella
+from lotes import ALGORITMOS, consultas_aleatorias
+from mapas import cargar_map, cargar_scen, cargar_xlsx
+from theta import theta_estrella
+
+# Caída de rendimiento (fracción) a partir de la cual comparar() avisa
+TOLERANCIA = 0.10
+
+
+def cargar_consultas(ruta_mapa, ruta_scen=None, aleatorias=0, semilla=0):
+    """
+    Devuelve (mapa, consultas) con consultas como lista de (inicio, fin, optimo);
+    optimo es el costo óptimo del .scen, o None si la consulta no trae uno.
+
+    El .xlsx del ejercicio trae su propia consulta; para un .map se usan las
+    del .scen y/o consultas aleatorias entre celdas libres.
+    """
+    if ruta_mapa.endswith('.xlsx'):
+        mapa, inicio, fin = cargar_xlsx(ruta_mapa)
+        consultas = [(inicio, fin, None)]
+    else:
+        mapa = cargar_map(ruta_mapa)
+        consultas = []
+    if ruta_scen:
+        consultas += [(e.inicio, e.fin, e.optimo) for e in cargar_scen(ruta_scen)]
+    if aleatorias:
+        consultas += [(inicio, fin, None) for inicio, fin in consultas_aleatorias(mapa, aleatorias, semilla)]
+    return mapa, consultas
+
+
+def referencia(mapa, inicio, fin, algoritmo, optimo=None):
+    """
+    (costo, nombre) contra el que se mide el sobrecosto de una consulta:
+    el óptimo dado (del .scen) o una búsqueda con epsilon = 1
+    """
+    if algoritmo == 'theta':
+        return theta_estrella(mapa, inicio, fin, 1).costo, 'theta_estrella'
+    if optimo is not None:
+        return optimo, 'escenario'
+    return a_estrella(mapa, inicio, fin, 1).costo, 'a_estrella'
+
+
+def medir(mapa, consultas, algoritmo='a_estrella', epsilon=EPSILON, medir_memoria=True):
+    """
+    Ejecuta cada consulta y devuelve una lista de diccionarios con sus métricas.
+
+    consultas es una lista de (inicio, fin, optimo) como la de
+    cargar_consultas; con optimo None la referencia se calcula (ver referencia).
+
+    El tiempo se toma en una corrida sin tracemalloc (que hace todo más
+    lento); la memoria pico, en una segunda corrida de la misma consulta.
+    """
+    buscar = ALGORITMOS[algoritmo]
+    mapa.memoria()  # Los arreglos de trabajo se reservan una vez por mapa, no por consulta
+    filas = []
+    for inicio, fin, optimo in consultas:
+        t0 = time.perf_counter()
+        resultado = buscar(mapa, inicio, fin, epsilon)
+        tiempo_ms = (time.perf_counter() - t0) * 1000
+
+        optimo, metrica = referencia(mapa, inicio, fin, algoritmo, optimo)
+
+        memoria_kb = None
+        if medir_memoria:
+            tracemalloc.start()
+            buscar(mapa, inicio, fin, epsilon)
+            memoria_kb = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+
+        filas.append({
+            'inicio': list(inicio),
+            'fin': list(fin),
+            'encontrado': resultado.encontrado,
+            'costo': resultado.costo,
+            'optimo': optimo,
+            'referencia': metrica,
+            'sobrecosto': resultado.costo / optimo - 1 if optimo else 0.0,
+            'expandidos': resultado.estadisticas.get('expandidos', 0),
+            'tiempo_ms': tiempo_ms,
+            'memoria_kb': memoria_kb,
+        })
+    return filas
+
+
+def resumir(filas):
+    """Totales y promedios de una lista de mediciones"""
+    tiempo_s = sum(fila['tiempo_ms'] for fila in filas) / 1000
+    expandidos = sum(fila['expandidos'] for fila in filas)
+    encontradas = [fila for fila in filas if fila['encontrado']]
+    memorias = [fila['memoria_kb'] for fila in filas if fila['memoria_kb'] is not None]
+    return {
+        'consultas': len(filas),
+        'encontradas': len(encontradas),
+        'expandidos': expandidos,
+        'tiempo_s': tiempo_s,
+        'consultas_por_s': len(filas) / tiempo_s if tiempo_s else 0.0,
+        'expandidos_por_s': expandidos / tiempo_s if tiempo_s else 0.0,
+        'sobrecosto_medio': (sum(fila['sobrecosto'] for fila in encontradas) / len(encontradas)
+                             if encontradas else 0.0),
+        'sobrecosto_max': max((fila['sobrecosto'] for fila in encontradas), default=0.0),
+        'memoria_pico_kb': max(memorias, default=None),
+    }
+
+
+def _version():
+    """Commit actual del repositorio, si se puede averiguar"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(actual, anterior, tolerancia=TOLERANCIA):
+    """
+    Compara dos resúmenes y devuelve la lista de regresiones encontradas.
+
+    Avisa si bajan las expansiones por segundo o las consultas por segundo,
+    o si suben las expansiones o el sobrecosto, más allá de la tolerancia.
+    """
+    avisos = []
+    for clave in ('expandidos_por_s', 'consultas_por_s'):
+        if anterior[clave] and actual[clave] < anterior[clave] * (1 - tolerancia):
+            avisos.append(f"{clave}: {anterior[clave]:.0f} -> {actual[clave]:.0f}")
+    if anterior['expandidos'] and actual['expandidos'] > anterior['expandidos'] * (1 + tolerancia):
+        avisos.append(f"expandidos: {anterior['expandidos']} -> {actual['expandidos']}")
+    if actual['sobrecosto_medio'] > anterior['sobrecosto_medio'] + tolerancia / 10:
+        avisos.append(f"sobrecosto_medio: {anterior['sobrecosto_medio']:.4f} -> {actual['sobrecosto_medio']:.4f}")
+    return avisos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda de caminos")
+    parser.add_argument('mapa', help="Archivo .map o la hoja .xlsx del ejercicio")
+    parser.add_argument('--scen', help="Archivo .scen con las consultas")
+    parser.add_argument('--aleatorias', type=int, default=0, help="Consultas aleatorias adicionales")
+    parser.add_argument('--algoritmo', default='a_estrella', choices=sorted(ALGORITMOS))
+    parser.add_argument('--epsilon', type=float, default=EPSILON)
+    parser.add_argument('--sin-memoria', action='store_true', help="No medir memoria (más rápido)")
+    parser.add_argument('--salida', default='benchmark.json', help="JSON de resultados")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    mapa, consultas = cargar_consultas(args.mapa, args.scen, args.aleatorias)
+    if not consultas:
+        parser.error("No hay consultas: use --scen o --aleatorias")
+    epsilon = 1 if args.algoritmo == 'jps' else args.epsilon
+    print(f"📊 {len(consultas)} consultas sobre {args.mapa} ({mapa.filas}x{mapa.cols}) "
+          f"con {args.algoritmo}, epsilon={epsilon}")
+    if args.algoritmo == 'theta':
+        print("   (sobrecosto contra Theta* con epsilon = 1: longitudes euclídeas)")
+
+    filas = medir(mapa, consultas, args.algoritmo, epsilon, not args.sin_memoria)
+    resumen = resumir(filas)
+    resultado = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'version': _version(),
+        'python': platform.python_version(),
+        'mapa': os.path.basename(args.mapa),
+        'algoritmo': args.algoritmo,
+        'epsilon': epsilon,
+        'resumen': resumen,
+        'consultas': filas,
+    }
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(resultado, archivo, indent=2)
+
+    for clave, valor in resumen.items():
+        print(f"   {clave}: {round(valor, 4) if isinstance(valor, float) else valor}")
+    print(f"💾 Resultados guardados en: {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            anterior = json.load(archivo)['resumen']
+        avisos = comparar(resumen, anterior)
+        if avisos:
+            print("⚠️ Regresiones respecto a la corrida anterior:")
+            for aviso in avisos:
+                print(f"   - {aviso}")
+            sys.exit(1)
+        print("✅ Sin regresiones respecto a la corrida anterior")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+"""
+Núcleo de búsqueda A* independiente de pygame.
+
+Trabaja sobre un `Mapa`: un arreglo uint8 con el estado de cada celda,
+donde cada nodo se identifica con un id plano (fila * cols + col). No
+dibuja ni procesa eventos: la interfaz puede seguir el progreso
+registrando un observador, y los scripts sin ventana (pruebas, lotes,
+servicios) lo llaman directamente.
+"""
+
+import heapq
+import time
+from array import array
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Estados de celda en Mapa.celdas
+LIBRE = 0
+PARED = 1
+
+# Costos de movimiento: ortogonal y diagonal (aprox. raíz de 2)
+COSTO_RECTO = 1
+COSTO_DIAGONAL = 1.414
+
+# Peso de la heurística (Weighted A*): valores > 1 exploran menos nodos
+EPSILON = 1.2
+
+# Movimientos: arriba, abajo, izquierda, derecha, y 4 diagonales
+# Formato: (delta_fila, delta_col, costo)
+MOVIMIENTOS = [
+    (-1, 0, COSTO_RECTO),      # Arriba
+    (1, 0, COSTO_RECTO),       # Abajo
+    (0, -1, COSTO_RECTO),      # Izquierda
+    (0, 1, COSTO_RECTO),       # Derecha
+    (-1, -1, COSTO_DIAGONAL),  # Diagonal arriba-izquierda
+    (-1, 1, COSTO_DIAGONAL),   # Diagonal arriba-derecha
+    (1, -1, COSTO_DIAGONAL),   # Diagonal abajo-izquierda
+    (1, 1, COSTO_DIAGONAL),    # Diagonal abajo-derecha
+]
+
+
+def tabla_sucesores(cols):
+    """Para cada máscara de movimientos posible, los sucesores como (delta de id, costo)"""
+    return [
+        tuple((delta_f * cols + delta_c, costo)
+              for bit, (delta_f, delta_c, costo) in enumerate(MOVIMIENTOS)
+              if mascara >> bit & 1)
+        for mascara in range(256)
+    ]
+
+
+class Mapa:
+    """
+    Cuadrícula de ocupación compacta: un byte por celda (LIBRE / PARED).
+
+    Los nodos se identifican con ids planos (fila * cols + col), así la
+    búsqueda no necesita un objeto por celda.
+
+    Junto a las celdas se guarda `vecindad`: un byte por celda con un bit por
+    cada movimiento de MOVIMIENTOS que es válido desde ella. Se calcula una
+    vez al crear el mapa y poner_pared solo corrige las 9 celdas alrededor
+    de la que cambió, así que ninguna búsqueda tiene que preparar vecinos.
+    Las paredes deben cambiarse con poner_pared (o llamar a
+    recalcular_vecindad después de editar `celdas` directamente).
+
+    `celdas` y `vecindad` se usan sin copiar si ya son uint8 contiguos, de
+    modo que un mapa puede vivir en memoria compartida (ver lotes.py).
+
+    `version` aumenta con cada cambio de paredes; quien guarde resultados
+    (ver cache_caminos.py) la compara para saber si el mapa cambió.
+    """
+
+    def __init__(self, filas=0, cols=None, celdas=None, vecindad=None):
+        if celdas is None:
+            celdas = np.zeros((filas, filas if cols is None else cols), dtype=np.uint8)
+        self.celdas = np.ascontiguousarray(celdas, dtype=np.uint8)
+        self.filas, self.cols = self.celdas.shape
+        # Vista plana sin copia: indexar un memoryview es mucho más rápido
+        # que indexar el arreglo de numpy elemento por elemento
+        self.plano = memoryview(self.celdas).cast('B')
+        self.sucesores = tabla_sucesores(self.cols)
+        self.version = 0
+        if vecindad is None:
+            self.recalcular_vecindad()
+        else:
+            self.vecindad = np.ascontiguousarray(vecindad, dtype=np.uint8).reshape(self.filas, self.cols)
+            self.plano_vecindad = memoryview(self.vecindad).cast('B')
+        self._memorias = {}
+
+    def recalcular_vecindad(self):
+        """Calcula la máscara de movimientos válidos de todas las celdas"""
+        filas, cols = self.filas, self.cols
+        libre = np.pad(self.celdas != PARED, 1, constant_values=False)
+        vecindad = np.zeros((filas, cols), dtype=np.uint8)
+        for bit, (delta_f, delta_c, _) in enumerate(MOVIMIENTOS):
+            valido = libre[1 + delta_f:1 + delta_f + filas, 1 + delta_c:1 + delta_c + cols]
+            if delta_f != 0 and delta_c != 0:
+                # Diagonal: ambos lados adyacentes deben estar libres
+                valido = (valido
+                          & libre[1 + delta_f:1 + delta_f + filas, 1:1 + cols]
+                          & libre[1:1 + filas, 1 + delta_c:1 + delta_c + cols])
+            vecindad |= valido.astype(np.uint8) << bit
+        vecindad[self.celdas == PARED] = 0
+        self.vecindad = vecindad
+        self.plano_vecindad = memoryview(vecindad).cast('B')
+        self.version += 1
+
+    def _mascara(self, fila, col):
+        """Máscara de movimientos válidos de una sola celda"""
+        if self.celdas[fila, col] == PARED:
+            return 0
+        mascara = 0
+        for bit, (delta_f, delta_c, _) in enumerate(MOVIMIENTOS):
+            nueva_fila = fila + delta_f
+            nueva_col = col + delta_c
+            if not (0 <= nueva_fila < self.filas and 0 <= nueva_col < self.cols):
+                continue
+            if self.celdas[nueva_fila, nueva_col] == PARED:
+                continue
+            if delta_f != 0 and delta_c != 0:
+                if self.celdas[nueva_fila, col] == PARED or self.celdas[fila, nueva_col] == PARED:
+                    continue
+            mascara |= 1 << bit
+        return mascara
+
+    def memoria(self, indice=0):
+        """
+        Arreglos de trabajo de la búsqueda, reservados una sola vez por mapa.
+        Una búsqueda que necesita dos juegos a la vez (p. ej. la
+        bidireccional) pide el segundo con indice=1.
+        """
+        if indice not in self._memorias:
+            self._memorias[indice] = MemoriaBusqueda(self.filas * self.cols)
+        return self._memorias[indice]
+
+    def id(self, fila, col):
+        return fila * self.cols + col
+
+    def pos(self, id_nodo):
+        return divmod(id_nodo, self.cols)
+
+    def es_pared(self, fila, col):
+        return self.celdas[fila, col] == PARED
+
+    def poner_pared(self, fila, col, pared=True):
+        self.celdas[fila, col] = PARED if pared else LIBRE
+        self.version += 1
+        # Una pared solo afecta los movimientos de las celdas a su alrededor
+        for f in range(max(fila - 1, 0), min(fila + 2, self.filas)):
+            for c in range(max(col - 1, 0), min(col + 2, self.cols)):
+                self.vecindad[f, c] = self._mascara(f, c)
+
+
+class MemoriaBusqueda:
+    """
+    Arreglos g y padre indexados por id de nodo, reutilizables entre búsquedas.
+
+    En lugar de llenarlos con infinito antes de cada búsqueda, cada valor
+    lleva la marca de la generación que lo escribió: un valor con marca
+    vieja equivale a infinito. Así preparar una búsqueda cuesta O(1) y no
+    O(tamaño del mapa).
+    """
+
+    def __init__(self, n):
+        self.g = array('d', bytes(8 * n))
+        self.padre = array('q', bytes(8 * n))
+        self.marca = array('I', bytes(4 * n))
+        self.generacion = 0
+
+    def nueva_busqueda(self):
+        self.generacion += 1
+        return self.generacion
+
+
+def _mascaras_3x3():
+    """
+    Máscara de movimientos de la celda central para cada patrón de paredes
+    de 3x3 (bit fila * 3 + col, 1 = pared), con la misma regla de
+    diagonales que Mapa.recalcular_vecindad.
+    """
+    tabla = []
+    for patron in range(512):
+        def libre(delta_f, delta_c):
+            return not patron >> ((1 + delta_f) * 3 + 1 + delta_c) & 1
+        mascara = 0
+        if libre(0, 0):
+            for bit, (delta_f, delta_c, _) in enumerate(MOVIMIENTOS):
+                if libre(delta_f, delta_c) and (delta_f == 0 or delta_c == 0
+                                                or (libre(delta_f, 0) and libre(0, delta_c))):
+                    mascara |= 1 << bit
+        tabla.append(mascara)
+    return tabla
+
+
+MASCARAS_3X3 = _mascaras_3x3()
+
+
+class _PlanoBits:
+    """plano[id] -> PARED / LIBRE leyendo el bit de la celda"""
+
+    def __init__(self, mapa):
+        self.mapa = mapa
+
+    def __getitem__(self, id_nodo):
+        fila, col = divmod(id_nodo, self.mapa.cols)
+        return self.mapa.bit(fila, col)
+
+
+class _VecindadBits:
+    """vecindad[id] -> máscara de movimientos, calculada con los bits de las 3x3 celdas"""
+
+    def __init__(self, mapa):
+        self.mapa = mapa
+
+    def __getitem__(self, id_nodo):
+        bit = self.mapa.bit
+        fila, col = divmod(id_nodo, self.mapa.cols)
+        patron = 0
+        for i, f in enumerate((fila - 1, fila, fila + 1)):
+            patron |= (bit(f, col - 1) | bit(f, col) << 1 | bit(f, col + 1) << 2) << (3 * i)
+        return MASCARAS_3X3[patron]
+
+
+class MapaBits:
+    """
+    Mapa con un bit por celda (1 = pared), para cuadrículas enormes.
+
+    Cada fila se guarda empaquetada con np.packbits en `bits`, un arreglo
+    (filas, ceil(cols / 8)) que puede ser un np.memmap: el sistema operativo
+    trae del disco solo las páginas que la búsqueda toca, así que un mapa de
+    50000 x 50000 (312 MB de bits) se busca sin cargarlo entero (ver
+    mapas.abrir_bits).
+
+    Tiene lo que usan las búsquedas de Mapa (id, pos, sucesores, plano,
+    plano_vecindad, memoria), pero `plano` y `plano_vecindad` leen los bits
+    en el momento, sin arreglos por celda, y la memoria de búsqueda es
+    dispersa. Sirve para a_estrella, jps, theta_estrella, ara_estrella,
+    a_estrella_bidireccional y MapaJerarquico; lo que necesita arreglos
+    densos (landmarks, campo_flujo, lotes, la interfaz) necesita a_mapa().
+    """
+
+    def __init__(self, bits, cols):
+        self.bits = bits
+        self.filas, self.ancho = bits.shape  # ancho: bytes por fila
+        self.cols = cols
+        # Vista plana sin copia (los bits deben ser contiguos, como los de un memmap)
+        self._bytes = memoryview(bits).cast('B')
+        self.plano = _PlanoBits(self)
+        self.plano_vecindad = _VecindadBits(self)
+        self.sucesores = tabla_sucesores(cols)
+        self._memorias = {}
+        self.version = 0
+
+    @classmethod
+    def desde_mapa(cls, mapa):
+        mapa = como_mapa(mapa)
+        return cls(np.packbits(mapa.celdas != LIBRE, axis=1), mapa.cols)
+
+    def a_mapa(self):
+        """Mapa denso equivalente (un byte por celda): solo para mapas que entran en memoria"""
+        celdas = np.unpackbits(self.bits, axis=1, count=self.cols)
+        return Mapa(celdas=celdas)
+
+    def bit(self, fila, col):
+        """1 si (fila, col) es pared o está fuera del mapa"""
+        if fila < 0 or col < 0 or fila >= self.filas or col >= self.cols:
+            return PARED
+        return self._bytes[fila * self.ancho + (col >> 3)] >> (7 - (col & 7)) & 1
+
+    def memoria(self, indice=0):
+        if indice not in self._memorias:
+            self._memorias[indice] = MemoriaDispersa()
+        return self._memorias[indice]
+
+    def id(self, fila, col):
+        return fila * self.cols + col
+
+    def pos(self, id_nodo):
+        return divmod(id_nodo, self.cols)
+
+    def es_pared(self, fila, col):
+        return self.bit(fila, col) == PARED
+
+    def poner_pared(self, fila, col, pared=True):
+        """Cambia un bit (el arreglo, o el memmap, tiene que ser escribible)"""
+        byte = int(self.bits[fila, col >> 3])
+        mascara = 1 << (7 - (col & 7))
+        self.bits[fila, col >> 3] = byte | mascara if pared else byte & ~mascara & 0xFF
+        self.version += 1
+
+
+class _SinMarca(dict):
+    """Diccionario que devuelve 0 (ninguna generación) para los ids que no tiene"""
+
+    def __missing__(self, clave):
+        return 0
+
+
+class MemoriaDispersa:
+    """
+    Como MemoriaBusqueda pero en diccionarios: ocupa memoria solo por los
+    nodos que la búsqueda toca y no por celda del mapa. La usa MapaBits,
+    donde 20 bytes por celda no entrarían en RAM.
+    """
+
+    def __init__(self):
+        self.g = {}
+        self.padre = {}
+        self.marca = _SinMarca()
+        self.generacion = 0
+
+    def nueva_busqueda(self):
+        # Se vacía para no acumular los nodos de búsquedas anteriores
+        self.g.clear()
+        self.padre.clear()
+        self.marca.clear()
+        self.generacion += 1
+        return self.generacion
+
+
+def como_mapa(paredes):
+    """Acepta un Mapa, un MapaBits, un arreglo o una lista de listas (verdadero = pared)"""
+    if isinstance(paredes, (Mapa, MapaBits)):
+        return paredes
+    return Mapa(celdas=np.asarray(paredes, dtype=bool).astype(np.uint8))
+
+
+@dataclass
+class ResultadoBusqueda:
+    """Resultado de una búsqueda: camino de inicio a fin, costo y estadísticas"""
+    encontrado: bool
+    camino: list = field(default_factory=list)
+    costo: float = 0
+    estadisticas: dict = field(default_factory=dict)
+
+
+def h(p1, p2):
+    """Heurística Octile: óptima para movimiento en 8 direcciones"""
+    x1, y1 = p1
+    x2, y2 = p2
+    dx = abs(x1 - x2)
+    dy = abs(y1 - y2)
+    # Octile distance: combina movimientos diagonales y ortogonales
+    # D = 1 (costo ortogonal), D2 = 1.414 (costo diagonal)
+    return COSTO_DIAGONAL * min(dx, dy) + COSTO_RECTO * abs(dx - dy)
+
+
+def vecinos(mapa, id_nodo):
+    """
+    Devuelve los vecinos transitables de un nodo como (id, costo).
+    Las diagonales solo se permiten si ninguno de los dos lados adyacentes
+    es pared (no se atraviesan esquinas).
+    """
+    return [(id_nodo + delta, costo)
+            for delta, costo in mapa.sucesores[mapa.plano_vecindad[id_nodo]]]
+
+
+def reconstruir_camino(padre, id_inicio, actual):
+    """Sigue padre desde actual hasta el inicio y devuelve el camino en orden"""
+    camino = [actual]
+    while actual != id_inicio:
+        actual = padre[actual]
+        camino.append(actual)
+    camino.reverse()
+    return camino
+
+
+def costo_camino(camino):
+    """Costo de un camino celda por celda (lista de (fila, col)), sumado en orden"""
+    costo = 0
+    for (f1, c1), (f2, c2) in zip(camino, camino[1:]):
+        costo += COSTO_DIAGONAL if f1 != f2 and c1 != c2 else COSTO_RECTO
+    return costo
+
+
+def a_estrella(mapa, inicio, fin, epsilon=EPSILON, observador=None, heuristica=None):
+    """
+    Busca un camino de inicio a fin con Weighted A*.
+
+    Args:
+        mapa: Mapa (o cuadrícula que acepte como_mapa) con las paredes
+        inicio: Posición (fila, col) de partida
+        fin: Posición (fila, col) objetivo
+        epsilon: Peso de la heurística; 1 garantiza el camino óptimo
+        observador: Función opcional observador(evento, pos, g, h) que se
+            llama con evento 'abierto' al agregar un nodo a la frontera y
+            'cerrado' al expandirlo
+        heuristica: Función opcional heuristica(id) -> estimación al fin que
+            reemplaza a la octile (p. ej. Landmarks.heuristica(fin))
+
+    Returns:
+        ResultadoBusqueda con el camino (lista de posiciones), su costo y
+        las estadísticas 'expandidos', 'generados' y 'tiempo_ms'
+    """
+    t0 = time.perf_counter()
+    mapa = como_mapa(mapa)
+    cols = mapa.cols
+    id_inicio = mapa.id(*inicio)
+    id_fin = mapa.id(*fin)
+    fila_fin, col_fin = fin
+
+    memoria = mapa.memoria()
+    generacion = memoria.nueva_busqueda()
+    g_score = memoria.g
+    padre = memoria.padre
+    marca = memoria.marca
+    g_score[id_inicio] = 0
+    padre[id_inicio] = id_inicio
+    marca[id_inicio] = generacion
+    sucesores = mapa.sucesores
+    vecindad = mapa.plano_vecindad
+
+    # Montículo binario con borrado perezoso: (f, cuenta, id, g). Si el
+    # nodo mejora se agrega otra entrada y la vieja se descarta al salir.
+    cuenta = 0
+    h_inicio = h(inicio, fin) if heuristica is None else heuristica(id_inicio)
+    conjunto_abierto = [(epsilon * h_inicio, cuenta, id_inicio, 0)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    pasos = 0
+
+    while conjunto_abierto:
+        _, _, actual, g_actual = heappop(conjunto_abierto)
+        if g_actual != g_score[actual]:
+            continue  # Entrada obsoleta: el nodo ya salió con mejor costo
+
+        if actual == id_fin:
+            camino = [mapa.pos(n) for n in reconstruir_camino(padre, id_inicio, actual)]
+            return ResultadoBusqueda(True, camino, g_actual, {
+                'expandidos': pasos,
+                'generados': cuenta,
+                'tiempo_ms': (time.perf_counter() - t0) * 1000,
+            })
+
+        pasos += 1
+        if observador is not None and actual != id_inicio:
+            pos = mapa.pos(actual)
+            observador('cerrado', pos, g_actual, h(pos, fin) if heuristica is None else heuristica(actual))
+
+        # Sucesores generados al vuelo desde la máscara de la celda
+        for delta, costo_movimiento in sucesores[vecindad[actual]]:
+            vecino = actual + delta
+            temp_g_score = g_actual + costo_movimiento
+
+            if marca[vecino] != generacion or temp_g_score < g_score[vecino]:
+                marca[vecino] = generacion
+                g_score[vecino] = temp_g_score
+                padre[vecino] = actual
+                fila, col = divmod(vecino, cols)
+                if heuristica is not None:
+                    h_cost = heuristica(vecino)
+                else:
+                    # Heurística octile en línea (misma fórmula que h)
+                    dx = abs(fila - fila_fin)
+                    dy = abs(col - col_fin)
+                    if dx < dy:
+                        h_cost = COSTO_DIAGONAL * dx + COSTO_RECTO * (dy - dx)
+                    else:
+                        h_cost = COSTO_DIAGONAL * dy + COSTO_RECTO * (dx - dy)
+                cuenta += 1
+                heappush(conjunto_abierto, (temp_g_score + epsilon * h_cost, cuenta, vecino, temp_g_score))
+                if observador is not None:
+                    observador('abierto', (fila, col), temp_g_score, h_cost)
+
+    return ResultadoBusqueda(False, [], 0, {
+        'expandidos': pasos,
+        'generados': cuenta,
+        'tiempo_ms': (time.perf_counter() - t0) * 1000,
+    })
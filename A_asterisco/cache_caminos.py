@@ -0,0 +1,170 @@
+"""
+Caché de caminos delante de la búsqueda, con desalojo LRU.
+
+Las consultas interactivas y de servicios repiten muchas veces los mismos
+pares (inicio, fin) sobre un mapa que no cambió. La caché guarda los
+resultados por par, con un tamaño máximo: al llenarse descarta el usado
+hace más tiempo. Como el grafo es no dirigido, (fin, inicio) se responde
+con el camino guardado dado vuelta.
+
+Al editar paredes no se vacía todo:
+
+- Pared nueva: solo se descartan los caminos que pasan por esa celda o que
+  la tienen de costado en una diagonal (la diagonal ya no sería válida).
+  Las consultas sin camino siguen sin camino.
+- Pared quitada: un camino guardado de costo C sigue siendo válido (y
+  mantiene su cota epsilon) si pasar por la celda liberada no puede costar
+  menos de C / epsilon según la octile. Las consultas sin camino se
+  descartan, porque ahora puede haberlo.
+
+Los cambios tienen que pasar por la caché (poner_pared o
+paredes_cambiadas); si el mapa cambió por otro lado, la versión del mapa
+no coincide y la caché se vacía entera antes de responder.
+"""
+
+from collections import OrderedDict
+
+from busqueda import COSTO_DIAGONAL, COSTO_RECTO, EPSILON, ResultadoBusqueda, a_estrella, como_mapa, h
+
+# Tamaño máximo por defecto (pares inicio, fin)
+CAPACIDAD = 4096
+
+# Un camino nuevo puede usar la celda liberada solo como esquina de una
+# diagonal y no pasar por ella: la octile por la celda lo sobreestima en
+# hasta 2 * COSTO_RECTO - COSTO_DIAGONAL
+MARGEN_ESQUINA = 2 * COSTO_RECTO - COSTO_DIAGONAL
+
+
+class CacheCaminos:
+    """
+    Memoriza buscar(mapa, inicio, fin, epsilon) por par (inicio, fin).
+
+    buscar debe devolver caminos celda por celda (a_estrella, jps,
+    a_estrella_bidireccional, ara_estrella): la invalidación mira las celdas
+    del camino.
+
+    Uso:
+        cache = CacheCaminos(mapa, capacidad=1000)
+        resultado = cache.buscar((0, 0), (40, 70))
+        cache.poner_pared(12, 30)
+        cache.aciertos, cache.fallos
+    """
+
+    def __init__(self, mapa, capacidad=CAPACIDAD, buscar=a_estrella, epsilon=EPSILON):
+        self.mapa = como_mapa(mapa)
+        self.capacidad = capacidad
+        self.buscar_fn = buscar
+        self.epsilon = epsilon
+        self.version = self.mapa.version
+        self._resultados = OrderedDict()  # (inicio, fin) -> ResultadoBusqueda
+        self._por_celda = {}  # id de celda -> claves cuyo camino depende de ella
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidados = 0
+        self.desalojados = 0
+
+    def __len__(self):
+        return len(self._resultados)
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': self.aciertos / consultas if consultas else 0.0,
+            'invalidados': self.invalidados,
+            'desalojados': self.desalojados,
+            'tamano': len(self._resultados),
+        }
+
+    def vaciar(self):
+        self.invalidados += len(self._resultados)
+        self._resultados.clear()
+        self._por_celda.clear()
+        self.version = self.mapa.version
+
+    def _celdas_usadas(self, camino):
+        """Ids de las celdas del camino y de las esquinas de sus diagonales"""
+        mapa = self.mapa
+        usadas = {mapa.id(*pos) for pos in camino}
+        for (f1, c1), (f2, c2) in zip(camino, camino[1:]):
+            if f1 != f2 and c1 != c2:
+                usadas.add(mapa.id(f1, c2))
+                usadas.add(mapa.id(f2, c1))
+        return usadas
+
+    def _guardar(self, clave, resultado):
+        self._resultados[clave] = resultado
+        for id_celda in self._celdas_usadas(resultado.camino):
+            self._por_celda.setdefault(id_celda, set()).add(clave)
+        while len(self._resultados) > self.capacidad:
+            vieja, descartado = self._resultados.popitem(last=False)
+            self._olvidar(vieja, descartado)
+            self.desalojados += 1
+
+    def _olvidar(self, clave, resultado):
+        for id_celda in self._celdas_usadas(resultado.camino):
+            claves = self._por_celda.get(id_celda)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_celda[id_celda]
+
+    def _descartar(self, clave):
+        resultado = self._resultados.pop(clave, None)
+        if resultado is not None:
+            self._olvidar(clave, resultado)
+            self.invalidados += 1
+
+    def buscar(self, inicio, fin):
+        """Devuelve el ResultadoBusqueda de inicio a fin, de la caché si está"""
+        if self.mapa.version != self.version:
+            self.vaciar()  # El mapa cambió sin avisar: no se sabe qué celdas
+        inicio = tuple(inicio)
+        fin = tuple(fin)
+        clave = (inicio, fin)
+        resultado = self._resultados.get(clave)
+        if resultado is not None:
+            self._resultados.move_to_end(clave)
+            self.aciertos += 1
+            return resultado
+        inverso = self._resultados.get((fin, inicio))
+        if inverso is not None:
+            self._resultados.move_to_end((fin, inicio))
+            self.aciertos += 1
+            return ResultadoBusqueda(inverso.encontrado, inverso.camino[::-1], inverso.costo,
+                                     inverso.estadisticas)
+
+        self.fallos += 1
+        resultado = self.buscar_fn(self.mapa, inicio, fin, self.epsilon)
+        self._guardar(clave, resultado)
+        return resultado
+
+    def poner_pared(self, fila, col, pared=True):
+        """Cambia una celda del mapa y descarta solo lo que ese cambio afecta"""
+        self.mapa.poner_pared(fila, col, pared)
+        self.paredes_cambiadas([(fila, col)])
+
+    def paredes_cambiadas(self, celdas):
+        """
+        Avisa de celdas ya editadas en el mapa (su estado se lee del mapa).
+        Si el mapa cambió además por otro lado, se vacía la caché.
+        """
+        if self.mapa.version != self.version + len(celdas):
+            self.vaciar()
+            return
+        self.version = self.mapa.version
+        for fila, col in celdas:
+            if self.mapa.es_pared(fila, col):
+                # Pared nueva: caen los caminos que la usan
+                for clave in list(self._por_celda.get(self.mapa.id(fila, col), ())):
+                    self._descartar(clave)
+                continue
+            # Pared quitada: caen los que podrían mejorar pasando por ella
+            for clave, resultado in list(self._resultados.items()):
+                inicio, fin = clave
+                if not resultado.encontrado:
+                    self._descartar(clave)
+                elif (h(inicio, (fila, col)) + h((fila, col), fin) - MARGEN_ESQUINA
+                        < resultado.costo / self.epsilon):
+                    self._descartar(clave)
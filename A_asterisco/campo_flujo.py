@@ -0,0 +1,100 @@
+"""
+Campo de flujo hacia un fin común (Dijkstra inverso).
+
+Cuando muchos agentes van al mismo fin, en lugar de una búsqueda A* por
+agente se calcula una sola vez el costo de cada celda hasta el fin y, a
+partir de él, la dirección del siguiente paso en cada celda. Después cada
+agente avanza con una consulta O(1) a `direccion`.
+
+El Dijkstra corre en C (scipy.sparse.csgraph) sobre el grafo disperso de
+landmarks.grafo_disperso, con los mismos movimientos, costos y regla de
+diagonales que a_estrella; como el grafo es no dirigido, las distancias
+desde el fin son los costos hasta el fin. La dirección se elige con numpy
+sobre la cuadrícula completa, sin bucles por celda.
+
+Uso:
+    campo = CampoFlujo(mapa, fin)
+    campo.costo[fila, col]        # costo óptimo hasta el fin (inf si no llega)
+    campo.siguiente((fila, col))  # siguiente celda del camino, o None
+"""
+
+import math
+import time
+
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from busqueda import MOVIMIENTOS, ResultadoBusqueda, como_mapa
+from landmarks import grafo_disperso
+
+# Valor de `direccion` en el fin, en las paredes y en celdas sin camino
+SIN_DIRECCION = -1
+
+
+class CampoFlujo:
+    """
+    Costo hasta el fin y dirección del siguiente paso para todas las celdas.
+
+    `direccion[fila, col]` es un índice de MOVIMIENTOS (o SIN_DIRECCION).
+    El campo refleja el mapa al momento de crearlo: si cambian las paredes
+    hay que volver a calcularlo. Para varios fines sobre el mismo mapa se
+    puede pasar el `grafo` ya construido.
+    """
+
+    def __init__(self, mapa, fin, grafo=None):
+        t0 = time.perf_counter()
+        self.mapa = como_mapa(mapa)
+        self.fin = tuple(fin)
+        if grafo is None:
+            grafo = grafo_disperso(self.mapa)
+        filas, cols = self.mapa.filas, self.mapa.cols
+        self.costo = dijkstra(grafo, indices=self.mapa.id(*self.fin)).reshape(filas, cols)
+        self.direccion = self._calcular_direccion()
+        self._plano_direccion = memoryview(self.direccion).cast('B').cast('b')
+        self._deltas = [delta_f * cols + delta_c for delta_f, delta_c, _ in MOVIMIENTOS]
+        self.tiempo_ms = (time.perf_counter() - t0) * 1000
+
+    def _calcular_direccion(self):
+        """Para cada celda, el movimiento válido que minimiza costo del paso + costo del vecino"""
+        mapa = self.mapa
+        filas, cols = mapa.filas, mapa.cols
+        costo = np.pad(self.costo, 1, constant_values=math.inf)
+        mejor = np.full((filas, cols), math.inf)
+        direccion = np.full((filas, cols), SIN_DIRECCION, dtype=np.int8)
+        for bit, (delta_f, delta_c, costo_movimiento) in enumerate(MOVIMIENTOS):
+            valido = (mapa.vecindad >> bit) & 1 == 1
+            candidato = costo[1 + delta_f:1 + delta_f + filas, 1 + delta_c:1 + delta_c + cols] + costo_movimiento
+            mejora = valido & (candidato < mejor)
+            mejor[mejora] = candidato[mejora]
+            direccion[mejora] = bit
+        # El fin no se mueve y las celdas sin camino no tienen a dónde ir
+        direccion[~np.isfinite(self.costo)] = SIN_DIRECCION
+        direccion[self.fin] = SIN_DIRECCION
+        return direccion
+
+    def siguiente(self, pos):
+        """Siguiente celda desde pos hacia el fin, o None si ya llegó o no hay camino"""
+        fila, col = pos
+        bit = self._plano_direccion[fila * self.mapa.cols + col]
+        if bit == SIN_DIRECCION:
+            return None
+        delta_f, delta_c, _ = MOVIMIENTOS[bit]
+        return (fila + delta_f, col + delta_c)
+
+    def camino(self, inicio):
+        """Sigue las direcciones desde inicio; mismo resultado que las otras búsquedas"""
+        t0 = time.perf_counter()
+        mapa = self.mapa
+        id_actual = mapa.id(*inicio)
+        costo = float(self.costo[tuple(inicio)])
+        if costo == math.inf:
+            return ResultadoBusqueda(False, [], 0, {'tiempo_ms': (time.perf_counter() - t0) * 1000})
+        id_fin = mapa.id(*self.fin)
+        plano = self._plano_direccion
+        deltas = self._deltas
+        camino = [id_actual]
+        while id_actual != id_fin:
+            id_actual += deltas[plano[id_actual]]
+            camino.append(id_actual)
+        estadisticas = {'tiempo_ms': (time.perf_counter() - t0) * 1000}
+        return ResultadoBusqueda(True, [mapa.pos(n) for n in camino], costo, estadisticas)
@@ -0,0 +1,46 @@
+"""
+Ayudas compartidas por las pruebas de A_asterisco: cuadrículas al azar,
+consultas entre celdas libres y la comprobación de que un camino celda por
+celda respeta las reglas de movimiento de busqueda.
+"""
+
+import numpy as np
+
+from busqueda import COSTO_DIAGONAL, COSTO_RECTO
+
+
+def mapa_aleatorio(filas, cols, densidad, semilla):
+    """Celdas uint8 con una fracción `densidad` de paredes"""
+    rng = np.random.default_rng(semilla)
+    return (rng.random((filas, cols)) < densidad).astype(np.uint8)
+
+
+def celdas_libres(celdas, cantidad, semilla):
+    """Posiciones (fila, col) libres al azar, con repetición"""
+    rng = np.random.default_rng(semilla)
+    libres = [tuple(int(x) for x in p) for p in np.argwhere(celdas == 0)]
+    return [libres[i] for i in rng.integers(0, len(libres), cantidad)]
+
+
+def consultas(celdas, cantidad, semilla):
+    """Pares (inicio, fin) al azar entre celdas libres"""
+    posiciones = celdas_libres(celdas, 2 * cantidad, semilla)
+    return list(zip(posiciones[::2], posiciones[1::2]))
+
+
+def comprobar_legal(celdas, inicio, fin, camino):
+    """
+    Comprueba que el camino vaya de inicio a fin con movimientos válidos
+    (celdas libres, sin atravesar esquinas) y devuelve su costo
+    """
+    assert camino[0] == inicio and camino[-1] == fin
+    costo = 0
+    for a, b in zip(camino, camino[1:]):
+        assert max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1
+        assert celdas[b] == 0
+        if a[0] != b[0] and a[1] != b[1]:
+            assert celdas[a[0], b[1]] == 0 and celdas[b[0], a[1]] == 0
+            costo += COSTO_DIAGONAL
+        else:
+            costo += COSTO_RECTO
+    return costo
@@ -0,0 +1,407 @@
+"""
+Búsqueda jerárquica HPA* (Hierarchical Path-Finding A*) para mapas grandes.
+
+El mapa se divide en clusters cuadrados. En cada frontera entre dos
+clusters vecinos se colocan "entradas" (pares de celdas libres a ambos
+lados), en el medio de los tramos abiertos; los tramos que unen las mismas
+dos regiones conexas de los clusters comparten entradas separadas por
+`separacion` celdas, así que con paredes sueltas hay una o dos por
+frontera. Dentro de cada cluster se precalculan (con el Dijkstra en C de
+scipy) las distancias y los caminos entre sus entradas. Una consulta
+conecta el inicio y el fin a las entradas de su cluster (conexiones que se
+guardan para las consultas siguientes), busca en ese grafo abstracto
+(mucho más chico que el mapa) y, si se pide, arma el camino con los
+tramos guardados.
+
+El resultado es casi óptimo, no óptimo como A*: hay pocas entradas por
+frontera y los cruces entre clusters son solo ortogonales. Aun así encuentra
+camino siempre que lo hay: como no se cortan esquinas, una celda que sale de
+su cluster en diagonal también puede salir en recto por uno de los lados.
+
+Referencia: Botea, Müller y Schaeffer, "Near Optimal Hierarchical
+Path-Finding" (2004).
+"""
+
+import heapq
+import math
+import time
+from collections import OrderedDict
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+
+from busqueda import COSTO_RECTO, EPSILON, MOVIMIENTOS, PARED, Mapa, ResultadoBusqueda, como_mapa, h
+
+# Conexiones de inicio / fin a su cluster guardadas (por celda, LRU)
+CAPACIDAD_ENLACES = 1024
+
+
+class MapaJerarquico:
+    """
+    Abstracción por clusters de un Mapa, preprocesada una vez.
+
+    `separacion` es la distancia mínima, a lo largo de una frontera, entre
+    dos entradas que unen las mismas regiones (por defecto medio cluster):
+    más chica da caminos más cortos, pero un grafo abstracto más grande y
+    consultas más lentas.
+
+    Uso:
+        jerarquia = MapaJerarquico(mapa, tam_cluster=16)
+        resultado = jerarquia.buscar(inicio, fin)
+        mapa.poner_pared(40, 12)
+        jerarquia.actualizar([(40, 12)])   # rehace solo los clusters tocados
+    """
+
+    def __init__(self, mapa, tam_cluster=16, separacion=None, capacidad_enlaces=CAPACIDAD_ENLACES):
+        t0 = time.perf_counter()
+        self.mapa = como_mapa(mapa)
+        self.tam = tam_cluster
+        self.separacion = separacion if separacion is not None else max(1, tam_cluster // 2)
+        self.clusters_filas = -(-self.mapa.filas // tam_cluster)
+        self.clusters_cols = -(-self.mapa.cols // tam_cluster)
+        self.regiones = {}  # cluster -> región conexa de cada celda (por índice local)
+        self.entradas = {}  # frontera -> lista de pares (id_a, id_b)
+        self.inter = {}     # id -> {id vecino al otro lado: costo}
+        self.intra = {}     # cluster -> {id: {id: distancia dentro del cluster}}
+        self.tramos = {}    # (id, id) -> celdas del camino dentro del cluster, sin la primera
+        self.grafo = {}     # id -> {id: costo}: intra e inter juntas, para buscar
+        self.capacidad_enlaces = capacidad_enlaces
+        self._enlaces = OrderedDict()  # id -> (distancias, predecesores) dentro de su cluster
+
+        clusters = [(ci, cj) for ci in range(self.clusters_filas) for cj in range(self.clusters_cols)]
+        grafos = {}
+        for cluster in clusters:
+            grafos[cluster] = self._grafo_local(cluster)
+            self._calcular_regiones(cluster, grafos[cluster])
+        for ci, cj in clusters:
+            for frontera in (('h', ci, cj), ('v', ci, cj)):
+                self._calcular_frontera(frontera)
+        for cluster in clusters:
+            self._calcular_intra(cluster, grafos.pop(cluster))
+        self.tiempo_preproceso_ms = (time.perf_counter() - t0) * 1000
+
+    # --- Geometría de clusters ---
+
+    def cluster_de(self, id_nodo):
+        fila, col = divmod(id_nodo, self.mapa.cols)
+        return fila // self.tam, col // self.tam
+
+    def _limites(self, cluster):
+        """(fila_min, fila_max, col_min, col_max) del cluster, extremos excluidos al final"""
+        ci, cj = cluster
+        return (ci * self.tam, min((ci + 1) * self.tam, self.mapa.filas),
+                cj * self.tam, min((cj + 1) * self.tam, self.mapa.cols))
+
+    def _local(self, id_nodo):
+        """Índice de una celda dentro de su cluster: (fila - f0) * ancho + (col - c0)"""
+        fila, col = divmod(id_nodo, self.mapa.cols)
+        ancho = min(self.tam, self.mapa.cols - col // self.tam * self.tam)
+        return fila % self.tam * ancho + col % self.tam
+
+    def _ids(self, cluster):
+        """Id de cada celda del cluster, por índice local"""
+        f0, f1, c0, c1 = self._limites(cluster)
+        filas = np.arange(f0, f1, dtype=np.int64)[:, None]
+        return (filas * self.mapa.cols + np.arange(c0, c1, dtype=np.int64)).reshape(-1)
+
+    def _fronteras_de(self, cluster):
+        """Las (hasta) cuatro fronteras de un cluster"""
+        ci, cj = cluster
+        return [('h', ci, cj), ('h', ci - 1, cj), ('v', ci, cj), ('v', ci, cj - 1)]
+
+    # --- Preproceso ---
+
+    def _grafo_local(self, cluster):
+        """
+        El cluster como matriz dispersa (índices locales) con los movimientos
+        que no salen de él, para los Dijkstra y las regiones en C (scipy)
+        """
+        f0, f1, c0, c1 = self._limites(cluster)
+        alto, ancho = f1 - f0, c1 - c0
+        if isinstance(self.mapa, Mapa):
+            bits = self.mapa.vecindad[f0:f1, c0:c1].reshape(-1)
+        else:
+            # MapaBits no guarda las máscaras: se calculan celda por celda
+            vecindad = self.mapa.plano_vecindad
+            bits = np.array([vecindad[i] for i in self._ids(cluster).tolist()], dtype=np.uint8)
+        locales = np.arange(alto * ancho)
+        fila, col = np.divmod(locales, ancho)
+        origenes, destinos, costos = [], [], []
+        for bit, (delta_f, delta_c, costo) in enumerate(MOVIMIENTOS):
+            f, c = fila + delta_f, col + delta_c
+            validos = ((bits >> bit) & 1 == 1) & (f >= 0) & (f < alto) & (c >= 0) & (c < ancho)
+            origenes.append(locales[validos])
+            destinos.append((f * ancho + c)[validos])
+            costos.append(np.full(len(origenes[-1]), costo))
+        return csr_matrix((np.concatenate(costos), (np.concatenate(origenes), np.concatenate(destinos))),
+                          shape=(alto * ancho, alto * ancho))
+
+    def _calcular_regiones(self, cluster, grafo=None):
+        """Regiones conexas de celdas libres sin salir del cluster"""
+        if grafo is None:
+            grafo = self._grafo_local(cluster)
+        _, self.regiones[cluster] = connected_components(grafo, directed=False)
+
+    def _calcular_frontera(self, frontera):
+        """
+        Busca las entradas de una frontera: 'h' separa (ci, cj) de (ci+1, cj)
+        y 'v' separa (ci, cj) de (ci, cj+1).
+        """
+        tipo, ci, cj = frontera
+        mapa = self.mapa
+        cols = mapa.cols
+        plano = mapa.plano
+
+        # Quitar las entradas anteriores del grafo
+        for id_a, id_b in self.entradas.pop(frontera, []):
+            self.inter.get(id_a, {}).pop(id_b, None)
+            self.inter.get(id_b, {}).pop(id_a, None)
+
+        if ci < 0 or cj < 0:
+            return
+        f0, f1, c0, c1 = self._limites((ci, cj))
+        if tipo == 'h':
+            if ci + 1 >= self.clusters_filas:
+                return
+            pares = [((f1 - 1) * cols + c, f1 * cols + c) for c in range(c0, c1)]
+            otro = (ci + 1, cj)
+        else:
+            if cj + 1 >= self.clusters_cols:
+                return
+            pares = [(f * cols + c1 - 1, f * cols + c1) for f in range(f0, f1)]
+            otro = (ci, cj + 1)
+
+        # Tramos de pares con ambas celdas libres
+        tramos = []
+        tramo = []
+        for par in pares + [None]:
+            if par is not None and plano[par[0]] != PARED and plano[par[1]] != PARED:
+                tramo.append(par)
+            elif tramo:
+                tramos.append(tramo)
+                tramo = []
+
+        # Tramos que unen las mismas dos regiones son intercambiables (se
+        # llega de uno a otro sin salir de los clusters): de ellos se toma
+        # el medio de cada tramo, salteando los que quedan a menos de
+        # separacion celdas de la última entrada de esas regiones
+        region_a, region_b = self.regiones[(ci, cj)], self.regiones[otro]
+        ultima = {}  # (región a, región b) -> posición de su última entrada
+        entradas = []
+        for tramo in tramos:
+            clave = (region_a[self._local(tramo[0][0])], region_b[self._local(tramo[0][1])])
+            medio = tramo[0][0] + (tramo[-1][0] - tramo[0][0]) // 2
+            posicion = medio % cols if tipo == 'h' else medio // cols
+            if clave in ultima and posicion - ultima[clave] < self.separacion:
+                continue
+            ultima[clave] = posicion
+            entradas.append(tramo[len(tramo) // 2])
+
+        self.entradas[frontera] = entradas
+        for id_a, id_b in entradas:
+            self.inter.setdefault(id_a, {})[id_b] = COSTO_RECTO
+            self.inter.setdefault(id_b, {})[id_a] = COSTO_RECTO
+
+    def _nodos_de(self, cluster):
+        """Entradas (ids) que caen dentro del cluster"""
+        nodos = set()
+        for frontera in self._fronteras_de(cluster):
+            for par in self.entradas.get(frontera, []):
+                for id_nodo in par:
+                    if self.cluster_de(id_nodo) == cluster:
+                        nodos.add(id_nodo)
+        return sorted(nodos)
+
+    def _calcular_intra(self, cluster, grafo=None):
+        """Distancias y caminos entre todas las entradas de un cluster"""
+        nodos = self._nodos_de(cluster)
+        for id_nodo, salidas in self.intra.get(cluster, {}).items():
+            self.grafo.pop(id_nodo, None)
+            for otro in salidas:
+                self.tramos.pop((id_nodo, otro), None)
+
+        aristas = {id_nodo: {} for id_nodo in nodos}
+        if nodos:
+            if grafo is None:
+                grafo = self._grafo_local(cluster)
+            ids = self._ids(cluster)
+            locales = [self._local(n) for n in nodos]
+            distancias, predecesores = dijkstra(grafo, indices=locales, return_predecessors=True)
+            # El camino de b a a es el de a a b dado vuelta: solo pares a < b
+            for k, id_nodo in enumerate(nodos):
+                for otro, local in zip(nodos[k + 1:], locales[k + 1:]):
+                    distancia = distancias[k, local]
+                    if distancia == math.inf:
+                        continue  # Otra región del cluster
+                    aristas[id_nodo][otro] = aristas[otro][id_nodo] = float(distancia)
+                    tramo = _camino_hasta(predecesores[k], locales[k], local, ids)
+                    self.tramos[(id_nodo, otro)] = tramo
+                    self.tramos[(otro, id_nodo)] = ([id_nodo] + tramo[:-1])[::-1]
+        for id_nodo, salidas in aristas.items():
+            self.grafo[id_nodo] = {**salidas, **self.inter.get(id_nodo, {})}
+        self.intra[cluster] = aristas
+
+    def actualizar(self, cambios):
+        """
+        Rehace la abstracción alrededor de celdas cuyas paredes cambiaron.
+
+        Args:
+            cambios: Posiciones (fila, col) ya editadas en el mapa
+
+        Returns:
+            Cantidad de clusters recalculados
+        """
+        tocados = {self.cluster_de(self.mapa.id(*pos)) for pos in cambios}
+        for cluster in tocados:
+            self._calcular_regiones(cluster)
+        fronteras = {frontera for cluster in tocados for frontera in self._fronteras_de(cluster)}
+        for frontera in fronteras:
+            self._calcular_frontera(frontera)
+
+        # Los vecinos al otro lado de cada frontera también cambian de entradas
+        recalcular = set(tocados)
+        for tipo, ci, cj in fronteras:
+            recalcular.add((ci, cj))
+            recalcular.add((ci + 1, cj) if tipo == 'h' else (ci, cj + 1))
+        recalcular = {(ci, cj) for ci, cj in recalcular
+                      if 0 <= ci < self.clusters_filas and 0 <= cj < self.clusters_cols}
+        for cluster in recalcular:
+            self._calcular_intra(cluster)
+        for id_nodo in [n for n in self._enlaces if self.cluster_de(n) in recalcular]:
+            del self._enlaces[id_nodo]
+        return len(recalcular)
+
+    # --- Consultas ---
+
+    def _enlace(self, id_nodo):
+        """
+        (distancias, predecesores) de un Dijkstra desde id_nodo dentro de su
+        cluster, por índice local, guardado para las consultas siguientes
+        """
+        enlace = self._enlaces.get(id_nodo)
+        if enlace is not None:
+            self._enlaces.move_to_end(id_nodo)
+            return enlace
+        grafo = self._grafo_local(self.cluster_de(id_nodo))
+        enlace = dijkstra(grafo, indices=self._local(id_nodo), return_predecessors=True)
+        self._enlaces[id_nodo] = enlace
+        if len(self._enlaces) > self.capacidad_enlaces:
+            self._enlaces.popitem(last=False)
+        return enlace
+
+    def _conectar(self, id_nodo):
+        """Aristas temporales entre un nodo y las entradas de su cluster"""
+        distancias, _ = self._enlace(id_nodo)
+        conexiones = {}
+        for otro in self.intra[self.cluster_de(id_nodo)]:
+            distancia = distancias[self._local(otro)]
+            if otro != id_nodo and distancia != math.inf:
+                conexiones[otro] = float(distancia)
+        return conexiones
+
+    def _refinar(self, camino_abstracto):
+        """Convierte el camino abstracto en el camino celda por celda con los tramos guardados"""
+        id_inicio, id_fin = camino_abstracto[0], camino_abstracto[-1]
+        camino = [id_inicio]
+        for desde, hasta in zip(camino_abstracto, camino_abstracto[1:]):
+            if self.cluster_de(desde) != self.cluster_de(hasta):
+                camino.append(hasta)  # Cruce de frontera: celdas vecinas
+            elif (desde, hasta) in self.tramos:
+                camino.extend(self.tramos[desde, hasta])
+            elif desde == id_inicio:
+                ids = self._ids(self.cluster_de(desde))
+                camino.extend(_camino_hasta(self._enlace(id_inicio)[1], self._local(desde), self._local(hasta), ids))
+            else:
+                # Hacia el fin: los predecesores desde el fin apuntan hacia él
+                ids = self._ids(self.cluster_de(desde))
+                predecesores = self._enlace(id_fin)[1]
+                local, destino = self._local(desde), self._local(hasta)
+                while local != destino:
+                    local = predecesores[local]
+                    camino.append(int(ids[local]))
+        return camino
+
+    def buscar(self, inicio, fin, refinar=True, epsilon=EPSILON):
+        """
+        Busca un camino de inicio a fin sobre la abstracción.
+
+        Args:
+            inicio: Posición (fila, col) de partida
+            fin: Posición (fila, col) objetivo
+            refinar: Si es False, el camino solo contiene las entradas
+                (puntos de paso)
+            epsilon: Peso de la heurística en la búsqueda abstracta
+
+        Returns:
+            ResultadoBusqueda; las estadísticas incluyen 'camino_abstracto'
+        """
+        t0 = time.perf_counter()
+        mapa = self.mapa
+        id_inicio = mapa.id(*inicio)
+        id_fin = mapa.id(*fin)
+        estadisticas = {'expandidos': 0, 'camino_abstracto': []}
+        if mapa.plano[id_inicio] == PARED or mapa.plano[id_fin] == PARED:
+            estadisticas['tiempo_ms'] = (time.perf_counter() - t0) * 1000
+            return ResultadoBusqueda(False, [], 0, estadisticas)
+
+        # Aristas temporales del inicio y hacia el fin
+        extra = {id_inicio: self._conectar(id_inicio)}
+        if self.cluster_de(id_inicio) == self.cluster_de(id_fin):
+            distancia = self._enlace(id_inicio)[0][self._local(id_fin)]
+            if distancia != math.inf:
+                extra[id_inicio][id_fin] = float(distancia)
+        for otro, costo in self._conectar(id_fin).items():
+            extra.setdefault(otro, {})[id_fin] = costo
+
+        # A* sobre el grafo abstracto
+        grafo = self.grafo
+        cols = mapa.cols
+        fila_fin, col_fin = fin
+        sin_aristas = {}
+        g = {id_inicio: 0}
+        padre = {id_inicio: id_inicio}
+        abiertos = [(epsilon * h(inicio, fin), 0, id_inicio)]
+        expandidos = 0
+        while abiertos:
+            _, g_actual, actual = heapq.heappop(abiertos)
+            if g_actual != g[actual]:
+                continue  # Entrada obsoleta
+            if actual == id_fin:
+                break
+            expandidos += 1
+            for aristas in (grafo.get(actual, sin_aristas), extra.get(actual, sin_aristas)):
+                for vecino, costo in aristas.items():
+                    nuevo = g_actual + costo
+                    if nuevo < g.get(vecino, math.inf):
+                        g[vecino] = nuevo
+                        padre[vecino] = actual
+                        fila, col = divmod(vecino, cols)
+                        heapq.heappush(abiertos, (nuevo + epsilon * h((fila, col), (fila_fin, col_fin)), nuevo, vecino))
+        estadisticas['expandidos'] = expandidos
+
+        if id_fin not in g:
+            estadisticas['tiempo_ms'] = (time.perf_counter() - t0) * 1000
+            return ResultadoBusqueda(False, [], 0, estadisticas)
+
+        abstracto = [id_fin]
+        while abstracto[-1] != id_inicio:
+            abstracto.append(padre[abstracto[-1]])
+        abstracto.reverse()
+        estadisticas['camino_abstracto'] = [mapa.pos(n) for n in abstracto]
+        camino = self._refinar(abstracto) if refinar else abstracto
+        estadisticas['tiempo_ms'] = (time.perf_counter() - t0) * 1000
+        return ResultadoBusqueda(True, [mapa.pos(n) for n in camino], g[id_fin], estadisticas)
+
+
+def _camino_hasta(predecesores, origen, destino, ids):
+    """
+    Ids de las celdas de origen a destino (índices locales) siguiendo los
+    predecesores de scipy hacia atrás, sin el origen
+    """
+    tramo = []
+    while destino != origen:
+        tramo.append(int(ids[destino]))
+        destino = predecesores[destino]
+    tramo.reverse()
+    return tramo
@@ -0,0 +1,230 @@
+"""
+Jump Point Search (JPS) sobre el mismo Mapa y modelo de costos que a_estrella.
+
+En cuadrículas de costo uniforme con 8 direcciones, muchos caminos óptimos
+son simétricos; JPS los poda "saltando" en línea recta hasta encontrar un
+punto de salto (una celda con vecinos forzados o el objetivo), así solo
+entran al montículo esos puntos y no cada celda del corredor.
+
+Sigue las mismas reglas que busqueda.vecinos: una diagonal solo se permite
+si sus dos lados ortogonales están libres, por lo que nunca se atraviesan
+esquinas y el costo del camino es el mismo que el de A* con epsilon = 1.
+"""
+
+import heapq
+import time
+
+from busqueda import (COSTO_DIAGONAL, COSTO_RECTO, MOVIMIENTOS, PARED,
+                      ResultadoBusqueda, como_mapa, h, reconstruir_camino)
+
+
+def _octile(dx, dy):
+    """Distancia octile entre dos celdas a partir de |dx| y |dy|"""
+    if dx < dy:
+        return COSTO_DIAGONAL * dx + COSTO_RECTO * (dy - dx)
+    return COSTO_DIAGONAL * dy + COSTO_RECTO * (dx - dy)
+
+
+class _Saltador:
+    """Reglas de poda y salto de JPS sobre la vista plana de un Mapa"""
+
+    def __init__(self, mapa, fin):
+        self.plano = mapa.plano
+        self.filas = mapa.filas
+        self.cols = mapa.cols
+        self.fila_fin, self.col_fin = fin
+
+    def libre(self, fila, col):
+        return (0 <= fila < self.filas and 0 <= col < self.cols
+                and self.plano[fila * self.cols + col] != PARED)
+
+    def saltar_recto(self, fila, col, df, dc):
+        """Avanza en línea recta desde (fila, col); devuelve el punto de salto o None"""
+        libre = self.libre
+        while True:
+            fila += df
+            col += dc
+            if not libre(fila, col):
+                return None
+            if fila == self.fila_fin and col == self.col_fin:
+                return fila, col
+            if dc != 0:
+                # Horizontal: vecino forzado arriba o abajo si la celda
+                # detrás de él está bloqueada (no se pudo llegar en diagonal)
+                if (libre(fila - 1, col) and not libre(fila - 1, col - dc)) or \
+                   (libre(fila + 1, col) and not libre(fila + 1, col - dc)):
+                    return fila, col
+            else:
+                # Vertical: mismo criterio a izquierda y derecha
+                if (libre(fila, col - 1) and not libre(fila - df, col - 1)) or \
+                   (libre(fila, col + 1) and not libre(fila - df, col + 1)):
+                    return fila, col
+
+    def saltar(self, fila, col, df, dc):
+        """Salta desde (fila, col) en la dirección (df, dc); devuelve el punto de salto o None"""
+        if df == 0 or dc == 0:
+            return self.saltar_recto(fila, col, df, dc)
+        libre = self.libre
+        while True:
+            fila += df
+            col += dc
+            if not libre(fila, col):
+                return None
+            if fila == self.fila_fin and col == self.col_fin:
+                return fila, col
+            # En diagonal, la celda es punto de salto si alguno de sus dos
+            # saltos rectos encuentra algo
+            if self.saltar_recto(fila, col, df, 0) or self.saltar_recto(fila, col, 0, dc):
+                return fila, col
+            # Para seguir en diagonal ambos lados deben estar libres
+            if not (libre(fila + df, col) and libre(fila, col + dc)):
+                return None
+
+    def direcciones(self, fila, col, df, dc):
+        """Direcciones podadas al llegar a (fila, col) moviéndose en (df, dc)"""
+        libre = self.libre
+        resultado = []
+        if df != 0 and dc != 0:
+            vertical = libre(fila + df, col)
+            horizontal = libre(fila, col + dc)
+            if vertical:
+                resultado.append((df, 0))
+            if horizontal:
+                resultado.append((0, dc))
+            if vertical and horizontal:
+                resultado.append((df, dc))
+        elif dc != 0:
+            siguiente = libre(fila, col + dc)
+            abajo = libre(fila + 1, col)
+            arriba = libre(fila - 1, col)
+            if siguiente:
+                resultado.append((0, dc))
+                if abajo:
+                    resultado.append((1, dc))
+                if arriba:
+                    resultado.append((-1, dc))
+            if abajo:
+                resultado.append((1, 0))
+            if arriba:
+                resultado.append((-1, 0))
+        else:
+            siguiente = libre(fila + df, col)
+            derecha = libre(fila, col + 1)
+            izquierda = libre(fila, col - 1)
+            if siguiente:
+                resultado.append((df, 0))
+                if derecha:
+                    resultado.append((df, 1))
+                if izquierda:
+                    resultado.append((df, -1))
+            if derecha:
+                resultado.append((0, 1))
+            if izquierda:
+                resultado.append((0, -1))
+        return resultado
+
+
+def expandir_camino(puntos):
+    """Convierte una lista de puntos de salto en el camino celda por celda"""
+    if not puntos:
+        return []
+    camino = [puntos[0]]
+    for (f1, c1), (f2, c2) in zip(puntos, puntos[1:]):
+        df = (f2 > f1) - (f2 < f1)
+        dc = (c2 > c1) - (c2 < c1)
+        fila, col = f1, c1
+        while (fila, col) != (f2, c2):
+            fila += df
+            col += dc
+            camino.append((fila, col))
+    return camino
+
+
+def jps(mapa, inicio, fin, epsilon=1, observador=None):
+    """
+    Busca un camino de inicio a fin con Jump Point Search.
+
+    Args:
+        mapa: Mapa (o cuadrícula que acepte como_mapa) con las paredes
+        inicio: Posición (fila, col) de partida
+        fin: Posición (fila, col) objetivo
+        epsilon: Peso de la heurística; 1 garantiza el camino óptimo
+        observador: Igual que en a_estrella, pero solo recibe puntos de salto
+
+    Returns:
+        ResultadoBusqueda con el camino celda por celda; las estadísticas
+        incluyen además 'puntos_salto' (el camino comprimido)
+    """
+    t0 = time.perf_counter()
+    mapa = como_mapa(mapa)
+    cols = mapa.cols
+    saltador = _Saltador(mapa, fin)
+    id_inicio = mapa.id(*inicio)
+    id_fin = mapa.id(*fin)
+
+    memoria = mapa.memoria()
+    generacion = memoria.nueva_busqueda()
+    g_score = memoria.g
+    padre = memoria.padre
+    marca = memoria.marca
+    g_score[id_inicio] = 0
+    padre[id_inicio] = id_inicio
+    marca[id_inicio] = generacion
+
+    cuenta = 0
+    conjunto_abierto = [(epsilon * h(inicio, fin), cuenta, id_inicio, 0)]
+    pasos = 0
+
+    while conjunto_abierto:
+        _, _, actual, g_actual = heapq.heappop(conjunto_abierto)
+        if g_actual != g_score[actual]:
+            continue  # Entrada obsoleta
+
+        if actual == id_fin:
+            puntos = [mapa.pos(n) for n in reconstruir_camino(padre, id_inicio, actual)]
+            return ResultadoBusqueda(True, expandir_camino(puntos), g_actual, {
+                'expandidos': pasos,
+                'generados': cuenta,
+                'puntos_salto': puntos,
+                'tiempo_ms': (time.perf_counter() - t0) * 1000,
+            })
+
+        pasos += 1
+        fila, col = divmod(actual, cols)
+        if observador is not None and actual != id_inicio:
+            observador('cerrado', (fila, col), g_actual, h((fila, col), fin))
+
+        if actual == id_inicio:
+            # Sin padre: se consideran todos los movimientos válidos
+            libre = saltador.libre
+            direcciones = [(df, dc) for df, dc, _ in MOVIMIENTOS
+                           if df == 0 or dc == 0 or (libre(fila + df, col) and libre(fila, col + dc))]
+        else:
+            fila_padre, col_padre = divmod(padre[actual], cols)
+            df = (fila > fila_padre) - (fila < fila_padre)
+            dc = (col > col_padre) - (col < col_padre)
+            direcciones = saltador.direcciones(fila, col, df, dc)
+
+        for df, dc in direcciones:
+            punto = saltador.saltar(fila, col, df, dc)
+            if punto is None:
+                continue
+            vecino = punto[0] * cols + punto[1]
+            temp_g_score = g_actual + _octile(abs(punto[0] - fila), abs(punto[1] - col))
+
+            if marca[vecino] != generacion or temp_g_score < g_score[vecino]:
+                marca[vecino] = generacion
+                g_score[vecino] = temp_g_score
+                padre[vecino] = actual
+                h_cost = h(punto, fin)
+                cuenta += 1
+                heapq.heappush(conjunto_abierto, (temp_g_score + epsilon * h_cost, cuenta, vecino, temp_g_score))
+                if observador is not None:
+                    observador('abierto', punto, temp_g_score, h_cost)
+
+    return ResultadoBusqueda(False, [], 0, {
+        'expandidos': pasos,
+        'generados': cuenta,
+        'puntos_salto': [],
+        'tiempo_ms': (time.perf_counter() - t0) * 1000,
+    })
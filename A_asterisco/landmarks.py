@@ -0,0 +1,211 @@
+"""
+Heurística de landmarks (ALT: A*, Landmarks y desigualdad Triangular).
+
+La octile ignora las paredes y subestima mucho en mapas con obstáculos.
+Con K landmarks y la distancia real de cada uno a todas las celdas
+(un Dijkstra por landmark), la desigualdad triangular da una cota
+inferior mucho más ajustada:
+
+    h(v) = max_L |d(L, fin) - d(L, v)|
+
+Sigue siendo admisible, así que a_estrella con epsilon = 1 devuelve el
+mismo costo óptimo expandiendo menos nodos; con epsilon > 1 funciona
+igual que la octile ponderada.
+
+Las distancias se guardan en float32 (celdas x K) y se pueden persistir
+en un .npz junto con una firma del mapa para no recalcularlas. Los costos
+(1 y 1.414) son múltiplos de 0.001, así que mientras las distancias quepan
+en la precisión de float32 (hasta ~16000) se redondean de vuelta a
+milésimas exactas y la heurística queda consistente; en mapas con
+distancias mayores se resta un margen y queda solo admisible (A* puede
+reabrir algunos nodos).
+"""
+
+import hashlib
+import math
+import os
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from busqueda import COSTO_DIAGONAL, COSTO_RECTO, MOVIMIENTOS, PARED, como_mapa
+
+# Resolución de los costos: las distancias reales son múltiplos de 1/ESCALA
+ESCALA = 1000
+
+
+def grafo_disperso(mapa):
+    """Matriz dispersa (celdas x celdas) con los costos de movimiento del mapa"""
+    mapa = como_mapa(mapa)
+    n = mapa.filas * mapa.cols
+    ids = np.arange(n, dtype=np.int64)
+    vecindad = mapa.vecindad.reshape(-1)
+    # Una columna por movimiento; aplanar por filas deja las aristas de cada
+    # celda juntas, que es justo el orden CSR (sin ordenar como con COO)
+    validos = np.stack([(vecindad >> bit) & 1 == 1 for bit in range(len(MOVIMIENTOS))], axis=1)
+    destinos = np.stack([ids + delta_f * mapa.cols + delta_c for delta_f, delta_c, _ in MOVIMIENTOS], axis=1)
+    costos = np.broadcast_to(np.array([costo for _, _, costo in MOVIMIENTOS], dtype=np.float64), validos.shape)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(validos.sum(axis=1), out=indptr[1:])
+    return csr_matrix((costos[validos], destinos[validos], indptr), shape=(n, n))
+
+
+def firma_mapa(mapa):
+    """Identifica el contenido de un mapa para validar tablas guardadas"""
+    mapa = como_mapa(mapa)
+    contenido = hashlib.sha1(mapa.celdas.tobytes()).hexdigest()
+    return f"{mapa.filas}x{mapa.cols}:{contenido}"
+
+
+class Landmarks:
+    """
+    Tablas de distancias desde K landmarks y la heurística que sale de ellas.
+
+    Uso:
+        landmarks = Landmarks.cargar_o_calcular(mapa, 'mapa.landmarks.npz', k=8)
+        resultado = a_estrella(mapa, inicio, fin, 1, heuristica=landmarks.heuristica(fin))
+    """
+
+    def __init__(self, mapa, ids, distancias, firma=None):
+        self.mapa = como_mapa(mapa)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        # Guardadas como (celdas x K) para que las K distancias de una celda
+        # queden contiguas y se lean con un solo índice base
+        self.distancias = np.ascontiguousarray(distancias, dtype=np.float32)
+        self.firma = firma or firma_mapa(self.mapa)
+        self.k = len(self.ids)
+        self._tabla = memoryview(self.distancias).cast('B').cast('f')
+        finitas = self.distancias[np.isfinite(self.distancias)]
+        maxima = float(finitas.max()) if finitas.size else 0.0
+        # Una distancia en float32 se redondea de vuelta a la milésima exacta
+        # mientras media ulp no pase de 0.0005: por debajo de 2**14 la ulp es
+        # 2**-10 (media ulp ~0.00049); desde 2**14 media ulp ya es ~0.00098
+        self.exactas = maxima < 2 ** 14
+        # Si no, float32 redondea; restar este margen mantiene la cota admisible
+        self.margen = 0.0 if self.exactas else 2 * maxima * 2.0 ** -23
+
+    @classmethod
+    def calcular(cls, mapa, k=8, semilla=0):
+        """
+        Elige K landmarks lejanos entre sí y calcula sus distancias.
+
+        El primero es la celda más lejana a una celda libre al azar; cada
+        siguiente es la celda cuya distancia al landmark más cercano es
+        mayor (selección por punto más lejano).
+        """
+        mapa = como_mapa(mapa)
+        grafo = grafo_disperso(mapa)
+        libres = np.flatnonzero(mapa.celdas.reshape(-1) != PARED)
+        if libres.size == 0:
+            raise ValueError("El mapa no tiene celdas libres")
+        rng = np.random.default_rng(semilla)
+
+        def mas_lejana(distancia):
+            distancia = np.where(np.isfinite(distancia), distancia, -1)
+            return int(np.argmax(distancia))
+
+        inicial = dijkstra(grafo, indices=int(rng.choice(libres)))
+        ids = [mas_lejana(inicial)]
+        filas = [dijkstra(grafo, indices=ids[0])]
+        cercana = filas[0].copy()
+        while len(ids) < min(k, libres.size):
+            candidato = mas_lejana(np.where(mapa.celdas.reshape(-1) == PARED, -1, cercana))
+            if candidato in ids:
+                break
+            ids.append(candidato)
+            filas.append(dijkstra(grafo, indices=candidato))
+            cercana = np.minimum(cercana, filas[-1])
+        return cls(mapa, ids, np.stack(filas, axis=1).astype(np.float32))
+
+    @classmethod
+    def cargar(cls, ruta, mapa):
+        """Carga tablas guardadas; falla si fueron calculadas para otro mapa"""
+        mapa = como_mapa(mapa)
+        datos = np.load(ruta)
+        firma = str(datos['firma'])
+        if firma != firma_mapa(mapa):
+            raise ValueError(f"'{ruta}' corresponde a otro mapa")
+        return cls(mapa, datos['ids'], datos['distancias'], firma)
+
+    @classmethod
+    def cargar_o_calcular(cls, mapa, ruta, k=8):
+        """Reutiliza las tablas de disco si son de este mapa; si no, las calcula y guarda"""
+        if os.path.exists(ruta):
+            try:
+                landmarks = cls.cargar(ruta, mapa)
+                if landmarks.k >= k:
+                    return landmarks
+            except ValueError:
+                pass
+        landmarks = cls.calcular(mapa, k)
+        landmarks.guardar(ruta)
+        return landmarks
+
+    def guardar(self, ruta):
+        np.savez(ruta, ids=self.ids, distancias=self.distancias, firma=np.array(self.firma))
+
+    def heuristica(self, fin):
+        """
+        Devuelve heuristica(id) hacia fin para pasarla a a_estrella.
+        Toma el máximo entre la cota de landmarks y la octile.
+        """
+        mapa = self.mapa
+        cols = mapa.cols
+        k = self.k
+        tabla = self._tabla
+        margen = self.margen
+        fila_fin, col_fin = fin
+        base_fin = mapa.id(*fin) * k
+        hasta_fin = [tabla[base_fin + i] for i in range(k)]
+
+        if self.exactas:
+            # Todo en milésimas enteras: las diferencias no acumulan error y
+            # la heurística es consistente (A* no reabre nodos)
+            hasta_fin = [round(d * ESCALA) if math.isfinite(d) else d for d in hasta_fin]
+
+            def h_landmarks_exacta(id_nodo):
+                fila, col = divmod(id_nodo, cols)
+                dx = abs(fila - fila_fin)
+                dy = abs(col - col_fin)
+                if dx < dy:
+                    octile = COSTO_DIAGONAL * dx + COSTO_RECTO * (dy - dx)
+                else:
+                    octile = COSTO_DIAGONAL * dy + COSTO_RECTO * (dx - dy)
+                mejor = 0
+                base = id_nodo * k
+                for i in range(k):
+                    distancia = tabla[base + i]
+                    if distancia == math.inf:
+                        # Inalcanzable desde el landmark: solo sirve si el fin sí lo es
+                        if hasta_fin[i] != math.inf:
+                            return math.inf
+                        continue
+                    if hasta_fin[i] == math.inf:
+                        return math.inf
+                    cota = abs(hasta_fin[i] - round(distancia * ESCALA))
+                    if cota > mejor:
+                        mejor = cota
+                mejor /= ESCALA
+                return mejor if mejor > octile else octile
+
+            return h_landmarks_exacta
+
+        def h_landmarks(id_nodo):
+            fila, col = divmod(id_nodo, cols)
+            dx = abs(fila - fila_fin)
+            dy = abs(col - col_fin)
+            if dx < dy:
+                mejor = COSTO_DIAGONAL * dx + COSTO_RECTO * (dy - dx)
+            else:
+                mejor = COSTO_DIAGONAL * dy + COSTO_RECTO * (dx - dy)
+            base = id_nodo * k
+            for i in range(k):
+                # Con celdas inalcanzables desde el landmark queda inf o nan:
+                # inf es correcto (no hay camino) y nan no pasa la comparación
+                cota = abs(hasta_fin[i] - tabla[base + i]) - margen
+                if cota > mejor:
+                    mejor = cota
+            return mejor
+
+        return h_landmarks
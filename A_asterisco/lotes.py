@@ -0,0 +1,130 @@
+"""
+Búsqueda por lotes: muchas consultas (inicio, fin) sobre el mismo mapa.
+
+Las consultas se reparten entre un pool de procesos. El mapa no se envía
+con cada tarea: las celdas y las máscaras de vecindad se copian una sola
+vez a memoria compartida y cada proceso arma su Mapa encima de ese
+buffer, sin copiarlo ni recalcular nada. A cada proceso solo le llegan
+los índices y posiciones de sus consultas y devuelve los resultados.
+
+Uso:
+    resultados = buscar_lote(mapa, [((0, 0), (99, 99)), ((5, 3), (40, 70))])
+    resultados[0].camino, resultados[0].estadisticas['expandidos']
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from anytime import ara_estrella
+from bidireccional import a_estrella_bidireccional
+from busqueda import EPSILON, Mapa, a_estrella, como_mapa
+from jps import jps
+from theta import theta_estrella
+
+ALGORITMOS = {
+    'a_estrella': a_estrella,
+    'ara_estrella': ara_estrella,
+    'bidireccional': a_estrella_bidireccional,
+    'jps': jps,
+    'theta': theta_estrella,
+}
+
+# Estado de cada proceso del pool, preparado una vez por _iniciar_proceso
+_mapa_proceso = None
+_memoria_compartida = None
+
+
+def _iniciar_proceso(nombre, filas, cols):
+    """Arma el Mapa del proceso sobre el bloque de memoria compartida"""
+    global _mapa_proceso, _memoria_compartida
+    _memoria_compartida = shared_memory.SharedMemory(name=nombre)
+    buffer = np.ndarray((2, filas, cols), dtype=np.uint8, buffer=_memoria_compartida.buf)
+    # Solo lectura: un poner_pared aquí cambiaría el mapa de todos los procesos
+    buffer.flags.writeable = False
+    _mapa_proceso = Mapa(celdas=buffer[0], vecindad=buffer[1])
+
+
+def _resolver(mapa, consultas, algoritmo, epsilon):
+    buscar = ALGORITMOS[algoritmo]
+    return [(indice, buscar(mapa, inicio, fin, epsilon)) for indice, inicio, fin in consultas]
+
+
+def _resolver_bloque(consultas, algoritmo, epsilon):
+    return _resolver(_mapa_proceso, consultas, algoritmo, epsilon)
+
+
+def buscar_lote(mapa, consultas, procesos=None, algoritmo='a_estrella', epsilon=EPSILON, tam_bloque=None):
+    """
+    Resuelve todas las consultas y devuelve los resultados en el mismo orden.
+
+    Args:
+        mapa: Mapa (o arreglo / lista de listas, verdadero = pared)
+        consultas: Lista de pares (inicio, fin) con posiciones (fila, col)
+        procesos: Cantidad de procesos (por defecto, uno por núcleo). Con 1
+            se resuelve en el proceso actual, sin pool
+        algoritmo: Nombre en ALGORITMOS ('a_estrella', 'ara_estrella', 'bidireccional', 'jps', 'theta')
+        epsilon: Peso de la heurística (el inicial en ARA*)
+        tam_bloque: Consultas por tarea; por defecto unas 4 tareas por
+            proceso para repartir bien consultas de distinto costo
+
+    Returns:
+        Lista de ResultadoBusqueda, uno por consulta
+    """
+    if algoritmo not in ALGORITMOS:
+        raise ValueError(f"Algoritmo desconocido: '{algoritmo}'")
+    mapa = como_mapa(mapa)
+    consultas = [(indice, tuple(inicio), tuple(fin)) for indice, (inicio, fin) in enumerate(consultas)]
+    procesos = procesos or os.cpu_count() or 1
+    procesos = min(procesos, len(consultas))
+    if procesos <= 1:
+        return [resultado for _, resultado in _resolver(mapa, consultas, algoritmo, epsilon)]
+
+    tam_bloque = tam_bloque or math.ceil(len(consultas) / (procesos * 4))
+    bloques = [consultas[i:i + tam_bloque] for i in range(0, len(consultas), tam_bloque)]
+
+    memoria = shared_memory.SharedMemory(create=True, size=2 * mapa.filas * mapa.cols)
+    try:
+        buffer = np.ndarray((2, mapa.filas, mapa.cols), dtype=np.uint8, buffer=memoria.buf)
+        buffer[0] = mapa.celdas
+        buffer[1] = mapa.vecindad
+        del buffer
+        resultados = [None] * len(consultas)
+        with ProcessPoolExecutor(procesos, initializer=_iniciar_proceso,
+                                 initargs=(memoria.name, mapa.filas, mapa.cols)) as pool:
+            for parcial in pool.map(_resolver_bloque, bloques,
+                                    [algoritmo] * len(bloques), [epsilon] * len(bloques)):
+                for indice, resultado in parcial:
+                    resultados[indice] = resultado
+        return resultados
+    finally:
+        memoria.close()
+        memoria.unlink()
+
+
+def consultas_aleatorias(mapa, cantidad, semilla=0):
+    """Pares (inicio, fin) al azar entre celdas libres, para pruebas de carga"""
+    mapa = como_mapa(mapa)
+    libres = np.flatnonzero(mapa.vecindad.reshape(-1))  # libres y con algún movimiento
+    rng = np.random.default_rng(semilla)
+    pares = rng.choice(libres, size=(cantidad, 2))
+    return [(mapa.pos(int(a)), mapa.pos(int(b))) for a, b in pares]
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    mapa = Mapa(celdas=(rng.random((500, 500)) < 0.25).astype(np.uint8))
+    consultas = consultas_aleatorias(mapa, 400)
+    base = None
+    for procesos in sorted({1, 2, os.cpu_count() or 1}):
+        t0 = time.perf_counter()
+        resultados = buscar_lote(mapa, consultas, procesos)
+        segundos = time.perf_counter() - t0
+        base = base or segundos
+        encontrados = sum(r.encontrado for r in resultados)
+        print(f"{procesos} procesos: {len(consultas) / segundos:.0f} consultas/s "
+              f"(x{base / segundos:.2f}), {encontrados} encontradas")
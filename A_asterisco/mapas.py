@@ -0,0 +1,286 @@
+"""
+Carga de mapas y escenarios desde archivo.
+
+Formatos:
+    .map / .scen  Formato de los benchmarks de grids (movingai.com): el
+                  .map es un bloque de caracteres ('.', 'G', 'S' libres; el
+                  resto pared) y el .scen lista consultas con su costo
+                  óptimo calculado con diagonales de raíz de 2.
+    .xlsx         La hoja del ejercicio 'EJERCICIO DISTANCIA MANHATTAN 1':
+                  una cuadrícula de celdas numeradas donde el relleno gris
+                  marca paredes, el amarillo el inicio y el otro color el fin.
+
+Mapas grandes (devuelven un MapaBits, un bit por celda):
+    .txt / ASCII  Una fila por línea; '.', 'G', 'S', ' ' y '0' son libres.
+    .png          Imagen de ocupación: los píxeles oscuros son pared.
+    .npy          Arreglo 2D; distinto de cero es pared.
+    .bits         Formato propio: encabezado + filas empaquetadas, que se
+                  abre con np.memmap sin leer el archivo (abrir_bits).
+
+Los cargadores de mapas grandes convierten de a bloques de filas; con
+`destino` escriben directamente un .bits en disco y devuelven el mapa
+abierto sobre él, así que nunca tienen el mapa entero en memoria (salvo el
+PNG, que Pillow decodifica completo).
+"""
+
+import os
+from dataclasses import dataclass
+
+import numpy as np
+
+from busqueda import Mapa, MapaBits
+
+# Caracteres transitables en los .map (el resto, p. ej. '@', 'O', 'T', 'W', es pared)
+TRANSITABLES = '.GS'
+
+# Caracteres libres en los mapas ASCII genéricos
+LIBRES_ASCII = '.GS 0'
+
+# Relleno del inicio en la hoja del ejercicio
+AMARILLO_XLSX = 'FFFFFF00'
+
+# Píxeles con gris por debajo de este valor son pared en los PNG
+UMBRAL_PNG = 128
+
+# Encabezado de los .bits: firma, filas y columnas (uint64 little-endian)
+FIRMA_BITS = b'MAPABITS'
+TAM_ENCABEZADO = len(FIRMA_BITS) + 16
+
+# Filas que se convierten por vez al cargar mapas grandes
+FILAS_POR_BLOQUE = 1024
+
+
+@dataclass
+class Escenario:
+    """Una consulta de un archivo .scen; las posiciones son (fila, col)"""
+    mapa: str
+    inicio: tuple
+    fin: tuple
+    optimo: float
+    grupo: int = 0
+
+
+def cargar_map(ruta):
+    """Lee un .map (type / height / width / map + filas) y devuelve un Mapa"""
+    with open(ruta, encoding='utf-8') as archivo:
+        lineas = archivo.read().splitlines()
+    encabezado = {}
+    inicio = None
+    for i, linea in enumerate(lineas):
+        if linea.strip() == 'map':
+            inicio = i + 1
+            break
+        partes = linea.split()
+        if len(partes) == 2:
+            encabezado[partes[0]] = partes[1]
+    if inicio is None:
+        raise ValueError(f"'{ruta}' no tiene la línea 'map'")
+    filas, cols = int(encabezado['height']), int(encabezado['width'])
+    texto = lineas[inicio:inicio + filas]
+    if len(texto) != filas or any(len(linea) < cols for linea in texto):
+        raise ValueError(f"'{ruta}' no tiene {filas} filas de {cols} columnas")
+    caracteres = np.frombuffer(''.join(linea[:cols] for linea in texto).encode('ascii'), dtype=np.uint8)
+    libres = np.isin(caracteres, np.frombuffer(TRANSITABLES.encode('ascii'), dtype=np.uint8))
+    return Mapa(celdas=(~libres).astype(np.uint8).reshape(filas, cols))
+
+
+def cargar_scen(ruta):
+    """Lee un .scen (version 1) y devuelve la lista de Escenario"""
+    escenarios = []
+    with open(ruta, encoding='utf-8') as archivo:
+        for linea in archivo:
+            partes = linea.split()
+            if len(partes) != 9 or partes[0] == 'version':
+                continue
+            grupo, mapa = int(partes[0]), partes[1]
+            # En el .scen las posiciones vienen como x (columna), y (fila)
+            x_inicio, y_inicio, x_fin, y_fin = map(int, partes[4:8])
+            escenarios.append(Escenario(mapa, (y_inicio, x_inicio), (y_fin, x_fin), float(partes[8]), grupo))
+    return escenarios
+
+
+def _color_relleno(celda):
+    relleno = celda.fill
+    if relleno is None or relleno.fill_type is None:
+        return None
+    color = relleno.fgColor
+    if color.type == 'theme':
+        return ('tema', color.theme, round(color.tint, 3))
+    return color.rgb
+
+
+def cargar_xlsx(ruta):
+    """
+    Lee la cuadrícula numerada de la hoja del ejercicio.
+
+    Returns:
+        (Mapa, inicio, fin) con inicio/fin como (fila, col)
+    """
+    import openpyxl
+
+    hoja = openpyxl.load_workbook(ruta).active
+    # La cuadrícula es el bloque de celdas con números enteros
+    numeradas = [celda for fila in hoja.iter_rows() for celda in fila
+                 if isinstance(celda.value, int) and not isinstance(celda.value, bool)]
+    if not numeradas:
+        raise ValueError(f"'{ruta}' no tiene una cuadrícula numerada")
+    fila_0 = min(celda.row for celda in numeradas)
+    col_0 = min(celda.column for celda in numeradas)
+    filas = max(celda.row for celda in numeradas) - fila_0 + 1
+    cols = max(celda.column for celda in numeradas) - col_0 + 1
+
+    colores = {}
+    for celda in numeradas:
+        color = _color_relleno(celda)
+        if color is not None:
+            colores[(celda.row - fila_0, celda.column - col_0)] = color
+    inicios = [pos for pos, color in colores.items() if color == AMARILLO_XLSX]
+    if len(inicios) != 1:
+        raise ValueError(f"'{ruta}' debe tener una sola celda amarilla (inicio)")
+    # Las paredes son el color más repetido; el fin es la celda de otro color
+    otros = [color for color in colores.values() if color != AMARILLO_XLSX]
+    color_pared = max(set(otros), key=otros.count)
+    fines = [pos for pos, color in colores.items() if color not in (AMARILLO_XLSX, color_pared)]
+    if len(fines) != 1:
+        raise ValueError(f"'{ruta}' debe tener una sola celda de fin")
+
+    celdas = np.zeros((filas, cols), dtype=np.uint8)
+    for (fila, col), color in colores.items():
+        if color == color_pared:
+            celdas[fila, col] = 1
+    return Mapa(celdas=celdas), inicios[0], fines[0]
+
+
+def crear_bits(ruta, filas, cols):
+    """Crea un .bits vacío (todo libre) y devuelve el memmap escribible de sus filas"""
+    ancho = (cols + 7) // 8
+    with open(ruta, 'wb') as archivo:
+        archivo.write(FIRMA_BITS + np.array([filas, cols], dtype='<u8').tobytes())
+        archivo.truncate(TAM_ENCABEZADO + filas * ancho)
+    return np.memmap(ruta, dtype=np.uint8, mode='r+', offset=TAM_ENCABEZADO, shape=(filas, ancho))
+
+
+def abrir_bits(ruta, escritura=False):
+    """Abre un .bits como MapaBits sobre un np.memmap, sin leer el archivo"""
+    with open(ruta, 'rb') as archivo:
+        encabezado = archivo.read(TAM_ENCABEZADO)
+    if encabezado[:len(FIRMA_BITS)] != FIRMA_BITS:
+        raise ValueError(f"'{ruta}' no es un archivo .bits")
+    filas, cols = (int(x) for x in np.frombuffer(encabezado[len(FIRMA_BITS):], dtype='<u8'))
+    bits = np.memmap(ruta, dtype=np.uint8, mode='r+' if escritura else 'r',
+                     offset=TAM_ENCABEZADO, shape=(filas, (cols + 7) // 8))
+    return MapaBits(bits, cols)
+
+
+def guardar_bits(mapa, ruta):
+    """Guarda un Mapa o MapaBits en formato .bits"""
+    if not isinstance(mapa, MapaBits):
+        mapa = MapaBits.desde_mapa(mapa)
+    bits = crear_bits(ruta, mapa.filas, mapa.cols)
+    bits[:] = mapa.bits
+    bits.flush()
+
+
+def _empaquetar(bloques, filas, cols, destino):
+    """
+    Arma un MapaBits con bloques (fila_inicial, arreglo booleano de paredes).
+    Con destino escribe un .bits y lo devuelve abierto con memmap.
+    """
+    ancho = (cols + 7) // 8
+    bits = np.zeros((filas, ancho), dtype=np.uint8) if destino is None else crear_bits(destino, filas, cols)
+    for fila, paredes in bloques:
+        bits[fila:fila + len(paredes)] = np.packbits(paredes, axis=1)
+    if destino is None:
+        return MapaBits(bits, cols)
+    bits.flush()
+    del bits
+    return abrir_bits(destino)
+
+
+def cargar_ascii(ruta, destino=None, libres=LIBRES_ASCII):
+    """
+    Lee un mapa de texto (una fila por línea) y devuelve un MapaBits.
+
+    Si el archivo empieza con un encabezado .map (type / height / width /
+    map) se saltea. Las filas más cortas se completan con pared.
+    """
+    tabla = np.ones(256, dtype=bool)
+    tabla[np.frombuffer(libres.encode('ascii'), dtype=np.uint8)] = False
+
+    def lineas():
+        with open(ruta, 'rb') as archivo:
+            primera = archivo.readline()
+            if primera.split()[:1] == [b'type']:
+                for linea in archivo:
+                    if linea.strip() == b'map':
+                        break
+            elif primera.rstrip(b'\r\n'):
+                yield primera.rstrip(b'\r\n')
+            for linea in archivo:
+                linea = linea.rstrip(b'\r\n')
+                if linea:
+                    yield linea
+
+    # Primera pasada: tamaño; segunda: conversión de a bloques
+    filas = cols = 0
+    for linea in lineas():
+        filas += 1
+        cols = max(cols, len(linea))
+    if filas == 0:
+        raise ValueError(f"'{ruta}' no tiene filas")
+
+    def bloques():
+        bloque = []
+        fila = 0
+        for linea in lineas():
+            bloque.append(linea.ljust(cols, b'@'))
+            if len(bloque) == FILAS_POR_BLOQUE:
+                yield fila, tabla[np.frombuffer(b''.join(bloque), dtype=np.uint8).reshape(-1, cols)]
+                fila += len(bloque)
+                bloque = []
+        if bloque:
+            yield fila, tabla[np.frombuffer(b''.join(bloque), dtype=np.uint8).reshape(-1, cols)]
+
+    return _empaquetar(bloques(), filas, cols, destino)
+
+
+def cargar_npy(ruta, destino=None):
+    """Lee un .npy 2D (distinto de cero = pared) abriéndolo con mmap, y devuelve un MapaBits"""
+    arreglo = np.load(ruta, mmap_mode='r')
+    if arreglo.ndim != 2:
+        raise ValueError(f"'{ruta}' no es un arreglo 2D")
+    filas, cols = arreglo.shape
+    bloques = ((fila, arreglo[fila:fila + FILAS_POR_BLOQUE] != 0)
+               for fila in range(0, filas, FILAS_POR_BLOQUE))
+    return _empaquetar(bloques, filas, cols, destino)
+
+
+def cargar_png(ruta, destino=None, umbral=UMBRAL_PNG):
+    """Lee una imagen de ocupación (oscuro = pared) y devuelve un MapaBits"""
+    from PIL import Image
+
+    # Los mapas grandes superan el límite contra "bombas de descompresión":
+    # se levanta solo mientras se lee este archivo
+    limite = Image.MAX_IMAGE_PIXELS
+    Image.MAX_IMAGE_PIXELS = None
+    try:
+        with Image.open(ruta) as imagen:
+            gris = imagen.convert('L')
+    finally:
+        Image.MAX_IMAGE_PIXELS = limite
+    cols, filas = gris.size
+    bloques = ((fila, np.asarray(gris.crop((0, fila, cols, min(fila + FILAS_POR_BLOQUE, filas)))) < umbral)
+               for fila in range(0, filas, FILAS_POR_BLOQUE))
+    return _empaquetar(bloques, filas, cols, destino)
+
+
+def cargar_grande(ruta, destino=None):
+    """Elige el cargador de mapas grandes según la extensión"""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == '.bits':
+        return abrir_bits(ruta)
+    if extension == '.npy':
+        return cargar_npy(ruta, destino)
+    if extension == '.png':
+        return cargar_png(ruta, destino)
+    return cargar_ascii(ruta, destino)
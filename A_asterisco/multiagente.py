@@ -0,0 +1,381 @@
+"""
+Caminos para muchos agentes sin choques: A* cooperativo con tabla de reservas.
+
+Los agentes se planifican de a uno, en orden de prioridad, en el espacio
+(celda, instante): en cada paso un agente se mueve a una celda vecina (mismos
+movimientos, costos y regla de diagonales que a_estrella) o espera en la
+suya. Cada camino planificado se anota en una tabla de reservas y los
+agentes siguientes la evitan: nunca dos agentes en la misma celda en el
+mismo instante ni intercambiando celdas entre dos instantes. Un agente que
+llega a su fin se queda ahí, así que su fin queda reservado desde ese
+instante en adelante.
+
+Con `ventana` (Windowed HCA*) cada agente planifica con reservas solo los
+próximos `ventana` instantes y se vuelve a planificar a todos cada
+`ventana // 2` pasos: el costo por paso queda acotado aunque los caminos
+sean largos, a cambio de caminos algo peores.
+
+Referencia: Silver, "Cooperative Pathfinding" (AIIDE 2005).
+
+Uso:
+    planificador = PlanificadorCooperativo(mapa)
+    resultados = planificador.planificar([(inicio_1, fin_1), (inicio_2, fin_2)])
+    resultados[0].camino[t]   # posición del agente 0 en el instante t
+"""
+
+import heapq
+import math
+import time
+
+import numpy as np
+from scipy.sparse.csgraph import connected_components
+
+from busqueda import COSTO_DIAGONAL, COSTO_RECTO, Mapa, ResultadoBusqueda, como_mapa
+from landmarks import grafo_disperso
+
+# Costo de quedarse quieto un instante
+COSTO_ESPERA = COSTO_RECTO
+
+
+class TablaReservas:
+    """
+    Reservas (celda, instante) -> agente en un dict de enteros t * n + id.
+
+    Los fines se guardan aparte como id -> (instante de llegada, agente): la
+    celda queda ocupada desde ese instante para siempre. `ultimo` lleva, por
+    celda, el último instante reservado, para saber si un agente puede
+    quedarse en su fin sin estorbar a otro que pasa después.
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self.reservas = {}
+        self.fines = {}
+        self.ultimo = {}
+
+    def __len__(self):
+        return len(self.reservas) + len(self.fines)
+
+    def ocupante(self, id_celda, t):
+        agente = self.reservas.get(t * self.n + id_celda)
+        if agente is None:
+            fijo = self.fines.get(id_celda)
+            if fijo is not None and t >= fijo[0]:
+                return fijo[1]
+        return agente
+
+    def reservar(self, ids, t0, agente, quedarse=True):
+        """Reserva ids[i] en el instante t0 + i; con quedarse, el último para siempre"""
+        n = self.n
+        reservas = self.reservas
+        ultimo = self.ultimo
+        for i, id_celda in enumerate(ids):
+            t = t0 + i
+            reservas[t * n + id_celda] = agente
+            if ultimo.get(id_celda, -1) < t:
+                ultimo[id_celda] = t
+        if quedarse:
+            self.fines[ids[-1]] = (t0 + len(ids) - 1, agente)
+
+
+class PlanificadorCooperativo:
+    """
+    Planifica agentes en orden de prioridad sobre una tabla de reservas común.
+
+    Args:
+        mapa: Mapa (o cuadrícula que acepte como_mapa) con las paredes
+        ventana: None planifica cada camino completo; un entero usa el modo
+            con ventana (Windowed HCA*)
+        max_pasos: Instantes máximos de un camino (por defecto 4 * (filas + cols))
+    """
+
+    def __init__(self, mapa, ventana=None, max_pasos=None):
+        self.mapa = como_mapa(mapa)
+        self.ventana = ventana
+        self.max_pasos = max_pasos or 4 * (self.mapa.filas + self.mapa.cols)
+        n = self.mapa.filas * self.mapa.cols
+        # Movimientos del espacio-tiempo por máscara: esperar y los del mapa
+        self.acciones = [((0, COSTO_ESPERA),) + opciones for opciones in self.mapa.sucesores]
+        self.tabla = TablaReservas(n)
+        self.expandidos = 0
+        # Componente conexa de cada celda: un agente cuyo fin está en otra
+        # nunca llega, y buscarlo recorrería todo el espacio-tiempo
+        _, componentes = connected_components(grafo_disperso(self.mapa), directed=False)
+        self.componente = componentes.tolist()
+
+    def _heuristica(self, id_fin):
+        """
+        Octile al fin, pero nunca menos que los instantes que faltan hasta
+        que el fin queda libre: cada acción (también esperar) cuesta al
+        menos 1, así que la heurística sigue siendo consistente y el agente
+        no explora todo el espacio-tiempo mientras espera a que pasen otros.
+        """
+        cols = self.mapa.cols
+        fila_fin, col_fin = divmod(id_fin, cols)
+        libre_desde = self.tabla.ultimo.get(id_fin, -1) + 1
+
+        def heuristica(id_nodo, t):
+            fila, col = divmod(id_nodo, cols)
+            dx = abs(fila - fila_fin)
+            dy = abs(col - col_fin)
+            if dx < dy:
+                octile = COSTO_DIAGONAL * dx + COSTO_RECTO * (dy - dx)
+            else:
+                octile = COSTO_DIAGONAL * dy + COSTO_RECTO * (dx - dy)
+            return max(octile, libre_desde - t)
+        return heuristica
+
+    def _buscar(self, id_inicio, id_fin, t0, agente, limite, parar_en_limite):
+        """
+        A* en (celda, instante) desde t0 evitando las reservas de la tabla.
+
+        Termina al llegar al fin cuando ya nadie más lo va a pisar o, con
+        parar_en_limite, al alcanzar el instante `limite` (lo más cerca del
+        fin que se pueda). Devuelve la lista de ids por instante desde t0, o
+        None si no hay camino antes de `limite`.
+        """
+        n = self.tabla.n
+        reservas = self.tabla.reservas
+        ultimo = self.tabla.ultimo
+        ocupante = self.tabla.ocupante
+        acciones = self.acciones
+        vecindad = self.mapa.plano_vecindad
+        heuristica = self._heuristica(id_fin)
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        inicio = t0 * n + id_inicio
+        g_score = {inicio: 0}
+        padre = {inicio: inicio}
+        cuenta = 0
+        # (f, -g, cuenta, estado, g): a igual f se sigue el estado más avanzado;
+        # esperando a que el fin se libere hay muchísimos empates
+        abiertos = [(heuristica(id_inicio, t0), 0, cuenta, inicio, 0)]
+        expandidos = 0
+        try:
+            while abiertos:
+                _, _, _, estado, g_actual = heappop(abiertos)
+                if g_actual != g_score[estado]:
+                    continue
+                t, actual = divmod(estado, n)
+                if (actual == id_fin and ultimo.get(actual, -1) <= t) or (parar_en_limite and t >= limite):
+                    ids = []
+                    while True:
+                        ids.append(estado % n)
+                        if padre[estado] == estado:
+                            break
+                        estado = padre[estado]
+                    ids.reverse()
+                    return ids
+                if t >= limite:
+                    continue
+                expandidos += 1
+
+                siguiente = t + 1
+                for delta, costo in acciones[vecindad[actual]]:
+                    vecino = actual + delta
+                    otro = ocupante(vecino, siguiente)
+                    if otro is not None and otro != agente:
+                        continue
+                    if delta:
+                        # Sin intercambios: nadie viene de vecino a actual en el mismo paso
+                        otro = reservas.get(t * n + vecino)
+                        if otro is not None and otro != agente and reservas.get(siguiente * n + actual) == otro:
+                            continue
+                    nuevo = siguiente * n + vecino
+                    nuevo_g = g_actual + costo
+                    if nuevo_g < g_score.get(nuevo, math.inf):
+                        g_score[nuevo] = nuevo_g
+                        padre[nuevo] = estado
+                        cuenta += 1
+                        heappush(abiertos, (nuevo_g + heuristica(vecino, siguiente), -nuevo_g, cuenta, nuevo, nuevo_g))
+            return None
+        finally:
+            self.expandidos += expandidos
+
+    def _costo(self, ids):
+        cols = self.mapa.cols
+        costo = 0
+        for a, b in zip(ids, ids[1:]):
+            if a == b:
+                costo += COSTO_ESPERA
+            elif a // cols != b // cols and a % cols != b % cols:
+                costo += COSTO_DIAGONAL
+            else:
+                costo += COSTO_RECTO
+        return costo
+
+    def planificar(self, agentes):
+        """
+        Planifica los agentes en el orden dado (el primero tiene prioridad).
+
+        Args:
+            agentes: Lista de pares (inicio, fin) con posiciones (fila, col)
+
+        Returns:
+            Lista de ResultadoBusqueda, uno por agente, con camino[t] = la
+            posición en el instante t (las esperas repiten la posición).
+            Un agente que no llega tiene encontrado False y su camino termina
+            donde quedó
+
+        Dos agentes no pueden compartir inicio ni fin (ValueError): uno de
+        los dos no podría estar nunca en su celda.
+        """
+        t0 = time.perf_counter()
+        mapa = self.mapa
+        self.tabla = TablaReservas(mapa.filas * mapa.cols)
+        self.expandidos = 0
+        ids = [(mapa.id(*inicio), mapa.id(*fin)) for inicio, fin in agentes]
+        for k, nombre in ((0, 'inicio'), (1, 'fin')):
+            vistos = {}
+            for agente, par in enumerate(ids):
+                if par[k] in vistos:
+                    raise ValueError(f"Los agentes {vistos[par[k]]} y {agente} tienen el mismo {nombre}: "
+                                     f"{mapa.pos(par[k])}")
+                vistos[par[k]] = agente
+        alcanzables = [self.componente[id_inicio] == self.componente[id_fin] for id_inicio, id_fin in ids]
+        if self.ventana is None:
+            trayectorias, llegaron = self._planificar_completo(ids, alcanzables)
+        else:
+            trayectorias, llegaron = self._planificar_con_ventana(ids, alcanzables)
+
+        self.tiempo_ms = (time.perf_counter() - t0) * 1000
+        return [ResultadoBusqueda(llego, [mapa.pos(i) for i in trayectoria], self._costo(trayectoria),
+                                  {'pasos': len(trayectoria) - 1})
+                for trayectoria, llego in zip(trayectorias, llegaron)]
+
+    def _planificar_completo(self, ids, alcanzables):
+        trayectorias = []
+        llegaron = []
+        fines = self.tabla.fines
+        # Hasta que le toque planificar, cada agente ocupa su inicio para
+        # siempre (como en el modo con ventana): los anteriores no pasan por
+        # ahí, así que siempre puede al menos quedarse quieto sin chocar
+        for agente, (id_inicio, _) in enumerate(ids):
+            fines[id_inicio] = (0, agente)
+        for agente, (id_inicio, id_fin) in enumerate(ids):
+            del fines[id_inicio]
+            camino = None
+            # Un fin ocupado para siempre por otro (su fin o su inicio) no se
+            # alcanza nunca: buscarlo recorrería todo el espacio-tiempo
+            if alcanzables[agente] and id_fin not in fines:
+                camino = self._buscar(id_inicio, id_fin, 0, agente, self.max_pasos, False)
+            if camino is None:
+                # No llega: se queda en su inicio, que nadie más pisa
+                camino = [id_inicio]
+            self.tabla.reservar(camino, 0, agente)
+            trayectorias.append(camino)
+            llegaron.append(camino[-1] == id_fin)
+        return trayectorias, llegaron
+
+    def _planificar_con_ventana(self, ids, alcanzables):
+        ventana = self.ventana
+        intervalo = max(1, ventana // 2)
+        posiciones = [id_inicio for id_inicio, _ in ids]
+        trayectorias = [[id_inicio] for id_inicio, _ in ids]
+        t = 0
+        ronda = 0
+        # Si en filas + cols pasos no llega nadie nuevo, los que faltan están
+        # trabados (p. ej. su fin queda detrás de otro agente ya estacionado)
+        paciencia = self.mapa.filas + self.mapa.cols
+        mejor_llegados = 0
+        ultimo_avance = 0
+        while t < self.max_pasos and t - ultimo_avance < paciencia:
+            pendientes = sum(p != id_fin and alcanzable
+                             for p, (_, id_fin), alcanzable in zip(posiciones, ids, alcanzables))
+            if pendientes == 0:
+                break
+            if len(ids) - pendientes > mejor_llegados:
+                mejor_llegados = len(ids) - pendientes
+                ultimo_avance = t
+            # Tabla nueva en cada ronda; la prioridad rota para que nadie quede siempre último
+            self.tabla = TablaReservas(self.mapa.filas * self.mapa.cols)
+            n = self.tabla.n
+            reservas = self.tabla.reservas
+            # Hasta que le toque planificar, cada agente ocupa su celda toda
+            # la ventana: los anteriores lo esquivan en lugar de suponer que
+            # se va a correr (en un pasillo sin salida no podría). Así
+            # siempre puede al menos quedarse quieto y nunca hay choques
+            for agente, posicion in enumerate(posiciones):
+                for instante in range(t, t + ventana + 1):
+                    reservas[instante * n + posicion] = agente
+            orden = list(range(len(ids)))
+            desplazamiento = ronda % len(ids)
+            orden = orden[desplazamiento:] + orden[:desplazamiento]
+            planes = {}
+            for agente in orden:
+                camino = None
+                if alcanzables[agente]:
+                    camino = self._buscar(posiciones[agente], ids[agente][1], t, agente, t + ventana, True)
+                if camino is None:
+                    camino = [posiciones[agente]]
+                for instante in range(t, t + ventana + 1):
+                    clave = instante * n + posiciones[agente]
+                    if reservas.get(clave) == agente:
+                        del reservas[clave]
+                # Dentro de la ventana el agente queda reservado hasta el final
+                camino += [camino[-1]] * (ventana + 1 - len(camino))
+                self.tabla.reservar(camino, t, agente, quedarse=False)
+                planes[agente] = camino
+            pasos = min(intervalo, self.max_pasos - t)
+            for agente, camino in planes.items():
+                trayectorias[agente] += camino[1:pasos + 1]
+                posiciones[agente] = camino[pasos]
+            t += pasos
+            ronda += 1
+
+        for trayectoria, (_, id_fin) in zip(trayectorias, ids):
+            # Quitar las esperas finales en el fin
+            while len(trayectoria) > 1 and trayectoria[-1] == id_fin and trayectoria[-2] == id_fin:
+                trayectoria.pop()
+        return trayectorias, [p == id_fin for p, (_, id_fin) in zip(posiciones, ids)]
+
+
+def contar_conflictos(caminos):
+    """
+    Cuenta choques entre caminos por instante (misma celda) y cruces
+    (intercambio de celdas). Un agente que terminó se queda en su última celda.
+    """
+    if not caminos:
+        return 0
+    largo = max(len(camino) for camino in caminos)
+    conflictos = 0
+    anterior = None
+    for t in range(largo):
+        actual = [tuple(camino[min(t, len(camino) - 1)]) for camino in caminos]
+        conflictos += len(actual) - len(set(actual))
+        if anterior is not None:
+            movidas = {(a, b) for a, b in zip(anterior, actual) if a != b}
+            conflictos += sum((b, a) in movidas for a, b in movidas) // 2
+        anterior = actual
+    return conflictos
+
+
+def agentes_aleatorios(mapa, cantidad, semilla=0):
+    """Pares (inicio, fin) al azar, sin dos inicios ni dos fines en la misma celda"""
+    mapa = como_mapa(mapa)
+    libres = np.flatnonzero(mapa.vecindad.reshape(-1))
+    rng = np.random.default_rng(semilla)
+    inicios = rng.choice(libres, size=cantidad, replace=False)
+    fines = rng.choice(libres, size=cantidad, replace=False)
+    return [(mapa.pos(int(a)), mapa.pos(int(b))) for a, b in zip(inicios, fines)]
+
+
+if __name__ == "__main__":
+    # Escalabilidad: mapas con 10% de paredes y un agente cada ~20 celdas
+    rng = np.random.default_rng(0)
+    for cantidad in (100, 1000, 10000):
+        lado = int(math.sqrt(cantidad * 20))
+        mapa = Mapa(celdas=(rng.random((lado, lado)) < 0.1).astype(np.uint8))
+        agentes = agentes_aleatorios(mapa, cantidad)
+        modos = [16] if cantidad > 1000 else [None, 16]
+        for ventana in modos:
+            planificador = PlanificadorCooperativo(mapa, ventana=ventana)
+            resultados = planificador.planificar(agentes)
+            llegaron = sum(r.encontrado for r in resultados)
+            pasos = max(len(r.camino) for r in resultados) - 1
+            print(f"{cantidad} agentes en {lado}x{lado}, ventana={ventana}: "
+                  f"{planificador.tiempo_ms / 1000:.2f} s ({planificador.tiempo_ms / pasos:.1f} ms por paso), "
+                  f"{llegaron} llegaron, {pasos} pasos, "
+                  f"{planificador.expandidos} expandidos, "
+                  f"{contar_conflictos([r.camino for r in resultados])} conflictos")
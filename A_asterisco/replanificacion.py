@@ -0,0 +1,199 @@
+"""
+Replanificación incremental con D* Lite.
+
+Cuando se agregan o quitan paredes después de una búsqueda, A* tiene que
+empezar de cero. D* Lite busca hacia atrás (del fin al inicio) y guarda
+g y rhs de cada nodo entre llamadas; al cambiar unas pocas celdas solo
+se reparan los nodos cuyo costo realmente cambió.
+
+Usa el mismo Mapa, movimientos y costos que busqueda.a_estrella, así que
+los caminos tienen el mismo costo que A* con epsilon = 1. Internamente los
+costos se llevan en enteros (milésimas): D* Lite compara llaves que deben
+empatar exactamente, y con flotantes 1.414 * a + b puede salir distinto
+según el orden de las sumas.
+
+Referencia: Koenig y Likhachev, "D* Lite" (AAAI 2002), versión optimizada.
+"""
+
+import heapq
+import math
+import time
+
+from busqueda import COSTO_DIAGONAL, COSTO_RECTO, PARED, ResultadoBusqueda, como_mapa
+
+# Factor para llevar los costos a enteros (1 -> 1000, 1.414 -> 1414)
+ESCALA = 1000
+RECTO = round(COSTO_RECTO * ESCALA)
+DIAGONAL = round(COSTO_DIAGONAL * ESCALA)
+
+
+def _h_entera(p1, p2):
+    """Heurística octile en milésimas"""
+    dx = abs(p1[0] - p2[0])
+    dy = abs(p1[1] - p2[1])
+    return DIAGONAL * min(dx, dy) + RECTO * abs(dx - dy)
+
+
+class DStarLite:
+    """
+    Planificador que conserva su estado entre cambios de paredes.
+
+    Uso:
+        planificador = DStarLite(mapa, inicio, fin)
+        resultado = planificador.planificar()
+        mapa.poner_pared(5, 7)
+        resultado = planificador.actualizar([(5, 7)])
+    """
+
+    def __init__(self, mapa, inicio, fin):
+        self.mapa = como_mapa(mapa)
+        # Misma tabla de sucesores del mapa, con costos enteros
+        self.sucesores = [tuple((delta, round(costo * ESCALA)) for delta, costo in opciones)
+                          for opciones in self.mapa.sucesores]
+        self.inicio = inicio
+        self.fin = fin
+        self.km = 0  # Corrección de las llaves cuando el inicio se mueve
+        self.g = {}
+        self.rhs = {}
+        self.abiertos = {}  # id -> llave vigente; el montículo puede tener entradas viejas
+        self.monticulo = []
+        self.expandidos_total = 0
+
+        id_fin = self.mapa.id(*fin)
+        self.rhs[id_fin] = 0
+        self._insertar(id_fin)
+
+    def _h(self, id_nodo):
+        """Heurística del inicio actual al nodo (la búsqueda va hacia atrás)"""
+        return _h_entera(self.inicio, self.mapa.pos(id_nodo))
+
+    def _llave(self, id_nodo):
+        minimo = min(self.g.get(id_nodo, math.inf), self.rhs.get(id_nodo, math.inf))
+        return (minimo + self._h(id_nodo) + self.km, minimo)
+
+    def _insertar(self, id_nodo):
+        llave = self._llave(id_nodo)
+        self.abiertos[id_nodo] = llave
+        heapq.heappush(self.monticulo, (llave, id_nodo))
+
+    def _tope(self):
+        """Descarta entradas obsoletas y devuelve la menor llave vigente"""
+        while self.monticulo:
+            llave, id_nodo = self.monticulo[0]
+            if self.abiertos.get(id_nodo) == llave:
+                return llave, id_nodo
+            heapq.heappop(self.monticulo)
+        return (math.inf, math.inf), None
+
+    def _actualizar_vertice(self, id_nodo):
+        mapa = self.mapa
+        if id_nodo != mapa.id(*self.fin):
+            # El grafo es no dirigido: los sucesores también son los predecesores
+            g = self.g
+            mejor = math.inf
+            for delta, costo in self.sucesores[mapa.plano_vecindad[id_nodo]]:
+                valor = costo + g.get(id_nodo + delta, math.inf)
+                if valor < mejor:
+                    mejor = valor
+            self.rhs[id_nodo] = mejor
+        self.abiertos.pop(id_nodo, None)
+        if self.g.get(id_nodo, math.inf) != self.rhs.get(id_nodo, math.inf):
+            self._insertar(id_nodo)
+
+    def _calcular_camino_mas_corto(self):
+        mapa = self.mapa
+        g = self.g
+        rhs = self.rhs
+        id_inicio = mapa.id(*self.inicio)
+        expandidos = 0
+        while True:
+            llave_vieja, actual = self._tope()
+            if actual is None:
+                break
+            if not (llave_vieja < self._llave(id_inicio)
+                    or rhs.get(id_inicio, math.inf) > g.get(id_inicio, math.inf)):
+                break
+            heapq.heappop(self.monticulo)
+            del self.abiertos[actual]
+            expandidos += 1
+
+            llave_nueva = self._llave(actual)
+            vecinos = [actual + delta for delta, _ in self.sucesores[mapa.plano_vecindad[actual]]]
+            if llave_vieja < llave_nueva:
+                self._insertar(actual)
+            elif g.get(actual, math.inf) > rhs.get(actual, math.inf):
+                g[actual] = rhs[actual]
+                for vecino in vecinos:
+                    self._actualizar_vertice(vecino)
+            else:
+                g[actual] = math.inf
+                for vecino in vecinos:
+                    self._actualizar_vertice(vecino)
+                self._actualizar_vertice(actual)
+        self.expandidos_total += expandidos
+        return expandidos
+
+    def _resultado(self, expandidos, t0):
+        mapa = self.mapa
+        g = self.g
+        id_inicio = mapa.id(*self.inicio)
+        estadisticas = {
+            'expandidos': expandidos,
+            'expandidos_total': self.expandidos_total,
+            'tiempo_ms': (time.perf_counter() - t0) * 1000,
+        }
+        # Al terminar, el inicio puede quedar sobreconsistente (g > rhs):
+        # su costo real es rhs, que ya mira a los sucesores consistentes
+        costo = self.rhs.get(id_inicio, math.inf)
+        if costo == math.inf or mapa.plano[id_inicio] == PARED:
+            return ResultadoBusqueda(False, [], 0, estadisticas)
+        costo /= ESCALA
+
+        # Seguir hacia el sucesor con menor costo + g hasta llegar al fin
+        id_fin = mapa.id(*self.fin)
+        camino = [id_inicio]
+        actual = id_inicio
+        while actual != id_fin:
+            siguiente, mejor = None, math.inf
+            for delta, costo_movimiento in self.sucesores[mapa.plano_vecindad[actual]]:
+                valor = costo_movimiento + g.get(actual + delta, math.inf)
+                if valor < mejor:
+                    siguiente, mejor = actual + delta, valor
+            actual = siguiente
+            camino.append(actual)
+        return ResultadoBusqueda(True, [mapa.pos(n) for n in camino], costo, estadisticas)
+
+    def planificar(self):
+        """Calcula (o completa) el camino de inicio a fin"""
+        t0 = time.perf_counter()
+        expandidos = self._calcular_camino_mas_corto()
+        return self._resultado(expandidos, t0)
+
+    def actualizar(self, cambios):
+        """
+        Repara el plan después de editar paredes.
+
+        Args:
+            cambios: Posiciones (fila, col) cuyas paredes ya se cambiaron en
+                el mapa con Mapa.poner_pared
+
+        Returns:
+            ResultadoBusqueda con el nuevo camino
+        """
+        t0 = time.perf_counter()
+        mapa = self.mapa
+        afectados = set()
+        for fila, col in cambios:
+            # Una pared cambia los movimientos de las celdas a su alrededor
+            for f in range(max(fila - 1, 0), min(fila + 2, mapa.filas)):
+                for c in range(max(col - 1, 0), min(col + 2, mapa.cols)):
+                    afectados.add(f * mapa.cols + c)
+        for id_nodo in afectados:
+            self._actualizar_vertice(id_nodo)
+        expandidos = self._calcular_camino_mas_corto()
+        return self._resultado(expandidos, t0)
+
+    def mover_inicio(self, inicio):
+        """Mueve el inicio (p. ej. el agente avanzó) sin reordenar la cola"""
+        self.km += _h_entera(self.inicio, inicio)
+        self.inicio = inicio
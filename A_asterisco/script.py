@@ -1,6 +1,14 @@
+import sys
+import time
+
 import pygame
-from queue import PriorityQueue
-import math
+from busqueda import Mapa, a_estrella, h, EPSILON
+from jps import jps
+from replanificacion import DStarLite
+from anytime import ara_estrella, EPSILON_INICIAL
+from bidireccional import a_estrella_bidireccional
+from theta import theta_estrella
+from traza import ABIERTO, CERRADO, Traza, grabar
 
 pygame.init()
 
@@ -35,21 +43,87 @@ GRIS_CLARO = (240, 240, 245)
 TEXTO = (33, 33, 33)
 TEXTO_CLARO = (100, 100, 110)
 
+# Máximo de cuadros por segundo: la búsqueda puede pedir dibujar mucho más
+# seguido, pero solo se pinta si pasó al menos un cuadro desde el anterior
+FPS_OBJETIVO = 60
+# Eventos de la traza por segundo al reproducir una búsqueda (flechas arriba/abajo la cambian)
+VELOCIDAD_REPRODUCCION = 200
+TECLAS_REPRODUCCION = (pygame.K_SPACE, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_HOME, pygame.K_END,
+                       pygame.K_UP, pygame.K_DOWN)
+MAX_TEXTOS_CACHE = 4096
+
+class Lienzo:
+    # Estado del dibujado incremental: celdas que cambiaron desde el último
+    # cuadro, qué disposición y qué panel se pintaron, y cuándo
+    def __init__(self):
+        self.sucias = set()
+        self.grid = None
+        self.disposicion = None
+        self.panel = None
+        self.max_scroll = 0
+        self.ultimo_cuadro = -FPS_OBJETIVO
+
+    def invalidar(self):
+        # Obliga a repintar toda la ventana en el próximo cuadro
+        self.grid = None
+
+LIENZO = Lienzo()
+_textos = {}
+_fondos = {}
+
+def render_texto(fuente, texto, color):
+    # Los textos se renderizan una vez y se reutilizan (costos, panel lateral)
+    clave = (id(fuente), texto, color)
+    superficie = _textos.get(clave)
+    if superficie is None:
+        if len(_textos) >= MAX_TEXTOS_CACHE:
+            _textos.clear()
+        superficie = _textos[clave] = fuente.render(texto, True, color)
+    return superficie
+
+def fondo_costos(lado):
+    # Fondo semi-transparente de los costos, uno por tamaño de nodo
+    superficie = _fondos.get(lado)
+    if superficie is None:
+        superficie = _fondos[lado] = pygame.Surface((lado, lado))
+        superficie.set_alpha(180)
+        superficie.fill(BLANCO)
+    return superficie
+
 class Nodo:
-    def __init__(self, fila, col, ancho, total_filas):
+    # Vista de una celda del Mapa para dibujarla: las paredes viven en
+    # mapa.celdas, el color solo refleja el estado visual de la búsqueda
+    def __init__(self, fila, col, ancho, total_filas, mapa):
         self.fila = fila
         self.col = col
         self.x = fila * ancho
         self.y = col * ancho
-        self.color = BLANCO
+        self._color = BLANCO
         self.ancho = ancho
         self.total_filas = total_filas
+        self.mapa = mapa
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, color):
+        # Cada cambio de color marca la celda para el próximo cuadro
+        if color != self._color:
+            self._color = color
+            LIENZO.sucias.add(self)
+
+    def poner_costos(self, g_cost, h_cost):
+        self.g_cost = round(g_cost, 1)
+        self.h_cost = round(h_cost, 1)
+        LIENZO.sucias.add(self)
 
     def get_pos(self):
         return self.fila, self.col
 
     def es_pared(self):
-        return self.color == NEGRO
+        return self.mapa.es_pared(self.fila, self.col)
 
     def es_inicio(self):
         return self.color == NARANJA
@@ -58,15 +132,19 @@ class Nodo:
         return self.color == PURPURA
 
     def restablecer(self):
+        self.mapa.poner_pared(self.fila, self.col, False)
         self.color = BLANCO
 
     def hacer_inicio(self):
+        self.mapa.poner_pared(self.fila, self.col, False)
         self.color = NARANJA
 
     def hacer_pared(self):
+        self.mapa.poner_pared(self.fila, self.col)
         self.color = NEGRO
 
     def hacer_fin(self):
+        self.mapa.poner_pared(self.fila, self.col, False)
         self.color = PURPURA
 
     def hacer_camino(self):
@@ -88,217 +166,189 @@ class Nodo:
         # Si el nodo está siendo evaluado (amarillo o rojo), mostrar los costos
         if self.color in [AMARILLO, ROJO, VERDE] and hasattr(self, 'g_cost') and hasattr(self, 'h_cost') and self.ancho > 40:
             # Fondo semi-transparente para mejorar legibilidad
-            s = pygame.Surface((self.ancho - 4, self.ancho - 4))
-            s.set_alpha(180)
-            s.fill(BLANCO)
-            ventana.blit(s, (self.x + 2, self.y + 2))
+            ventana.blit(fondo_costos(self.ancho - 4), (self.x + 2, self.y + 2))
             
             # Textos de costos
-            g_texto = FUENTE_NODO.render(f"g:{self.g_cost:.1f}", True, TEXTO)
-            h_texto = FUENTE_NODO.render(f"h:{self.h_cost:.1f}", True, TEXTO)
+            g_texto = render_texto(FUENTE_NODO, f"g:{self.g_cost:.1f}", TEXTO)
+            h_texto = render_texto(FUENTE_NODO, f"h:{self.h_cost:.1f}", TEXTO)
             f_valor = self.g_cost + self.h_cost
-            f_texto = FUENTE_NODO.render(f"f:{f_valor:.1f}", True, AZUL)
+            f_texto = render_texto(FUENTE_NODO, f"f:{f_valor:.1f}", AZUL)
             
             # Posicionar textos verticalmente
             ventana.blit(g_texto, (self.x + 5, self.y + 5))
             ventana.blit(h_texto, (self.x + 5, self.y + self.ancho // 2 - 4))
             ventana.blit(f_texto, (self.x + 5, self.y + self.ancho - 18))
 
-    def actualizar_vecinos(self, grid):
-        self.vecinos = []
-        # Movimientos: arriba, abajo, izquierda, derecha, y 4 diagonales
-        # Formato: (delta_fila, delta_col, costo)
-        movimientos = [
-            (-1, 0, 1),   # Arriba
-            (1, 0, 1),    # Abajo
-            (0, -1, 1),   # Izquierda
-            (0, 1, 1),    # Derecha
-            (-1, -1, 1.414), # Diagonal arriba-izquierda
-            (-1, 1, 1.414),  # Diagonal arriba-derecha
-            (1, -1, 1.414),  # Diagonal abajo-izquierda
-            (1, 1, 1.414)    # Diagonal abajo-derecha
-        ]
-        
-        for delta_f, delta_c, costo in movimientos:
-            nueva_fila = self.fila + delta_f
-            nueva_col = self.col + delta_c
-            
-            # Verificar que esté dentro de los límites
-            if 0 <= nueva_fila < self.total_filas and 0 <= nueva_col < self.total_filas:
-                vecino = grid[nueva_fila][nueva_col]
-                if not vecino.es_pared():
-                    # Para diagonales, verificar que no haya paredes bloqueando el paso
-                    if abs(delta_f) == 1 and abs(delta_c) == 1:
-                        # Verificar que no haya paredes en los lados adyacentes
-                        if not grid[self.fila + delta_f][self.col].es_pared() and \
-                           not grid[self.fila][self.col + delta_c].es_pared():
-                            self.vecinos.append((vecino, costo))
-                    else:
-                        self.vecinos.append((vecino, costo))
-
-def h(p1, p2):
-    """Heurística Octile: óptima para movimiento en 8 direcciones"""
-    x1, y1 = p1
-    x2, y2 = p2
-    dx = abs(x1 - x2)
-    dy = abs(y1 - y2)
-    # Octile distance: combina movimientos diagonales y ortogonales
-    # D = 1 (costo ortogonal), D2 = 1.414 (costo diagonal)
-    return 1.414 * min(dx, dy) + 1 * abs(dx - dy)
-
-def reconstruir_camino(vino_de, actual, inicio, dibujar_fn):
-    camino = []
-    pasos_reconstruccion = 0
-    nodo_temp = actual
-    while nodo_temp in vino_de:
-        nodo_temp = vino_de[nodo_temp]
-        if nodo_temp != inicio:
-            nodo_temp.hacer_camino()
-            pasos_reconstruccion += 1
-        camino.append(nodo_temp)
-        dibujar_fn()
-        pygame.time.delay(50)  # Pequeña pausa para visualizar la reconstrucción
-    return camino
-
-def algoritmo_a_estrella(dibujar_fn, grid, inicio, fin):
-    cuenta = 0
-    conjunto_abierto = PriorityQueue()
-    conjunto_abierto.put((0, cuenta, inicio))
-    vino_de = {}
-    g_score = {nodo: float("inf") for fila in grid for nodo in fila}
-    g_score[inicio] = 0
-    f_score = {nodo: float("inf") for fila in grid for nodo in fila}
-    # Peso para la heurística (epsilon): valores > 1 hacen la búsqueda más rápida pero menos exploratoria
-    epsilon = 1.2  # Weighted A* para reducir exploración
-    f_score[inicio] = epsilon * h(inicio.get_pos(), fin.get_pos())
-    
-    # Info para mostrar en la interfaz
-    info = []
-    pasos = 0
-
-    conjunto_abierto_hash = {inicio}
-    caminos_alternativos = []
-
-    while not conjunto_abierto.empty():
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-
-        actual = conjunto_abierto.get()[2]
-        conjunto_abierto_hash.remove(actual)
+def limpiar_busqueda(grid):
+    # Quita los colores de la búsqueda anterior (frontera, visitados, camino)
+    for fila in grid:
+        for nodo in fila:
+            if nodo.color in (AMARILLO, ROJO, VERDE):
+                nodo.color = BLANCO
+
+def info_busqueda(resultado, fin):
+    # Texto del panel con el resultado de una búsqueda
+    if not resultado.encontrado:
+        return ["No se encontró un camino posible"]
+
+    costo_total = round(resultado.costo, 2)
+    info = [
+        f"¡Camino encontrado!",
+        f"Longitud: {len(resultado.camino) - 1} nodos",
+        f"Costo total: {costo_total}",
+        f"Nodos explorados: {resultado.estadisticas['expandidos']}",
+    ]
+    if 'expandidos_atras' in resultado.estadisticas:
+        info.append(f"Desde inicio / desde fin: {resultado.estadisticas['expandidos_adelante']}"
+                    f" / {resultado.estadisticas['expandidos_atras']}")
+    if 'chequeos_vision' in resultado.estadisticas:
+        # Theta*: el camino son puntos de paso unidos por rectas
+        info.append(f"Chequeos de visión: {resultado.estadisticas['chequeos_vision']}")
+    if 'iteraciones' in resultado.estadisticas:
+        # ARA*: cuántas veces mejoró el camino y la cota final
+        info.append(f"Iteraciones: {resultado.estadisticas['iteraciones']}, "
+                    f"cota: {round(resultado.estadisticas['epsilon'], 3)}")
+    info += [
+        "",
+        "Camino óptimo (fila,col | h):"
+    ]
 
-        if actual == fin:
-            info.append(f"Reconstruyendo camino óptimo...")
-            camino = reconstruir_camino(vino_de, actual, inicio, lambda: dibujar_fn(info))
-            fin.hacer_fin()
-            inicio.hacer_inicio()
-            
-            # Calcular el costo total del camino óptimo
-            costo_total = round(g_score[fin], 2)
-            
-            # Construir lista de nodos del camino con sus valores H
-            nodos_camino = [inicio]
-            temp = fin
-            camino_completo = []
-            while temp in vino_de:
-                temp = vino_de[temp]
-                camino_completo.insert(0, temp)
-            camino_completo.append(fin)
-            
-            # Crear lista de información de nodos
-            info = [
-                f"¡Camino encontrado!",
-                f"Longitud: {len(camino)} nodos",
-                f"Costo total: {costo_total}",
-                f"Nodos explorados: {pasos}",
-                "",
-                "Camino óptimo (fila,col | h):"
-            ]
-            
-            # Mostrar TODOS los nodos del camino
-            for i, nodo in enumerate(camino_completo):
-                h_valor = round(h(nodo.get_pos(), fin.get_pos()), 1)
-                info.append(f"{i+1}. ({nodo.fila},{nodo.col}) | h={h_valor}")
-            
-            dibujar_fn(info)
-            return True, [], info, g_score[fin]
-
-        pasos += 1
-        for vecino_info in actual.vecinos:
-            vecino, costo_movimiento = vecino_info
-            temp_g_score = g_score[actual] + costo_movimiento
-
-            if temp_g_score < g_score[vecino]:
-                vino_de[vecino] = actual
-                g_score[vecino] = temp_g_score
-                h_cost = h(vecino.get_pos(), fin.get_pos())
-                # Aplicar peso epsilon a la heurística para búsqueda más directa
-                epsilon = 1.2
-                f_score[vecino] = temp_g_score + epsilon * h_cost
-                
-                # Guardar los costos en el nodo para visualización
-                vecino.g_cost = round(temp_g_score, 1)
-                vecino.h_cost = round(h_cost, 1)
-                
-                if vecino not in conjunto_abierto_hash:
-                    # Poda suave: permitir más flexibilidad para rodear obstáculos
-                    vx, vy = vecino.get_pos()
-                    fx, fy = fin.get_pos()
-                    ax, ay = actual.get_pos()
-                    
-                    # Vector hacia el objetivo desde el nodo actual
-                    dir_objetivo_x = fx - ax
-                    dir_objetivo_y = fy - ay
-                    
-                    # Vector hacia el vecino desde el nodo actual  
-                    dir_vecino_x = vx - ax
-                    dir_vecino_y = vy - ay
-                    
-                    # Solo agregar si el vecino está en dirección general hacia el objetivo
-                    # (producto punto positivo indica ángulo < 90 grados)
-                    producto_punto = dir_objetivo_x * dir_vecino_x + dir_objetivo_y * dir_vecino_y
-                    
-                    # Permitir gran tolerancia para rodear obstáculos complejos
-                    # -2 permite hasta ~135 grados de desviación
-                    if producto_punto >= -3 or f_score[vecino] < temp_g_score + h_cost * 1.5:
-                        cuenta += 1
-                        conjunto_abierto.put((f_score[vecino], cuenta, vecino))
-                        conjunto_abierto_hash.add(vecino)
-                        vecino.hacer_abierto()
-                    
-                    # Actualizar información solo cada ciertos pasos
-                    if pasos % 3 == 0:  # Actualizar cada 3 pasos para mejor rendimiento
-                        info = [
-                            f"Explorando nodo: ({vecino.fila}, {vecino.col})",
-                            f"g(n) = {round(temp_g_score, 1)}",
-                            f"h(n) = {round(h_cost, 1)}",
-                            f"f(n) = {round(f_score[vecino], 1)}",
-                            f"Nodos visitados: {pasos}"
-                        ]
-                        dibujar_fn(info)
-
-        if actual != inicio:
-            actual.hacer_visitado()
-            # Solo actualizar visualización cada ciertos pasos
-            if pasos % 5 == 0:
-                info = [
-                    f"Nodo actual: ({actual.fila}, {actual.col})",
-                    f"Nodos explorados: {pasos}",
-                    "Buscando camino..."
-                ]
-                dibujar_fn(info)
-
-    info = ["No se encontró un camino posible"]
-    dibujar_fn(info)
-    return False, [], info, 0
+    # Mostrar TODOS los nodos del camino
+    for i, pos in enumerate(resultado.camino):
+        h_valor = round(h(pos, fin.get_pos()), 1)
+        info.append(f"{i+1}. ({pos[0]},{pos[1]}) | h={h_valor}")
+    return info
+
+def algoritmo_a_estrella(grid, inicio, fin, buscar=a_estrella, epsilon=EPSILON):
+    # La búsqueda corre a toda velocidad en el núcleo sin pygame y solo graba
+    # sus eventos; Reproductor los dibuja después al ritmo que elija el usuario.
+    # buscar puede ser a_estrella o cualquier función con la misma firma (p. ej. jps)
+    resultado, traza = grabar(buscar, inicio.mapa, inicio.get_pos(), fin.get_pos(), epsilon)
+    limpiar_busqueda(grid)
+    return resultado, traza, info_busqueda(resultado, fin)
+
+class Reproductor:
+    # Reproduce una Traza sobre el grid según el tiempo transcurrido y la
+    # velocidad elegida; se puede pausar y mover hacia atrás o adelante
+    def __init__(self, grid, traza, info_final):
+        self.grid = grid
+        self.traza = traza
+        self.info_final = info_final
+        self.posicion = 0      # Eventos ya aplicados al grid
+        self.objetivo = 0.0    # Posición con fracción, avanza con el tiempo
+        self.velocidad = VELOCIDAD_REPRODUCCION
+        self.pausado = False
+
+    def _aplicar(self, i):
+        tipo, (fila, col), g_cost, h_cost = self.traza.evento(i)
+        nodo = self.grid[fila][col]
+        if nodo.es_pared() or nodo.es_inicio() or nodo.es_fin():
+            return
+        if tipo == ABIERTO:
+            nodo.poner_costos(g_cost, h_cost)
+            nodo.hacer_abierto()
+        elif tipo == CERRADO:
+            nodo.hacer_visitado()
+        else:
+            nodo.hacer_camino()
+
+    def _mover(self, evento):
+        # Para retroceder se limpia el grid y se reaplica desde el principio
+        evento = max(0, min(int(evento), len(self.traza)))
+        if evento < self.posicion:
+            limpiar_busqueda(self.grid)
+            self.posicion = 0
+        for i in range(self.posicion, evento):
+            self._aplicar(i)
+        self.posicion = evento
+
+    def ir_a(self, evento):
+        self._mover(evento)
+        self.objetivo = self.posicion
+
+    def terminado(self):
+        return self.posicion >= len(self.traza)
+
+    def avanzar(self, ms):
+        if self.pausado or self.terminado():
+            return
+        self.objetivo = min(self.objetivo + self.velocidad * ms / 1000, len(self.traza))
+        self._mover(self.objetivo)
+
+    def manejar_tecla(self, tecla):
+        # Devuelve True si la tecla era de la reproducción
+        paso = max(1, len(self.traza) // 100)
+        if tecla == pygame.K_SPACE:
+            if self.terminado():
+                self.ir_a(0)  # Volver a empezar
+                self.pausado = False
+            else:
+                self.pausado = not self.pausado
+        elif tecla in (pygame.K_LEFT, pygame.K_RIGHT):
+            self.pausado = True
+            self.ir_a(self.posicion + (paso if tecla == pygame.K_RIGHT else -paso))
+        elif tecla == pygame.K_HOME:
+            self.pausado = True
+            self.ir_a(0)
+        elif tecla == pygame.K_END:
+            self.ir_a(len(self.traza))
+        elif tecla == pygame.K_UP:
+            self.velocidad = min(self.velocidad * 2, 1_000_000)
+        elif tecla == pygame.K_DOWN:
+            self.velocidad = max(self.velocidad // 2, 1)
+        else:
+            return False
+        return True
+
+    def info(self):
+        estado = "terminada" if self.terminado() else ("en pausa" if self.pausado else "reproduciendo")
+        return [
+            f"Reproducción: {self.posicion}/{len(self.traza)} ({estado})",
+            f"Velocidad: {self.velocidad} eventos/s",
+            "",
+        ] + self.info_final
+
+def abrir_traza(ruta, ancho):
+    # Carga una traza guardada con S y prepara el grid para reproducirla
+    traza = Traza.cargar(ruta)
+    filas, cols = traza.forma
+    if filas != cols:
+        raise ValueError(f"La interfaz solo muestra cuadrículas cuadradas ({filas}x{cols})")
+    grid = crear_grid(filas, ancho)
+    for fila, col in zip(*traza.mapa().celdas.nonzero()):
+        grid[fila][col].hacer_pared()
+    inicio = grid[traza.inicio[0]][traza.inicio[1]]
+    fin = grid[traza.fin[0]][traza.fin[1]]
+    inicio.hacer_inicio()
+    fin.hacer_fin()
+    info_final = [f"Traza: {ruta}"] + [f"{clave}: {round(valor, 2) if isinstance(valor, float) else valor}"
+                                       for clave, valor in traza.info.items()]
+    return grid, inicio, fin, Reproductor(grid, traza, info_final)
+
+def mostrar_camino_replanificado(grid, resultado):
+    # Limpia los colores de la búsqueda anterior y marca el camino reparado
+    limpiar_busqueda(grid)
+    if not resultado.encontrado:
+        return ["No se encontró un camino!"]
+    for fila, col in resultado.camino[1:-1]:
+        grid[fila][col].hacer_camino()
+    return [
+        "Camino replanificado (D* Lite)",
+        f"Longitud: {len(resultado.camino) - 1} nodos",
+        f"Costo total: {round(resultado.costo, 2)}",
+        f"Nodos reparados: {resultado.estadisticas['expandidos']}",
+        f"Nodos reparados (total): {resultado.estadisticas['expandidos_total']}",
+    ]
 
 def crear_grid(filas, ancho):
+    # Un solo Mapa compartido por todos los nodos de la cuadrícula
+    mapa = Mapa(filas)
     grid = []
     ancho_nodo = ancho // filas
     for i in range(filas):
         grid.append([])
         for j in range(filas):
-            nodo = Nodo(i, j, ancho_nodo, filas)
+            nodo = Nodo(i, j, ancho_nodo, filas, mapa)
             grid[i].append(nodo)
     return grid
 
@@ -318,12 +368,12 @@ def mostrar_info_lateral(ventana, info, ancho_ventana, alto_ventana, panel_later
     y = 20
     
     # Título
-    titulo = FUENTE_TITULO.render("A* Pathfinding", True, AZUL)
+    titulo = render_texto(FUENTE_TITULO, "A* Pathfinding", AZUL)
     ventana.blit(titulo, (x_panel + 15, y))
     y += 50
     
     # Controles - Título
-    controles_titulo = FUENTE.render("CONTROLES", True, TEXTO)
+    controles_titulo = render_texto(FUENTE, "CONTROLES", TEXTO)
     ventana.blit(controles_titulo, (x_panel + 15, y))
     y += 30
     
@@ -331,12 +381,20 @@ def mostrar_info_lateral(ventana, info, ancho_ventana, alto_ventana, panel_later
         "Click Izq: Colocar",
         "Click Der: Borrar",
         "ENTER: Iniciar",
+        "J: Iniciar (JPS)",
+        "A: Iniciar (ARA* anytime)",
+        "B: Iniciar (bidireccional)",
+        "T: Iniciar (Theta*, ángulo libre)",
+        "D: Replanificar (D* Lite)",
+        "Espacio: Pausa / repetir",
+        "Flechas: Mover / velocidad",
+        "S: Guardar traza",
         "G: Limpiar todo",
         "R: Reiniciar ventana",
     ]
     
     for linea in controles:
-        texto = FUENTE_PEQUEÑA.render(linea, True, TEXTO_CLARO)
+        texto = render_texto(FUENTE_PEQUEÑA, linea, TEXTO_CLARO)
         ventana.blit(texto, (x_panel + 15, y))
         y += 22
     
@@ -345,7 +403,7 @@ def mostrar_info_lateral(ventana, info, ancho_ventana, alto_ventana, panel_later
     y += 20
     
     # Leyenda de colores
-    leyenda_titulo = FUENTE.render("LEYENDA", True, TEXTO)
+    leyenda_titulo = render_texto(FUENTE, "LEYENDA", TEXTO)
     ventana.blit(leyenda_titulo, (x_panel + 15, y))
     y += 30
     
@@ -360,7 +418,7 @@ def mostrar_info_lateral(ventana, info, ancho_ventana, alto_ventana, panel_later
     
     for texto, color in leyenda:
         pygame.draw.rect(ventana, color, (x_panel + 15, y, 20, 20), border_radius=3)
-        superficie = FUENTE_PEQUEÑA.render(texto, True, TEXTO_CLARO)
+        superficie = render_texto(FUENTE_PEQUEÑA, texto, TEXTO_CLARO)
         ventana.blit(superficie, (x_panel + 45, y + 2))
         y += 28
     
@@ -370,7 +428,7 @@ def mostrar_info_lateral(ventana, info, ancho_ventana, alto_ventana, panel_later
         pygame.draw.line(ventana, GRIS, (x_panel + 15, y), (x_panel + panel_lateral - 15, y), 1)
         y += 20
         
-        estado_titulo = FUENTE.render("ESTADO", True, TEXTO)
+        estado_titulo = render_texto(FUENTE, "ESTADO", TEXTO)
         ventana.blit(estado_titulo, (x_panel + 15, y))
         y += 30
         
@@ -388,7 +446,7 @@ def mostrar_info_lateral(ventana, info, ancho_ventana, alto_ventana, panel_later
             y_real = y_inicio + i * linea_altura - scroll_offset
             # Solo dibujar si está visible
             if y_inicio <= y_real < alto_ventana - 10:
-                texto = FUENTE_PEQUEÑA.render(str(linea), True, TEXTO_CLARO)
+                texto = render_texto(FUENTE_PEQUEÑA, str(linea), TEXTO_CLARO)
                 ventana.blit(texto, (x_panel + 15, y_real))
         
         # Dibujar barra de scroll si es necesario
@@ -412,8 +470,16 @@ def mostrar_info_lateral(ventana, info, ancho_ventana, alto_ventana, panel_later
     return 0
 
 def dibujar(ventana, grid, filas, ancho_ventana, alto_ventana, panel_lateral, info=None, scroll_offset=0):
-    ventana.fill(BLANCO)
-    
+    # Cuadro completo solo si cambió la ventana o el grid; si no, se repintan
+    # las celdas sucias y el panel (si su contenido cambió), a lo sumo
+    # FPS_OBJETIVO veces por segundo. Lo que se salta queda para el próximo cuadro.
+    ahora = pygame.time.get_ticks()
+    disposicion = (ancho_ventana, alto_ventana, panel_lateral, filas)
+    completo = LIENZO.grid is not grid or LIENZO.disposicion != disposicion
+    if not completo and ahora - LIENZO.ultimo_cuadro < 1000 / FPS_OBJETIVO:
+        return LIENZO.max_scroll
+    LIENZO.ultimo_cuadro = ahora
+
     # Calcular el tamaño del área de juego (excluyendo el panel lateral)
     ancho_juego = ancho_ventana - panel_lateral
     alto_juego = alto_ventana
@@ -422,29 +488,58 @@ def dibujar(ventana, grid, filas, ancho_ventana, alto_ventana, panel_lateral, in
     # Centrar el grid
     offset_x = (ancho_juego - (ancho_nodo * filas)) // 2
     offset_y = (alto_juego - (ancho_nodo * filas)) // 2
-    
-    # Actualizar las posiciones de los nodos
-    for i, fila in enumerate(grid):
-        for j, nodo in enumerate(fila):
-            nodo.x = offset_x + (j * ancho_nodo)
-            nodo.y = offset_y + (i * ancho_nodo)
-            nodo.ancho = ancho_nodo
-            nodo.dibujar(ventana)
-
-    # Dibujar el grid
-    for i in range(filas + 1):
-        pygame.draw.line(ventana, GRIS, 
-                        (offset_x + i * ancho_nodo, offset_y),
-                        (offset_x + i * ancho_nodo, offset_y + filas * ancho_nodo), 1)
-        pygame.draw.line(ventana, GRIS,
-                        (offset_x, offset_y + i * ancho_nodo),
-                        (offset_x + filas * ancho_nodo, offset_y + i * ancho_nodo), 1)
-    
-    # Mostrar panel lateral
-    max_scroll = mostrar_info_lateral(ventana, info, ancho_ventana, alto_ventana, panel_lateral, scroll_offset)
-    
-    pygame.display.update()
-    return max_scroll
+
+    panel = (tuple(info) if info else None, scroll_offset)
+    x_panel = ancho_ventana - panel_lateral
+
+    if completo:
+        ventana.fill(BLANCO)
+        # Actualizar las posiciones de los nodos
+        for i, fila in enumerate(grid):
+            for j, nodo in enumerate(fila):
+                nodo.x = offset_x + (j * ancho_nodo)
+                nodo.y = offset_y + (i * ancho_nodo)
+                nodo.ancho = ancho_nodo
+                nodo.dibujar(ventana)
+
+        # Dibujar el grid
+        for i in range(filas + 1):
+            pygame.draw.line(ventana, GRIS, 
+                            (offset_x + i * ancho_nodo, offset_y),
+                            (offset_x + i * ancho_nodo, offset_y + filas * ancho_nodo), 1)
+            pygame.draw.line(ventana, GRIS,
+                            (offset_x, offset_y + i * ancho_nodo),
+                            (offset_x + filas * ancho_nodo, offset_y + i * ancho_nodo), 1)
+        
+        # Mostrar panel lateral
+        LIENZO.max_scroll = mostrar_info_lateral(ventana, info, ancho_ventana, alto_ventana, panel_lateral, scroll_offset)
+        pygame.display.update()
+        LIENZO.grid = grid
+        LIENZO.disposicion = disposicion
+        LIENZO.panel = panel
+        LIENZO.sucias.clear()
+        return LIENZO.max_scroll
+
+    rectangulos = []
+    for nodo in LIENZO.sucias:
+        # Fondo de la celda, el nodo y sus líneas superior e izquierda
+        # (las de abajo y la derecha pertenecen a las celdas vecinas)
+        rect = pygame.Rect(nodo.x, nodo.y, nodo.ancho, nodo.ancho)
+        ventana.fill(BLANCO, rect)
+        nodo.dibujar(ventana)
+        pygame.draw.line(ventana, GRIS, (nodo.x, nodo.y), (nodo.x + nodo.ancho, nodo.y), 1)
+        pygame.draw.line(ventana, GRIS, (nodo.x, nodo.y), (nodo.x, nodo.y + nodo.ancho), 1)
+        rectangulos.append(rect)
+    LIENZO.sucias.clear()
+
+    if panel != LIENZO.panel:
+        LIENZO.max_scroll = mostrar_info_lateral(ventana, info, ancho_ventana, alto_ventana, panel_lateral, scroll_offset)
+        LIENZO.panel = panel
+        rectangulos.append(pygame.Rect(x_panel, 0, panel_lateral, alto_ventana))
+
+    if rectangulos:
+        pygame.display.update(rectangulos)
+    return LIENZO.max_scroll
 
 def obtener_click_pos(pos, filas, offset_x, offset_y, ancho_juego):
     x, y = pos
@@ -462,7 +557,7 @@ def obtener_click_pos(pos, filas, offset_x, offset_y, ancho_juego):
         
     return fila, col
 
-def main(ventana, ancho_ventana):
+def main(ventana, ancho_ventana, ruta_traza=None):
     FILAS = 11  # Número de filas por defecto
     alto_ventana = ALTO_VENTANA
     panel_lateral = PANEL_LATERAL
@@ -470,12 +565,24 @@ def main(ventana, ancho_ventana):
 
     inicio = None
     fin = None
+    reproductor = None  # Reproducción de la última búsqueda
+    if ruta_traza:
+        # Revisar una consulta grabada en otra máquina o en producción
+        grid, inicio, fin, reproductor = abrir_traza(ruta_traza, ancho_ventana - panel_lateral)
+        FILAS = len(grid)
     corriendo = True
     info_resultado = None  # Guardar la información del resultado
     scroll_offset = 0  # Desplazamiento del scroll
     max_scroll = 0  # Máximo desplazamiento posible
+    planificador = None  # D* Lite: conserva su estado entre ediciones de paredes
+    paredes_cambiadas = []  # Celdas editadas desde la última replanificación
+    reloj = pygame.time.Clock()
 
     while corriendo:
+        dt = reloj.tick(FPS_OBJETIVO)
+        if reproductor:
+            reproductor.avanzar(dt)
+            info_resultado = reproductor.info()
         # Calcular dimensiones actuales
         ancho_juego = ancho_ventana - panel_lateral
         ancho_nodo = min(ancho_juego, alto_ventana) // FILAS
@@ -488,6 +595,9 @@ def main(ventana, ancho_ventana):
             if event.type == pygame.QUIT:
                 corriendo = False
 
+            if event.type == pygame.VIDEOEXPOSE:
+                LIENZO.invalidar()  # La ventana se volvió a mostrar: repintar todo
+
             if event.type == pygame.VIDEORESIZE:
                 ancho_ventana = event.w
                 alto_ventana = event.h
@@ -511,8 +621,9 @@ def main(ventana, ancho_ventana):
                     elif not fin and nodo != inicio:
                         fin = nodo
                         fin.hacer_fin()
-                    elif nodo != fin and nodo != inicio:
+                    elif nodo != fin and nodo != inicio and not nodo.es_pared():
                         nodo.hacer_pared()
+                        paredes_cambiadas.append(nodo.get_pos())
 
             elif pygame.mouse.get_pressed()[2]:  # Click derecho
                 pos = pygame.mouse.get_pos()
@@ -520,6 +631,8 @@ def main(ventana, ancho_ventana):
                 if resultado[0] is not None:
                     fila, col = resultado
                     nodo = grid[fila][col]
+                    if nodo.es_pared():
+                        paredes_cambiadas.append(nodo.get_pos())
                     nodo.restablecer()
                     if nodo == inicio:
                         inicio = None
@@ -527,23 +640,46 @@ def main(ventana, ancho_ventana):
                         fin = None
 
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_RETURN and inicio and fin:  # Cambiar SPACE por ENTER
-                    for fila in grid:
-                        for nodo in fila:
-                            nodo.actualizar_vecinos(grid)
-
-                    encontrado, caminos_alt, info_final, costo_optimo = algoritmo_a_estrella(
-                        lambda info: dibujar(ventana, grid, FILAS, ancho_ventana, alto_ventana, panel_lateral, info),
-                        grid, inicio, fin)
-                    
-                    if encontrado:
-                        # Guardar la información del resultado para que persista
-                        info_resultado = info_final
+                if event.key in (pygame.K_RETURN, pygame.K_j, pygame.K_a, pygame.K_b, pygame.K_t) and inicio and fin:  # ENTER: A*, J: JPS, A: ARA*, B: bidireccional, T: Theta*
+                    if event.key == pygame.K_j:
+                        buscar, epsilon = jps, 1
+                    elif event.key == pygame.K_a:
+                        buscar, epsilon = ara_estrella, EPSILON_INICIAL
+                    elif event.key == pygame.K_b:
+                        buscar, epsilon = a_estrella_bidireccional, 1
+                    elif event.key == pygame.K_t:
+                        buscar, epsilon = theta_estrella, 1
                     else:
-                        info_resultado = ["No se encontró un camino!"]
+                        buscar, epsilon = a_estrella, EPSILON
+                    resultado_busqueda, traza_actual, info_final = algoritmo_a_estrella(grid, inicio, fin, buscar, epsilon)
+                    reproductor = Reproductor(grid, traza_actual, info_final)
+                    info_resultado = reproductor.info()
+                    if not resultado_busqueda.encontrado:
                         print("\nNo se encontró un camino!")
 
+                elif reproductor and event.key in TECLAS_REPRODUCCION:
+                    reproductor.manejar_tecla(event.key)
+                    info_resultado = reproductor.info()
+
+                if event.key == pygame.K_s and reproductor:  # S: guardar la traza
+                    ruta = f"traza_{reproductor.traza.info['algoritmo']}_{time.strftime('%Y%m%d_%H%M%S')}.npz"
+                    reproductor.traza.guardar(ruta)
+                    print(f"💾 Traza guardada en: {ruta}")
+
+                if event.key == pygame.K_d and inicio and fin:  # D: replanificar con D* Lite
+                    if (planificador is None or planificador.mapa is not inicio.mapa
+                            or planificador.inicio != inicio.get_pos() or planificador.fin != fin.get_pos()):
+                        planificador = DStarLite(inicio.mapa, inicio.get_pos(), fin.get_pos())
+                        resultado_d = planificador.planificar()
+                    else:
+                        # Solo se reparan los nodos afectados por las paredes editadas
+                        resultado_d = planificador.actualizar(paredes_cambiadas)
+                    paredes_cambiadas = []
+                    reproductor = None
+                    info_resultado = mostrar_camino_replanificado(grid, resultado_d)
+
                 if event.key == pygame.K_g:  # Cambiar C por G
+                    reproductor = None
                     inicio = None
                     fin = None
                     info_resultado = None  # Limpiar la información también
@@ -557,6 +693,7 @@ def main(ventana, ancho_ventana):
                     panel_lateral = PANEL_LATERAL
                     ventana = pygame.display.set_mode((ancho_ventana, alto_ventana), pygame.RESIZABLE)
                     grid = crear_grid(FILAS, ancho_ventana - panel_lateral)
+                    reproductor = None
                     inicio = None
                     fin = None
                     info_resultado = None  # Limpiar la información también
@@ -564,4 +701,5 @@ def main(ventana, ancho_ventana):
 
     pygame.quit()
 
-main(VENTANA, ANCHO_VENTANA)
\ No newline at end of file
+if __name__ == "__main__":
+    main(VENTANA, ANCHO_VENTANA, sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
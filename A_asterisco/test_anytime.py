@@ -0,0 +1,37 @@
+import pytest
+
+from anytime import ara_estrella
+from busqueda import Mapa, a_estrella, costo_camino
+from conftest import mapa_aleatorio
+
+
+def mapa_con_paredes(lado, densidad, semilla):
+    celdas = mapa_aleatorio(lado, lado, densidad, semilla)
+    celdas[0, 0] = celdas[-1, -1] = 0
+    return Mapa(celdas=celdas)
+
+
+@pytest.mark.parametrize('presupuesto_ms', [1, 5, 50, None])
+def test_el_costo_es_el_del_camino_devuelto(presupuesto_ms):
+    mapa = mapa_con_paredes(300, 0.2, 3)
+    fin = (299, 299)
+    optimo = a_estrella(mapa, (0, 0), fin, 1)
+    resultado = ara_estrella(mapa, (0, 0), fin, presupuesto_ms=presupuesto_ms)
+    if not resultado.encontrado:
+        # Con un presupuesto tan corto puede no llegar a la primera solución
+        assert presupuesto_ms is not None
+        return
+    assert resultado.camino[0] == (0, 0) and resultado.camino[-1] == fin
+    assert resultado.costo == costo_camino(resultado.camino)
+    assert resultado.costo <= resultado.estadisticas['epsilon'] * optimo.costo + 1e-9
+
+
+def test_sin_presupuesto_llega_al_optimo():
+    for semilla in range(5):
+        mapa = mapa_con_paredes(60, 0.25, semilla)
+        optimo = a_estrella(mapa, (0, 0), (59, 59), 1)
+        resultado = ara_estrella(mapa, (0, 0), (59, 59))
+        assert resultado.encontrado == optimo.encontrado
+        if optimo.encontrado:
+            assert resultado.costo == pytest.approx(optimo.costo)
+            assert resultado.estadisticas['epsilon'] == 1
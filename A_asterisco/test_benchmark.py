@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from benchmark import cargar_consultas, medir, resumir
+from busqueda import a_estrella
+from theta import theta_estrella
+
+
+@pytest.fixture
+def mapa_y_escenario(tmp_path):
+    rng = np.random.default_rng(1)
+    celdas = rng.random((30, 40)) < 0.2
+    celdas[0, 0] = celdas[29, 39] = celdas[5, 30] = celdas[25, 3] = False
+    ruta_mapa = tmp_path / 'prueba.map'
+    filas = [''.join('@' if pared else '.' for pared in fila) for fila in celdas]
+    ruta_mapa.write_text('type octile\nheight 30\nwidth 40\nmap\n' + '\n'.join(filas) + '\n')
+    # El .scen trae x (columna), y (fila) y un óptimo que no es el de A*
+    ruta_scen = tmp_path / 'prueba.map.scen'
+    ruta_scen.write_text('version 1\n'
+                         '0\tprueba.map\t40\t30\t0\t0\t39\t29\t123.5\n'
+                         '0\tprueba.map\t40\t30\t30\t5\t3\t25\t77.25\n')
+    return str(ruta_mapa), str(ruta_scen)
+
+
+def test_usa_el_optimo_del_escenario(mapa_y_escenario):
+    mapa, consultas = cargar_consultas(*mapa_y_escenario, aleatorias=3)
+    assert [optimo for _, _, optimo in consultas] == [123.5, 77.25, None, None, None]
+    filas = medir(mapa, consultas, 'bidireccional', 1.5, medir_memoria=False)
+    assert [fila['referencia'] for fila in filas] == ['escenario'] * 2 + ['a_estrella'] * 3
+    assert [fila['optimo'] for fila in filas[:2]] == [123.5, 77.25]
+    for fila in filas[2:]:
+        assert fila['optimo'] == a_estrella(mapa, tuple(fila['inicio']), tuple(fila['fin']), 1).costo
+
+
+@pytest.mark.parametrize('algoritmo', ['ara_estrella', 'bidireccional', 'jps'])
+def test_la_referencia_no_es_el_propio_resultado(mapa_y_escenario, algoritmo):
+    mapa, consultas = cargar_consultas(mapa_y_escenario[0], aleatorias=20, semilla=3)
+    filas = medir(mapa, consultas, algoritmo, 1, medir_memoria=False)
+    for fila in filas:
+        optimo = a_estrella(mapa, tuple(fila['inicio']), tuple(fila['fin']), 1).costo
+        assert fila['optimo'] == optimo
+        if fila['encontrado']:
+            assert fila['sobrecosto'] == pytest.approx(fila['costo'] / optimo - 1)
+    assert resumir(filas)['sobrecosto_medio'] >= -1e-9
+
+
+def test_theta_contra_su_propia_metrica(mapa_y_escenario):
+    mapa, consultas = cargar_consultas(*mapa_y_escenario, aleatorias=10, semilla=4)
+    filas = medir(mapa, consultas, 'theta', 1.5, medir_memoria=False)
+    for fila in filas:
+        assert fila['referencia'] == 'theta_estrella'
+        assert fila['optimo'] == theta_estrella(mapa, tuple(fila['inicio']), tuple(fila['fin']), 1).costo
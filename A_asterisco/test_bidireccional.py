@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from bidireccional import a_estrella_bidireccional
+from busqueda import Mapa, MapaBits, a_estrella
+from conftest import comprobar_legal, consultas, mapa_aleatorio
+
+
+@pytest.mark.parametrize('epsilon', [1, 1.2, 2])
+@pytest.mark.parametrize('densidad', [0, 0.15, 0.3])
+def test_legal_y_acotado(epsilon, densidad):
+    celdas = mapa_aleatorio(45, 60, densidad, 3)
+    mapa = Mapa(celdas=celdas)
+    for inicio, fin in consultas(celdas, 40, 3):
+        optimo = a_estrella(mapa, inicio, fin, 1)
+        resultado = a_estrella_bidireccional(mapa, inicio, fin, epsilon)
+        assert resultado.encontrado == optimo.encontrado
+        if not resultado.encontrado:
+            continue
+        assert comprobar_legal(celdas, inicio, fin, resultado.camino) == pytest.approx(resultado.costo)
+        if epsilon == 1:
+            assert resultado.costo == pytest.approx(optimo.costo)
+        else:
+            assert optimo.costo - 1e-9 <= resultado.costo <= epsilon * optimo.costo + 1e-9
+
+
+def test_inicio_igual_al_fin():
+    mapa = Mapa(celdas=np.zeros((5, 5), dtype=np.uint8))
+    resultado = a_estrella_bidireccional(mapa, (2, 2), (2, 2), 1)
+    assert resultado.encontrado and resultado.camino == [(2, 2)] and resultado.costo == 0
+
+
+def test_mapa_bits_igual_que_mapa():
+    celdas = mapa_aleatorio(30, 41, 0.2, 4)
+    mapa = Mapa(celdas=celdas)
+    bits = MapaBits.desde_mapa(mapa)
+    for inicio, fin in consultas(celdas, 15, 4):
+        assert a_estrella_bidireccional(mapa, inicio, fin, 1).camino == \
+            a_estrella_bidireccional(bits, inicio, fin, 1).camino
@@ -0,0 +1,186 @@
+import heapq
+import math
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from busqueda import MOVIMIENTOS, Mapa, MapaBits, ResultadoBusqueda, a_estrella, h, vecinos
+from conftest import comprobar_legal, consultas, mapa_aleatorio
+
+
+def movimientos_validos(celdas, fila, col):
+    """Referencia directa sobre las celdas, sin máscaras"""
+    filas, cols = celdas.shape
+    if celdas[fila, col]:
+        return []
+    validos = []
+    for delta_f, delta_c, costo in MOVIMIENTOS:
+        f, c = fila + delta_f, col + delta_c
+        if not (0 <= f < filas and 0 <= c < cols) or celdas[f, c]:
+            continue
+        if delta_f and delta_c and (celdas[f, col] or celdas[fila, c]):
+            continue
+        validos.append(((f, c), costo))
+    return validos
+
+
+def dijkstra(celdas, inicio, fin):
+    distancia = {inicio: 0}
+    abiertos = [(0, inicio)]
+    while abiertos:
+        d, actual = heapq.heappop(abiertos)
+        if actual == fin:
+            return d
+        if d > distancia[actual]:
+            continue
+        for vecino, costo in movimientos_validos(celdas, *actual):
+            if d + costo < distancia.get(vecino, math.inf):
+                distancia[vecino] = d + costo
+                heapq.heappush(abiertos, (d + costo, vecino))
+    return None
+
+
+def a_estrella_diccionarios(celdas, inicio, fin, epsilon):
+    """La búsqueda sobre posiciones y diccionarios de antes de los ids planos"""
+    cuenta = 0
+    abiertos = [(0, cuenta, inicio)]
+    vino_de = {}
+    g_score = {inicio: 0}
+    cerrados = set()
+    while abiertos:
+        actual = heapq.heappop(abiertos)[2]
+        if actual in cerrados:
+            continue
+        if actual == fin:
+            camino = [actual]
+            while camino[-1] in vino_de:
+                camino.append(vino_de[camino[-1]])
+            return camino[::-1], g_score[fin]
+        cerrados.add(actual)
+        for vecino, costo in movimientos_validos(celdas, *actual):
+            g = g_score[actual] + costo
+            if g < g_score.get(vecino, math.inf):
+                vino_de[vecino] = actual
+                g_score[vecino] = g
+                cerrados.discard(vecino)
+                cuenta += 1
+                heapq.heappush(abiertos, (g + epsilon * h(vecino, fin), cuenta, vecino))
+    return [], 0
+
+
+def test_sin_pygame():
+    # El núcleo se puede usar sin ventana: importarlo no carga pygame
+    codigo = "import sys, busqueda; sys.exit('pygame' in sys.modules)"
+    subprocess.run([sys.executable, '-c', codigo], cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+
+
+@pytest.mark.parametrize('semilla', range(3))
+def test_a_estrella_optimo_y_legal(semilla):
+    celdas = mapa_aleatorio(30, 30, 0.25, semilla)
+    for inicio, fin in consultas(celdas, 25, semilla):
+        esperado = dijkstra(celdas, inicio, fin)
+        resultado = a_estrella(celdas, inicio, fin, 1)
+        assert isinstance(resultado, ResultadoBusqueda)
+        assert resultado.encontrado == (esperado is not None)
+        if not resultado.encontrado:
+            assert resultado.camino == []
+            continue
+        assert resultado.costo == pytest.approx(esperado)
+        assert comprobar_legal(celdas, inicio, fin, resultado.camino) == pytest.approx(resultado.costo)
+        # Con peso en la heurística el costo queda acotado por epsilon
+        acotado = a_estrella(celdas, inicio, fin, 1.5)
+        assert comprobar_legal(celdas, inicio, fin, acotado.camino) <= 1.5 * esperado + 1e-9
+
+
+def test_observador_ve_cada_nodo_abierto_y_cerrado():
+    celdas = mapa_aleatorio(25, 25, 0.2, 7)
+    celdas[0, 0] = celdas[24, 24] = 0
+    eventos = []
+    resultado = a_estrella(celdas, (0, 0), (24, 24), observador=lambda *evento: eventos.append(evento))
+    estadisticas = resultado.estadisticas
+    assert sum(evento == 'abierto' for evento, *_ in eventos) == estadisticas['generados']
+    # El inicio se expande sin avisar al observador
+    assert sum(evento == 'cerrado' for evento, *_ in eventos) == estadisticas['expandidos'] - 1
+    for evento, pos, g, h in eventos:
+        assert celdas[pos] == 0 and g >= 0 and h >= 0
+
+
+@pytest.mark.parametrize('epsilon', [1, 1.2])
+def test_ids_planos_igual_que_diccionarios(epsilon):
+    # Mismos desempates: el mismo camino, no solo el mismo costo
+    celdas = mapa_aleatorio(35, 28, 0.25, 3)
+    mapa = Mapa(celdas=celdas)
+    listas = (celdas == 1).tolist()
+    for inicio, fin in consultas(celdas, 30, 3):
+        camino, costo = a_estrella_diccionarios(celdas, inicio, fin, epsilon)
+        resultado = a_estrella(mapa, inicio, fin, epsilon)
+        assert resultado.camino == camino
+        assert resultado.costo == costo
+        assert a_estrella(listas, inicio, fin, epsilon).camino == camino
+
+
+def test_mapa_ids_y_paredes():
+    mapa = Mapa(4, 7)
+    assert mapa.celdas.dtype == np.uint8 and mapa.celdas.shape == (4, 7)
+    for id_nodo in range(4 * 7):
+        assert mapa.id(*mapa.pos(id_nodo)) == id_nodo
+    mapa.poner_pared(2, 5)
+    assert mapa.es_pared(2, 5) and mapa.celdas[2, 5] == 1
+    mapa.poner_pared(2, 5, False)
+    assert not mapa.es_pared(2, 5)
+
+
+def test_memoria_reutilizada_entre_busquedas():
+    # Las marcas de generación invalidan lo que dejó la búsqueda anterior:
+    # buscar muchas veces sobre el mismo mapa (y después de editarlo) da lo
+    # mismo que buscar en un mapa recién creado
+    celdas = mapa_aleatorio(30, 40, 0.25, 11)
+    mapa = Mapa(celdas=celdas.copy())
+    memoria = mapa.memoria()
+    rng = np.random.default_rng(11)
+    for ronda in range(4):
+        generacion = memoria.generacion
+        pares = consultas(mapa.celdas, 15, ronda)
+        for inicio, fin in pares:
+            resultado = a_estrella(mapa, inicio, fin, 1)
+            nuevo = a_estrella(Mapa(celdas=mapa.celdas.copy()), inicio, fin, 1)
+            assert (resultado.encontrado, resultado.camino, resultado.costo) == \
+                (nuevo.encontrado, nuevo.camino, nuevo.costo)
+        assert mapa.memoria() is memoria
+        assert memoria.generacion == generacion + len(pares)
+        for fila, col in rng.integers(0, 30, (20, 2)):
+            mapa.poner_pared(int(fila), int(col), not mapa.es_pared(int(fila), int(col)))
+
+
+def comprobar_vecinos(mapa, celdas):
+    for fila in range(mapa.filas):
+        for col in range(mapa.cols):
+            obtenidos = sorted((mapa.pos(n), costo) for n, costo in vecinos(mapa, mapa.id(fila, col)))
+            assert obtenidos == sorted(movimientos_validos(celdas, fila, col))
+
+
+def test_vecinos_desde_la_mascara():
+    celdas = mapa_aleatorio(17, 23, 0.3, 0)
+    comprobar_vecinos(Mapa(celdas=celdas), celdas)
+    comprobar_vecinos(MapaBits.desde_mapa(Mapa(celdas=celdas)), celdas)
+
+
+def test_poner_pared_igual_que_recalcular():
+    celdas = mapa_aleatorio(20, 31, 0.2, 1)
+    mapa = Mapa(celdas=celdas.copy())
+    bits = MapaBits.desde_mapa(mapa)
+    rng = np.random.default_rng(1)
+    # Incluye bordes y esquinas, donde la vecindad se recorta
+    cambios = [(0, 0), (19, 30), (0, 15), (10, 0)] + [(int(f), int(c)) for f, c in rng.integers(0, 20, (80, 2))]
+    for fila, col in cambios:
+        pared = not mapa.es_pared(fila, col)
+        mapa.poner_pared(fila, col, pared)
+        bits.poner_pared(fila, col, pared)
+        celdas[fila, col] = pared
+    np.testing.assert_array_equal(mapa.celdas, celdas)
+    np.testing.assert_array_equal(mapa.vecindad, Mapa(celdas=celdas).vecindad)
+    comprobar_vecinos(mapa, celdas)
+    comprobar_vecinos(bits, celdas)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from busqueda import Mapa, MapaBits, a_estrella
+from cache_caminos import CacheCaminos
+from conftest import consultas, mapa_aleatorio
+
+
+def comprobar_igual_que_buscar_despues_de_editar(mapa, celdas):
+    cache = CacheCaminos(mapa, capacidad=50)
+    rng = np.random.default_rng(4)
+    pares = consultas(celdas, 20, 4)
+    usadas = {p for par in pares for p in par}
+    for ronda in range(5):
+        for inicio, fin in pares:
+            resultado = cache.buscar(inicio, fin)
+            directo = a_estrella(mapa, inicio, fin, cache.epsilon)
+            assert resultado.encontrado == directo.encontrado
+            if resultado.encontrado:
+                # Un camino guardado sigue valiendo: mismo costo o dentro de la cota
+                optimo = a_estrella(mapa, inicio, fin, 1).costo
+                assert resultado.costo <= cache.epsilon * optimo + 1e-9
+                for fila, col in resultado.camino:
+                    assert not mapa.es_pared(fila, col)
+        # Editar celdas que no son inicio ni fin de ninguna consulta
+        for fila, col in rng.integers(0, 40, (6, 2)):
+            fila, col = int(fila), int(col)
+            if (fila, col) not in usadas:
+                cache.poner_pared(fila, col, not mapa.es_pared(fila, col))
+    assert cache.aciertos > 0
+
+
+def test_igual_que_buscar_despues_de_editar():
+    celdas = mapa_aleatorio(40, 45, 0.2, 4)
+    comprobar_igual_que_buscar_despues_de_editar(Mapa(celdas=celdas.copy()), celdas)
+
+
+def test_mapa_bits_igual_que_buscar_despues_de_editar():
+    celdas = mapa_aleatorio(40, 45, 0.2, 4)
+    comprobar_igual_que_buscar_despues_de_editar(MapaBits.desde_mapa(Mapa(celdas=celdas.copy())), celdas)
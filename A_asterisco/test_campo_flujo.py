@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+import pytest
+
+from busqueda import Mapa, a_estrella
+from campo_flujo import SIN_DIRECCION, CampoFlujo
+from conftest import celdas_libres, comprobar_legal, mapa_aleatorio
+from landmarks import grafo_disperso
+
+
+@pytest.mark.parametrize('semilla', range(3))
+def test_costos_y_caminos_como_a_estrella(semilla):
+    celdas = mapa_aleatorio(40, 55, 0.25, semilla)
+    mapa = Mapa(celdas=celdas)
+    fin = celdas_libres(celdas, 1, semilla)[0]
+    campo = CampoFlujo(mapa, fin)
+    for inicio in celdas_libres(celdas, 40, semilla + 100):
+        optimo = a_estrella(mapa, inicio, fin, 1)
+        resultado = campo.camino(inicio)
+        assert resultado.encontrado == optimo.encontrado
+        if not optimo.encontrado:
+            assert campo.costo[inicio] == math.inf
+            assert campo.siguiente(inicio) is None
+            continue
+        assert campo.costo[inicio] == pytest.approx(optimo.costo)
+        assert comprobar_legal(celdas, inicio, fin, resultado.camino) == pytest.approx(optimo.costo)
+
+
+def test_paredes_y_fin_sin_direccion():
+    celdas = mapa_aleatorio(20, 20, 0.3, 4)
+    celdas[10, 10] = 0
+    campo = CampoFlujo(Mapa(celdas=celdas), (10, 10))
+    assert campo.costo[10, 10] == 0
+    assert campo.siguiente((10, 10)) is None
+    assert (campo.direccion[celdas == 1] == SIN_DIRECCION).all()
+    assert np.isinf(campo.costo[celdas == 1]).all()
+
+
+def test_grafo_compartido_entre_fines():
+    celdas = mapa_aleatorio(30, 30, 0.2, 5)
+    mapa = Mapa(celdas=celdas)
+    grafo = grafo_disperso(mapa)
+    for fin in celdas_libres(celdas, 3, 5):
+        compartido = CampoFlujo(mapa, fin, grafo=grafo)
+        propio = CampoFlujo(mapa, fin)
+        np.testing.assert_array_equal(compartido.costo, propio.costo)
+        np.testing.assert_array_equal(compartido.direccion, propio.direccion)
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from busqueda import Mapa, MapaBits, a_estrella, costo_camino
+from conftest import comprobar_legal, consultas, mapa_aleatorio
+from jerarquico import MapaJerarquico
+
+
+@pytest.mark.parametrize('semilla', range(4))
+def test_caminos_legales_y_casi_optimos(semilla):
+    # Tamaños que no son múltiplo del cluster: los del borde son más chicos
+    celdas = mapa_aleatorio(70, 53, 0.2, semilla)
+    mapa = Mapa(celdas=celdas)
+    jerarquia = MapaJerarquico(mapa, tam_cluster=8)
+    sobrecostos = []
+    for inicio, fin in consultas(celdas, 30, semilla):
+        optimo = a_estrella(mapa, inicio, fin, 1)
+        resultado = jerarquia.buscar(inicio, fin)
+        assert resultado.encontrado == optimo.encontrado
+        if not resultado.encontrado:
+            continue
+        comprobar_legal(celdas, inicio, fin, resultado.camino)
+        assert resultado.costo == pytest.approx(costo_camino(resultado.camino))
+        # Casi óptimo: ir hasta una entrada y volver (a lo sumo un cluster de
+        # ida y otro de vuelta) pesa más en caminos cortos
+        assert optimo.costo - 1e-9 <= resultado.costo <= 1.5 * optimo.costo + 2 * jerarquia.tam
+        sobrecostos.append(resultado.costo / max(optimo.costo, 1))
+        abstracto = jerarquia.buscar(inicio, fin, refinar=False)
+        assert abstracto.costo == resultado.costo
+        assert abstracto.camino == resultado.estadisticas['camino_abstracto']
+    assert np.mean(sobrecostos) < 1.2
+
+
+def test_sin_paredes_encuentra_todo():
+    celdas = np.zeros((40, 40), dtype=np.uint8)
+    jerarquia = MapaJerarquico(Mapa(celdas=celdas), tam_cluster=8)
+    for inicio, fin in consultas(celdas, 30, 0):
+        resultado = jerarquia.buscar(inicio, fin)
+        assert resultado.encontrado
+        comprobar_legal(celdas, inicio, fin, resultado.camino)
+
+
+def test_actualizar_igual_que_reconstruir():
+    celdas = mapa_aleatorio(48, 48, 0.15, 5)
+    mapa = Mapa(celdas=celdas)
+    jerarquia = MapaJerarquico(mapa, tam_cluster=8)
+    pares = consultas(celdas, 20, 5)
+    for inicio, fin in pares:
+        jerarquia.buscar(inicio, fin)  # Deja enlaces guardados
+
+    rng = np.random.default_rng(5)
+    cambios = [tuple(int(x) for x in p) for p in rng.integers(0, 48, (30, 2))]
+    cambios = [p for p in cambios if p not in {q for par in pares for q in par}]
+    for fila, col in cambios:
+        mapa.poner_pared(fila, col, not mapa.celdas[fila, col])
+    jerarquia.actualizar(cambios)
+
+    nueva = MapaJerarquico(mapa, tam_cluster=8)
+    assert jerarquia.grafo == nueva.grafo
+    for inicio, fin in pares:
+        resultado = jerarquia.buscar(inicio, fin)
+        assert resultado.encontrado == nueva.buscar(inicio, fin).encontrado
+        if resultado.encontrado:
+            comprobar_legal(mapa.celdas, inicio, fin, resultado.camino)
+
+
+def test_mapa_bits_igual_que_mapa():
+    celdas = mapa_aleatorio(40, 37, 0.2, 9)
+    mapa = Mapa(celdas=celdas)
+    bits = MapaBits.desde_mapa(mapa)
+    jerarquia, jerarquia_bits = MapaJerarquico(mapa, 8), MapaJerarquico(bits, 8)
+    assert jerarquia.grafo == jerarquia_bits.grafo
+    for inicio, fin in consultas(celdas, 10, 9):
+        assert jerarquia.buscar(inicio, fin).camino == jerarquia_bits.buscar(inicio, fin).camino
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from busqueda import Mapa, MapaBits, a_estrella
+from conftest import comprobar_legal, consultas, mapa_aleatorio
+from jps import expandir_camino, jps
+
+
+@pytest.mark.parametrize('densidad', [0, 0.1, 0.3])
+def test_optimo_y_legal(densidad):
+    celdas = mapa_aleatorio(45, 60, densidad, 2)
+    mapa = Mapa(celdas=celdas)
+    for inicio, fin in consultas(celdas, 40, 2):
+        optimo = a_estrella(mapa, inicio, fin, 1)
+        resultado = jps(mapa, inicio, fin)
+        assert resultado.encontrado == optimo.encontrado
+        if not resultado.encontrado:
+            continue
+        assert comprobar_legal(celdas, inicio, fin, resultado.camino) == pytest.approx(resultado.costo)
+        assert resultado.costo == pytest.approx(optimo.costo)
+        assert expandir_camino(resultado.estadisticas['puntos_salto']) == resultado.camino
+
+
+def test_epsilon_acota_el_costo():
+    celdas = mapa_aleatorio(50, 50, 0.2, 6)
+    mapa = Mapa(celdas=celdas)
+    for inicio, fin in consultas(celdas, 30, 6):
+        optimo = a_estrella(mapa, inicio, fin, 1)
+        resultado = jps(mapa, inicio, fin, 1.5)
+        if resultado.encontrado:
+            comprobar_legal(celdas, inicio, fin, resultado.camino)
+            assert resultado.costo <= 1.5 * optimo.costo + 1e-9
+
+
+def test_sin_camino():
+    celdas = np.zeros((6, 6), dtype=np.uint8)
+    celdas[:, 3] = 1
+    resultado = jps(Mapa(celdas=celdas), (0, 0), (5, 5))
+    assert not resultado.encontrado and resultado.camino == []
+
+
+def test_mapa_bits_igual_que_mapa():
+    celdas = mapa_aleatorio(33, 70, 0.2, 8)
+    mapa = Mapa(celdas=celdas)
+    bits = MapaBits.desde_mapa(mapa)
+    for inicio, fin in consultas(celdas, 20, 8):
+        assert jps(mapa, inicio, fin).camino == jps(bits, inicio, fin).camino
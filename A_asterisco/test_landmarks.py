@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from busqueda import Mapa, a_estrella
+from conftest import consultas, mapa_aleatorio
+from landmarks import ESCALA, Landmarks
+
+
+def test_milesimas_exactas_por_debajo_de_2_a_la_14():
+    milesimas = np.arange(2 ** 14 * ESCALA - 5000, 2 ** 14 * ESCALA)
+    guardadas = (milesimas / ESCALA).astype(np.float32).astype(np.float64)
+    np.testing.assert_array_equal(np.round(guardadas * ESCALA), milesimas)
+    # Desde 2**14 float32 ya no distingue milésimas
+    milesimas = np.arange(2 ** 14 * ESCALA, 2 ** 14 * ESCALA + 5000)
+    guardadas = (milesimas / ESCALA).astype(np.float32).astype(np.float64)
+    assert (np.round(guardadas * ESCALA) != milesimas).any()
+
+
+@pytest.mark.parametrize('maxima, exactas', [(2 ** 14 - 0.001, True), (2 ** 14, False)])
+def test_limite_de_exactas(maxima, exactas):
+    mapa = Mapa(celdas=np.zeros((1, 2), dtype=np.uint8))
+    landmarks = Landmarks(mapa, [0], np.array([[0.0], [maxima]]))
+    assert landmarks.exactas == exactas
+    assert landmarks.margen == (0.0 if exactas else pytest.approx(2 * maxima * 2.0 ** -23))
+
+
+@pytest.mark.parametrize('semilla', range(3))
+def test_optimo_con_landmarks(semilla, tmp_path):
+    celdas = mapa_aleatorio(50, 60, 0.25, semilla)
+    mapa = Mapa(celdas=celdas)
+    ruta = str(tmp_path / 'mapa.landmarks.npz')
+    landmarks = Landmarks.cargar_o_calcular(mapa, ruta, k=4)
+    assert Landmarks.cargar_o_calcular(mapa, ruta, k=4).ids.tolist() == landmarks.ids.tolist()
+    expandidos = {'octile': 0, 'alt': 0}
+    for inicio, fin in consultas(celdas, 20, semilla):
+        octile = a_estrella(mapa, inicio, fin, 1)
+        alt = a_estrella(mapa, inicio, fin, 1, heuristica=landmarks.heuristica(fin))
+        assert alt.encontrado == octile.encontrado
+        assert alt.costo == pytest.approx(octile.costo)
+        expandidos['octile'] += octile.estadisticas['expandidos']
+        expandidos['alt'] += alt.estadisticas['expandidos']
+    assert expandidos['alt'] < expandidos['octile']
@@ -0,0 +1,42 @@
+import pytest
+
+from busqueda import Mapa
+from conftest import mapa_aleatorio
+from lotes import ALGORITMOS, buscar_lote, consultas_aleatorias
+
+
+@pytest.fixture(scope='module')
+def mapa():
+    return Mapa(celdas=mapa_aleatorio(60, 80, 0.25, 0))
+
+
+@pytest.mark.parametrize('algoritmo', sorted(ALGORITMOS))
+def test_procesos_igual_que_secuencial(mapa, algoritmo):
+    consultas = consultas_aleatorias(mapa, 24, semilla=1)
+    secuencial = [ALGORITMOS[algoritmo](mapa, inicio, fin, 1.2) for inicio, fin in consultas]
+    # Bloques de 5: el último queda incompleto y el orden se reconstruye
+    resultados = buscar_lote(mapa, consultas, procesos=2, algoritmo=algoritmo, epsilon=1.2, tam_bloque=5)
+    assert len(resultados) == len(consultas)
+    for esperado, resultado in zip(secuencial, resultados):
+        assert resultado.encontrado == esperado.encontrado
+        assert resultado.camino == esperado.camino
+        assert resultado.costo == esperado.costo
+
+
+def test_un_proceso_sin_pool(mapa):
+    consultas = consultas_aleatorias(mapa, 5, semilla=2)
+    resultados = buscar_lote(mapa, consultas, procesos=1, epsilon=1)
+    assert [r.camino for r in resultados] == [ALGORITMOS['a_estrella'](mapa, a, b, 1).camino
+                                              for a, b in consultas]
+
+
+def test_consultas_aleatorias_en_celdas_libres(mapa):
+    consultas = consultas_aleatorias(mapa, 50, semilla=3)
+    assert consultas == consultas_aleatorias(mapa, 50, semilla=3)
+    for inicio, fin in consultas:
+        assert not mapa.es_pared(*inicio) and not mapa.es_pared(*fin)
+
+
+def test_algoritmo_desconocido(mapa):
+    with pytest.raises(ValueError):
+        buscar_lote(mapa, [((0, 0), (1, 1))], algoritmo='dijkstra')
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+import mapas
+from busqueda import Mapa, MapaBits, a_estrella
+from conftest import consultas, mapa_aleatorio
+from mapas import abrir_bits, cargar_ascii, cargar_grande, cargar_npy, cargar_png, guardar_bits
+
+
+@pytest.fixture
+def celdas():
+    # 13 columnas: la última fila de bits lleva relleno
+    return mapa_aleatorio(37, 13, 0.3, 0)
+
+
+@pytest.fixture(autouse=True)
+def bloques_chicos(monkeypatch):
+    # Varios bloques por mapa, el último incompleto
+    monkeypatch.setattr(mapas, 'FILAS_POR_BLOQUE', 8)
+
+
+def escribir_ascii(ruta, celdas, encabezado=False):
+    filas = [''.join('@' if pared else '.' for pared in fila) for fila in celdas]
+    if encabezado:
+        filas = ['type octile', f'height {len(celdas)}', f'width {len(celdas[0])}', 'map'] + filas
+    ruta.write_text('\n'.join(filas) + '\n')
+    return str(ruta)
+
+
+@pytest.mark.parametrize('encabezado', [False, True])
+@pytest.mark.parametrize('en_disco', [False, True])
+def test_ascii(tmp_path, celdas, encabezado, en_disco):
+    ruta = escribir_ascii(tmp_path / 'mapa.txt', celdas, encabezado)
+    destino = str(tmp_path / 'mapa.bits') if en_disco else None
+    mapa = cargar_ascii(ruta, destino)
+    assert isinstance(mapa, MapaBits)
+    np.testing.assert_array_equal(mapa.a_mapa().celdas, celdas)
+    if en_disco:
+        np.testing.assert_array_equal(abrir_bits(destino).a_mapa().celdas, celdas)
+
+
+def test_ascii_filas_cortas_son_pared(tmp_path):
+    ruta = tmp_path / 'mapa.txt'
+    ruta.write_text('...\n.\n. 0G\n')
+    esperado = [[0, 0, 0, 1], [0, 1, 1, 1], [0, 0, 0, 0]]
+    np.testing.assert_array_equal(cargar_ascii(str(ruta)).a_mapa().celdas, esperado)
+
+
+def test_npy(tmp_path, celdas):
+    ruta = str(tmp_path / 'mapa.npy')
+    np.save(ruta, celdas * 7)
+    np.testing.assert_array_equal(cargar_npy(ruta).a_mapa().celdas, celdas)
+    np.save(ruta, np.zeros(5))
+    with pytest.raises(ValueError):
+        cargar_npy(ruta)
+
+
+def test_png(tmp_path, celdas):
+    Image = pytest.importorskip('PIL.Image')
+    limite = Image.MAX_IMAGE_PIXELS
+    ruta = str(tmp_path / 'mapa.png')
+    Image.fromarray(np.where(celdas == 1, 20, 230).astype(np.uint8)).save(ruta)
+    np.testing.assert_array_equal(cargar_png(ruta).a_mapa().celdas, celdas)
+    np.testing.assert_array_equal(cargar_grande(ruta).a_mapa().celdas, celdas)
+    # El límite de Pillow queda como estaba
+    assert Image.MAX_IMAGE_PIXELS == limite
+
+
+def test_bits_ida_y_vuelta(tmp_path, celdas):
+    ruta = str(tmp_path / 'mapa.bits')
+    guardar_bits(Mapa(celdas=celdas), ruta)
+    np.testing.assert_array_equal(cargar_grande(ruta).a_mapa().celdas, celdas)
+    # Abierto para escribir, los cambios quedan en el archivo
+    mapa = abrir_bits(ruta, escritura=True)
+    mapa.poner_pared(0, 0, True)
+    mapa.poner_pared(36, 12, False)
+    mapa.bits.flush()
+    del mapa
+    esperado = celdas.copy()
+    esperado[0, 0], esperado[36, 12] = 1, 0
+    np.testing.assert_array_equal(abrir_bits(ruta).a_mapa().celdas, esperado)
+
+
+def test_bits_firma_invalida(tmp_path):
+    ruta = tmp_path / 'otro.bits'
+    ruta.write_bytes(b'NOESBITS' + bytes(16))
+    with pytest.raises(ValueError):
+        abrir_bits(str(ruta))
+
+
+def test_a_estrella_igual_en_mapa_bits(tmp_path, celdas):
+    mapa = Mapa(celdas=celdas)
+    bits = cargar_ascii(escribir_ascii(tmp_path / 'mapa.txt', celdas))
+    for inicio, fin in consultas(celdas, 20, 1):
+        esperado = a_estrella(mapa, inicio, fin, 1)
+        resultado = a_estrella(bits, inicio, fin, 1)
+        assert resultado.encontrado == esperado.encontrado
+        assert resultado.camino == esperado.camino
+        assert resultado.costo == esperado.costo
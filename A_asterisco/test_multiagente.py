@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from busqueda import Mapa
+from multiagente import PlanificadorCooperativo, agentes_aleatorios, contar_conflictos
+
+
+def mapas_densos(cantidad):
+    """Mapas chicos con 25% de paredes y muchos agentes: donde más se choca"""
+    for semilla in range(cantidad):
+        rng = np.random.default_rng(semilla)
+        lado = int(rng.integers(5, 12))
+        celdas = (rng.random((lado, lado)) < 0.25).astype(np.uint8)
+        libres = int((celdas == 0).sum())
+        if libres < 4:
+            continue
+        mapa = Mapa(celdas=celdas)
+        yield celdas, mapa, agentes_aleatorios(mapa, int(rng.integers(2, max(3, libres // 3))), semilla=semilla)
+
+
+def comprobar_legal(celdas, agentes, resultados):
+    for (inicio, fin), resultado in zip(agentes, resultados):
+        camino = [tuple(p) for p in resultado.camino]
+        assert camino[0] == tuple(inicio)
+        assert resultado.encontrado == (camino[-1] == tuple(fin))
+        for a, b in zip(camino, camino[1:]):
+            assert max(abs(a[0] - b[0]), abs(a[1] - b[1])) <= 1
+            assert celdas[b] == 0
+            if a[0] != b[0] and a[1] != b[1]:
+                assert celdas[a[0], b[1]] == 0 and celdas[b[0], a[1]] == 0
+
+
+@pytest.mark.parametrize('ventana', [None, 4, 8])
+def test_sin_conflictos_en_mapas_densos(ventana):
+    for celdas, mapa, agentes in mapas_densos(120):
+        resultados = PlanificadorCooperativo(mapa, ventana=ventana).planificar(agentes)
+        comprobar_legal(celdas, agentes, resultados)
+        assert contar_conflictos([r.camino for r in resultados]) == 0
+
+
+def test_quien_no_llega_se_queda_en_su_inicio():
+    # El agente 1 no se mueve del medio del pasillo y tapa al agente 0
+    celdas = np.zeros((1, 3), dtype=np.uint8)
+    agentes = [((0, 0), (0, 2)), ((0, 1), (0, 1))]
+    resultados = PlanificadorCooperativo(Mapa(celdas=celdas)).planificar(agentes)
+    assert not resultados[0].encontrado
+    assert resultados[0].camino == [(0, 0)]
+    assert resultados[1].encontrado
+    assert contar_conflictos([r.camino for r in resultados]) == 0
+
+
+@pytest.mark.parametrize('ventana', [None, 4])
+@pytest.mark.parametrize('agentes', [[((0, 0), (0, 2)), ((0, 0), (1, 2))], [((0, 0), (1, 2)), ((1, 0), (1, 2))]])
+def test_inicios_o_fines_repetidos(ventana, agentes):
+    planificador = PlanificadorCooperativo(Mapa(celdas=np.zeros((2, 3), dtype=np.uint8)), ventana=ventana)
+    with pytest.raises(ValueError, match='Los agentes 0 y 1'):
+        planificador.planificar(agentes)
+
+
+def test_contar_conflictos_cuenta_cruces_en_diagonal():
+    assert contar_conflictos([[(0, 0), (1, 1)], [(1, 1), (0, 0)]]) == 1
+    assert contar_conflictos([[(0, 0), (0, 1)], [(0, 1), (0, 0)]]) == 1
+    assert contar_conflictos([[(0, 0), (1, 1)], [(1, 1), (1, 1)]]) == 1
+    assert contar_conflictos([[(0, 0), (0, 1)], [(1, 0), (1, 1)]]) == 0
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from busqueda import Mapa, MapaBits, a_estrella
+from conftest import comprobar_legal, mapa_aleatorio
+from replanificacion import DStarLite
+
+
+def mapa_con_esquinas_libres(lado, densidad, semilla):
+    celdas = mapa_aleatorio(lado, lado, densidad, semilla)
+    celdas[0, 0] = celdas[-1, -1] = 0
+    return Mapa(celdas=celdas)
+
+
+def comprobar_igual_que_a_estrella(mapa, inicio, fin, resultado):
+    optimo = a_estrella(mapa, inicio, fin, 1)
+    assert resultado.encontrado == optimo.encontrado
+    if resultado.encontrado:
+        assert resultado.costo == pytest.approx(optimo.costo)
+        assert comprobar_legal(mapa.celdas, inicio, fin, resultado.camino) == pytest.approx(resultado.costo)
+
+
+@pytest.mark.parametrize('semilla', range(4))
+def test_actualizar_igual_que_a_estrella(semilla):
+    mapa = mapa_con_esquinas_libres(40, 0.2, semilla)
+    inicio, fin = (0, 0), (39, 39)
+    planificador = DStarLite(mapa, inicio, fin)
+    comprobar_igual_que_a_estrella(mapa, inicio, fin, planificador.planificar())
+
+    rng = np.random.default_rng(semilla)
+    for _ in range(15):
+        # Poner y quitar paredes, varias por tanda
+        cambios = [(int(f), int(c)) for f, c in rng.integers(0, 40, (5, 2))]
+        cambios = [p for p in cambios if p not in (inicio, fin)]
+        for fila, col in cambios:
+            mapa.poner_pared(fila, col, not mapa.es_pared(fila, col))
+        comprobar_igual_que_a_estrella(mapa, inicio, fin, planificador.actualizar(cambios))
+
+
+def test_mover_inicio_y_actualizar():
+    mapa = mapa_con_esquinas_libres(50, 0.2, 7)
+    inicio, fin = (0, 0), (49, 49)
+    planificador = DStarLite(mapa, inicio, fin)
+    resultado = planificador.planificar()
+    rng = np.random.default_rng(7)
+    while resultado.encontrado and len(resultado.camino) > 1:
+        # El agente avanza unos pasos y a veces aparece una pared más adelante
+        inicio = resultado.camino[min(3, len(resultado.camino) - 1)]
+        planificador.mover_inicio(inicio)
+        cambios = []
+        if len(resultado.camino) > 8 and rng.random() < 0.7 and resultado.camino[6] != fin:
+            cambios = [resultado.camino[6]]
+            mapa.poner_pared(*cambios[0])
+        resultado = planificador.actualizar(cambios)
+        comprobar_igual_que_a_estrella(mapa, inicio, fin, resultado)
+
+
+def test_inicio_encerrado():
+    mapa = Mapa(celdas=np.zeros((10, 10), dtype=np.uint8))
+    planificador = DStarLite(mapa, (0, 0), (9, 9))
+    assert planificador.planificar().encontrado
+    cambios = [(0, 1), (1, 0), (1, 1)]
+    for fila, col in cambios:
+        mapa.poner_pared(fila, col)
+    assert not planificador.actualizar(cambios).encontrado
+    # Abrir (1, 1) no alcanza: la diagonal cortaría las esquinas
+    mapa.poner_pared(1, 1, False)
+    assert not planificador.actualizar([(1, 1)]).encontrado
+    mapa.poner_pared(0, 1, False)
+    comprobar_igual_que_a_estrella(mapa, (0, 0), (9, 9), planificador.actualizar([(0, 1)]))
+
+
+def test_mapa_bits_igual_que_mapa():
+    mapa = mapa_con_esquinas_libres(30, 0.2, 11)
+    bits = MapaBits.desde_mapa(mapa)
+    assert DStarLite(mapa, (0, 0), (29, 29)).planificar().camino == \
+        DStarLite(bits, (0, 0), (29, 29)).planificar().camino
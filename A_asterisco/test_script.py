@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+# Sin pantalla: script.py abre la ventana al importarse
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+pygame = pytest.importorskip('pygame')
+
+import script  # noqa: E402
+from busqueda import a_estrella  # noqa: E402
+
+ANCHO, ALTO, PANEL = 800, 600, 160
+FILAS = 12  # Nodos de 50 px: se dibujan también los costos
+
+
+@pytest.fixture(autouse=True)
+def lienzo_nuevo():
+    script.LIENZO.__init__()
+
+
+def cuadro_completo(grid, info):
+    ventana = pygame.Surface((ANCHO, ALTO))
+    script.LIENZO.invalidar()
+    script.dibujar(ventana, grid, FILAS, ANCHO, ALTO, PANEL, info)
+    return pygame.image.tobytes(ventana, 'RGB')
+
+
+def cuadro_incremental(ventana, grid, info):
+    script.LIENZO.ultimo_cuadro = -script.FPS_OBJETIVO * 1000  # Sin esperar al próximo cuadro
+    script.dibujar(ventana, grid, FILAS, ANCHO, ALTO, PANEL, info)
+
+
+def test_celdas_sucias_igual_que_cuadro_completo():
+    grid = script.crear_grid(FILAS, ALTO)
+    inicio, fin = grid[1][1], grid[10][9]
+    inicio.hacer_inicio()
+    fin.hacer_fin()
+    for fila in range(2, 10):
+        grid[fila][5].hacer_pared()
+
+    ventana = pygame.Surface((ANCHO, ALTO))
+    cuadro_incremental(ventana, grid, None)
+    eventos = []
+
+    def observador(evento, pos, g_cost, h_cost):
+        # Como la interfaz: colores y costos, con un cuadro cada 7 eventos
+        nodo = grid[pos[0]][pos[1]]
+        if nodo not in (inicio, fin):
+            if evento == 'abierto':
+                nodo.poner_costos(g_cost, h_cost)
+                nodo.hacer_abierto()
+            else:
+                nodo.hacer_visitado()
+        eventos.append(evento)
+        if len(eventos) % 7 == 0:
+            cuadro_incremental(ventana, grid, [f"Eventos: {len(eventos)}"])
+
+    resultado = a_estrella(inicio.mapa, inicio.get_pos(), fin.get_pos(), observador=observador)
+    assert resultado.encontrado
+    for fila, col in resultado.camino[1:-1]:
+        grid[fila][col].hacer_camino()
+    info = [f"Costo total: {round(resultado.costo, 2)}"]
+    cuadro_incremental(ventana, grid, info)
+    assert not script.LIENZO.sucias
+    assert pygame.image.tobytes(ventana, 'RGB') == cuadro_completo(grid, info)
+
+    # Al limpiar se despintan celdas
+    for fila in grid:
+        for nodo in fila:
+            if nodo.color in (script.AMARILLO, script.ROJO):
+                nodo.color = script.BLANCO
+    grid[4][5].restablecer()
+    cuadro_incremental(ventana, grid, info)
+    assert pygame.image.tobytes(ventana, 'RGB') == cuadro_completo(grid, info)
+
+
+def test_cuadros_limitados_a_fps_objetivo():
+    grid = script.crear_grid(FILAS, ALTO)
+    ventana = pygame.Surface((ANCHO, ALTO))
+    cuadro_incremental(ventana, grid, None)
+    antes = pygame.image.tobytes(ventana, 'RGB')
+    # Un cuadro pedido enseguida se salta y la celda queda para el próximo
+    script.LIENZO.ultimo_cuadro = pygame.time.get_ticks()
+    grid[3][3].hacer_pared()
+    script.dibujar(ventana, grid, FILAS, ANCHO, ALTO, PANEL)
+    assert pygame.image.tobytes(ventana, 'RGB') == antes
+    assert grid[3][3] in script.LIENZO.sucias
+    cuadro_incremental(ventana, grid, None)
+    assert pygame.image.tobytes(ventana, 'RGB') == cuadro_completo(grid, None)
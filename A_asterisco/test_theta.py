@@ -0,0 +1,76 @@
+import math
+
+import numpy as np
+import pytest
+
+from busqueda import Mapa, MapaBits, a_estrella
+from conftest import consultas, mapa_aleatorio
+from theta import celdas_en_linea, expandir_camino, linea_de_vision, theta_estrella
+
+
+def longitud(puntos):
+    return sum(math.dist(a, b) for a, b in zip(puntos, puntos[1:]))
+
+
+def test_vision_solo_por_celdas_libres():
+    celdas = mapa_aleatorio(25, 25, 0.15, 0)
+    mapa = Mapa(celdas=celdas)
+    for a, b in consultas(celdas, 400, 0):
+        vision = linea_de_vision(mapa, a, b)
+        assert vision == linea_de_vision(mapa, b, a)
+        if vision:
+            assert all(celdas[p] == 0 for p in celdas_en_linea(a, b))
+    vacio = Mapa(celdas=np.zeros((25, 25), dtype=np.uint8))
+    assert all(linea_de_vision(vacio, a, b) for a, b in consultas(vacio.celdas, 100, 1))
+
+
+def test_vision_no_atraviesa_esquinas():
+    celdas = np.zeros((3, 3), dtype=np.uint8)
+    celdas[0, 1] = 1
+    mapa = Mapa(celdas=celdas)
+    assert not linea_de_vision(mapa, (0, 0), (1, 1))
+    assert not linea_de_vision(mapa, (1, 1), (0, 0))
+    assert linea_de_vision(mapa, (1, 0), (2, 1))
+
+
+@pytest.mark.parametrize('perezoso', [True, False])
+@pytest.mark.parametrize('semilla', range(3))
+def test_puntos_con_vision_y_mas_cortos_que_la_cuadricula(perezoso, semilla):
+    celdas = mapa_aleatorio(40, 50, 0.2, semilla)
+    mapa = Mapa(celdas=celdas)
+    for inicio, fin in consultas(celdas, 30, semilla):
+        optimo = a_estrella(mapa, inicio, fin, 1)
+        resultado = theta_estrella(mapa, inicio, fin, 1, perezoso=perezoso)
+        assert resultado.encontrado == optimo.encontrado
+        if not resultado.encontrado:
+            continue
+        puntos = resultado.camino
+        assert puntos[0] == inicio and puntos[-1] == fin
+        for a, b in zip(puntos, puntos[1:]):
+            assert linea_de_vision(mapa, a, b)
+        assert resultado.costo == pytest.approx(longitud(puntos))
+        # Un camino de la cuadrícula también es de ángulo libre: nunca más largo
+        assert resultado.costo <= optimo.costo + 1e-6
+        camino = expandir_camino(puntos)
+        assert camino[0] == inicio and camino[-1] == fin
+        for a, b in zip(camino, camino[1:]):
+            assert max(abs(a[0] - b[0]), abs(a[1] - b[1])) == 1
+            assert celdas[b] == 0
+
+
+def test_perezoso_comprueba_menos_vision():
+    celdas = mapa_aleatorio(80, 80, 0.15, 7)
+    celdas[0, 0] = celdas[-1, -1] = 0
+    mapa = Mapa(celdas=celdas)
+    original = theta_estrella(mapa, (0, 0), (79, 79), 1, perezoso=False)
+    perezoso = theta_estrella(mapa, (0, 0), (79, 79), 1, perezoso=True)
+    assert original.encontrado and perezoso.encontrado
+    assert perezoso.estadisticas['chequeos_vision'] < original.estadisticas['chequeos_vision']
+
+
+def test_mapa_bits_igual_que_mapa():
+    celdas = mapa_aleatorio(30, 37, 0.2, 9)
+    mapa = Mapa(celdas=celdas)
+    bits = MapaBits.desde_mapa(mapa)
+    for inicio, fin in consultas(celdas, 15, 9):
+        assert theta_estrella(mapa, inicio, fin, 1).camino == theta_estrella(bits, inicio, fin, 1).camino
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import traza as modulo_traza
+from busqueda import Mapa, MapaBits, a_estrella
+from conftest import mapa_aleatorio
+from traza import Traza, grabar
+
+
+def mapa_con_esquinas_libres(lado, densidad, semilla):
+    celdas = mapa_aleatorio(lado, lado, densidad, semilla)
+    celdas[0, 0] = celdas[-1, -1] = 0
+    return celdas
+
+
+def test_graba_lo_mismo_que_ve_el_observador():
+    celdas = mapa_con_esquinas_libres(30, 0.2, 1)
+    vistos = []
+    esperado = a_estrella(Mapa(celdas=celdas), (0, 0), (29, 29), 1, lambda *evento: vistos.append(evento))
+    # Capacidad chica: la traza tiene que crecer varias veces
+    resultado, traza = grabar(a_estrella, Mapa(celdas=celdas), (0, 0), (29, 29), 1, capacidad=4)
+    assert resultado.camino == esperado.camino
+    eventos = [traza.evento(i) for i in range(len(traza))]
+    assert len(eventos) == len(vistos) + len(resultado.camino)
+    for (tipo, pos, g, h), (evento, pos_visto, g_visto, h_visto) in zip(eventos, vistos):
+        assert tipo == modulo_traza.CODIGOS[evento] and pos == tuple(pos_visto)
+        assert g == pytest.approx(g_visto, rel=1e-6) and h == pytest.approx(h_visto, rel=1e-6)
+    assert [pos for tipo, pos, _, _ in eventos if tipo == modulo_traza.CAMINO] == resultado.camino
+    assert traza.info['encontrado'] and traza.info['costo'] == resultado.costo
+
+
+def test_guardar_y_cargar(tmp_path):
+    celdas = mapa_con_esquinas_libres(30, 0.2, 2)
+    mapa = Mapa(celdas=celdas.copy())
+    resultado, traza = grabar(a_estrella, mapa, (0, 0), (29, 29), 1)
+    # Las paredes se copian al grabar: editar el mapa después no cambia la traza
+    mapa.poner_pared(5, 5, not mapa.es_pared(5, 5))
+    traza.guardar(tmp_path / 'traza.npz')
+    cargada = Traza.cargar(tmp_path / 'traza.npz')
+    assert len(cargada) == len(traza)
+    assert cargada.info == traza.info
+    np.testing.assert_array_equal(cargada.mapa().celdas, celdas)
+    for nombre, arreglo in traza.eventos().items():
+        np.testing.assert_array_equal(cargada.eventos()[nombre], arreglo)
+
+
+@pytest.mark.parametrize('forma', [(20, 16), (21, 13), (3, 1)])
+def test_mapa_bits_graba_las_mismas_paredes(forma, monkeypatch):
+    monkeypatch.setattr(modulo_traza, 'FILAS_POR_BLOQUE', 8)  # Varios bloques
+    celdas = mapa_aleatorio(*forma, 0.3, sum(forma))
+    celdas[0, 0] = 0
+    mapa = Mapa(celdas=celdas)
+    traza = Traza(mapa, (0, 0), (0, 0))
+    traza_bits = Traza(MapaBits.desde_mapa(mapa), (0, 0), (0, 0))
+    np.testing.assert_array_equal(traza_bits.paredes, traza.paredes)
+    np.testing.assert_array_equal(traza_bits.mapa().celdas, celdas)
+
+
+def test_grabar_sobre_mapa_bits():
+    celdas = mapa_con_esquinas_libres(30, 0.2, 3)
+    resultado, traza = grabar(a_estrella, MapaBits.desde_mapa(Mapa(celdas=celdas)), (0, 0), (29, 29), 1)
+    assert resultado.camino == a_estrella(Mapa(celdas=celdas), (0, 0), (29, 29), 1).camino
+    np.testing.assert_array_equal(traza.mapa().celdas, celdas)
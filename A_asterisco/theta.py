@@ -0,0 +1,221 @@
+"""
+Búsqueda de ángulo libre (any-angle) con Theta* y Lazy Theta*.
+
+Los caminos de a_estrella solo usan los 8 movimientos de la cuadrícula, así
+que una recta en un ángulo cualquiera sale en zig-zag. Theta* busca sobre
+los mismos vecinos pero, al relajar un vecino, prueba conectarlo
+directamente con el padre del nodo actual si hay línea de visión entre
+ambos. El camino resultante son puntos de paso unidos por rectas, con
+costo euclidiano, y no la lista de todas las celdas.
+
+Lazy Theta* hace lo mismo pero posterga la comprobación de visión hasta que
+el nodo sale del montículo: casi todos los vecinos generados nunca se
+expanden, así que se hacen muchas menos comprobaciones.
+
+La línea de visión recorre todas las celdas que toca el segmento entre los
+centros de dos celdas; si el segmento pasa justo por una esquina, las dos
+celdas de los lados también deben estar libres (misma regla que las
+diagonales de busqueda.vecinos: no se atraviesan esquinas).
+
+Referencia: Nash, Daniel, Koenig y Felner, "Theta*: Any-Angle Path
+Planning on Grids" (AAAI 2007) y Nash, Koenig y Tovey, "Lazy Theta*"
+(AAAI 2010).
+"""
+
+import heapq
+import math
+import time
+
+from busqueda import EPSILON, PARED, ResultadoBusqueda, como_mapa, reconstruir_camino
+
+
+def linea_de_vision(mapa, inicio, fin):
+    """
+    True si el segmento entre los centros de inicio y fin no toca paredes.
+
+    Recorre las celdas del segmento con aritmética entera (Amanatides-Woo),
+    en O(|dfila| + |dcol|), sobre la vista plana del mapa.
+    """
+    mapa = como_mapa(mapa)
+    return _vision(mapa.plano, mapa.cols, inicio[0], inicio[1], fin[0], fin[1])
+
+
+def _vision(plano, cols, fila, col, fila_fin, col_fin):
+    d_fila = abs(fila_fin - fila)
+    d_col = abs(col_fin - col)
+    paso_fila = cols if fila_fin > fila else -cols
+    paso_col = 1 if col_fin > col else -1
+    actual = fila * cols + col
+    pasos_fila = pasos_col = 0
+    while pasos_fila < d_fila or pasos_col < d_col:
+        # El segmento cruza el borde de fila en t = (pasos_fila + 1/2) / d_fila
+        # y el de columna en t = (pasos_col + 1/2) / d_col: avanza el primero
+        decision = (1 + 2 * pasos_fila) * d_col - (1 + 2 * pasos_col) * d_fila
+        if decision == 0:
+            # Pasa justo por una esquina: las dos celdas de los lados cuentan
+            if plano[actual + paso_fila] == PARED or plano[actual + paso_col] == PARED:
+                return False
+            actual += paso_fila + paso_col
+            pasos_fila += 1
+            pasos_col += 1
+        elif decision < 0:
+            actual += paso_fila
+            pasos_fila += 1
+        else:
+            actual += paso_col
+            pasos_col += 1
+        if plano[actual] == PARED:
+            return False
+    return True
+
+
+def celdas_en_linea(inicio, fin):
+    """Celdas que toca el segmento entre los centros de inicio y fin, en orden"""
+    fila, col = inicio
+    fila_fin, col_fin = fin
+    d_fila = abs(fila_fin - fila)
+    d_col = abs(col_fin - col)
+    paso_fila = 1 if fila_fin > fila else -1
+    paso_col = 1 if col_fin > col else -1
+    celdas = [(fila, col)]
+    pasos_fila = pasos_col = 0
+    while pasos_fila < d_fila or pasos_col < d_col:
+        decision = (1 + 2 * pasos_fila) * d_col - (1 + 2 * pasos_col) * d_fila
+        if decision <= 0:
+            fila += paso_fila
+            pasos_fila += 1
+        if decision >= 0:
+            col += paso_col
+            pasos_col += 1
+        celdas.append((fila, col))
+    return celdas
+
+
+def expandir_camino(puntos):
+    """Convierte los puntos de paso en un camino celda por celda"""
+    if not puntos:
+        return []
+    camino = [puntos[0]]
+    for a, b in zip(puntos, puntos[1:]):
+        camino += celdas_en_linea(a, b)[1:]
+    return camino
+
+
+def theta_estrella(mapa, inicio, fin, epsilon=EPSILON, observador=None, perezoso=True):
+    """
+    Busca un camino de ángulo libre de inicio a fin.
+
+    Args:
+        mapa: Mapa (o cuadrícula que acepte como_mapa) con las paredes
+        inicio: Posición (fila, col) de partida
+        fin: Posición (fila, col) objetivo
+        epsilon: Peso de la heurística euclidiana
+        observador: Igual que en a_estrella ('abierto' / 'cerrado')
+        perezoso: True usa Lazy Theta*, False el Theta* original
+
+    Returns:
+        ResultadoBusqueda cuyo camino son los puntos de paso (inicio, giros
+        y fin) y su costo la longitud euclidiana. Las estadísticas agregan
+        'chequeos_vision'; para el camino celda por celda, expandir_camino
+    """
+    t0 = time.perf_counter()
+    mapa = como_mapa(mapa)
+    cols = mapa.cols
+    plano = mapa.plano
+    id_inicio = mapa.id(*inicio)
+    id_fin = mapa.id(*fin)
+    fila_fin, col_fin = fin
+    sucesores = mapa.sucesores
+    vecindad = mapa.plano_vecindad
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    hypot = math.hypot
+
+    memoria = mapa.memoria()
+    generacion = memoria.nueva_busqueda()
+    g_score = memoria.g
+    padre = memoria.padre
+    marca = memoria.marca
+    g_score[id_inicio] = 0
+    padre[id_inicio] = id_inicio
+    marca[id_inicio] = generacion
+
+    cuenta = 0
+    pasos = 0
+    chequeos = 0
+    cerrados = set()
+    conjunto_abierto = [(epsilon * hypot(inicio[0] - fila_fin, inicio[1] - col_fin), cuenta, id_inicio, 0)]
+
+    while conjunto_abierto:
+        _, _, actual, g_actual = heappop(conjunto_abierto)
+        if g_actual != g_score[actual] or actual in cerrados:
+            continue  # Entrada obsoleta
+        fila, col = divmod(actual, cols)
+        padre_actual = padre[actual]
+
+        if perezoso and padre_actual != actual:
+            # El padre se asignó sin mirar: si no hay visión, se toma el
+            # mejor vecino ya cerrado (por él se llegó, así que existe uno)
+            fila_p, col_p = divmod(padre_actual, cols)
+            chequeos += 1
+            if not _vision(plano, cols, fila_p, col_p, fila, col):
+                g_actual = math.inf
+                for delta, costo_movimiento in sucesores[vecindad[actual]]:
+                    vecino = actual + delta
+                    if vecino in cerrados:
+                        g_vecino = g_score[vecino] + (1 if costo_movimiento == 1 else math.sqrt(2))
+                        if g_vecino < g_actual:
+                            g_actual = g_vecino
+                            padre_actual = vecino
+                g_score[actual] = g_actual
+                padre[actual] = padre_actual
+
+        if actual == id_fin:
+            puntos = [mapa.pos(n) for n in reconstruir_camino(padre, id_inicio, actual)]
+            return ResultadoBusqueda(True, puntos, g_actual, {
+                'expandidos': pasos,
+                'generados': cuenta,
+                'chequeos_vision': chequeos,
+                'tiempo_ms': (time.perf_counter() - t0) * 1000,
+            })
+
+        cerrados.add(actual)
+        pasos += 1
+        if observador is not None and actual != id_inicio:
+            observador('cerrado', (fila, col), g_actual, hypot(fila - fila_fin, col - col_fin))
+
+        fila_p, col_p = divmod(padre_actual, cols)
+        g_padre = g_score[padre_actual]
+        for delta, costo_movimiento in sucesores[vecindad[actual]]:
+            vecino = actual + delta
+            if vecino in cerrados:
+                continue
+            fila_v, col_v = divmod(vecino, cols)
+            if perezoso:
+                # Se supone visión desde el padre; se comprueba al expandir
+                nuevo_padre = padre_actual
+                nuevo_g = g_padre + hypot(fila_v - fila_p, col_v - col_p)
+            else:
+                chequeos += 1
+                if _vision(plano, cols, fila_p, col_p, fila_v, col_v):
+                    nuevo_padre = padre_actual
+                    nuevo_g = g_padre + hypot(fila_v - fila_p, col_v - col_p)
+                else:
+                    nuevo_padre = actual
+                    nuevo_g = g_actual + (1 if costo_movimiento == 1 else math.sqrt(2))
+            if marca[vecino] != generacion or nuevo_g < g_score[vecino]:
+                marca[vecino] = generacion
+                g_score[vecino] = nuevo_g
+                padre[vecino] = nuevo_padre
+                h_cost = hypot(fila_v - fila_fin, col_v - col_fin)
+                cuenta += 1
+                heappush(conjunto_abierto, (nuevo_g + epsilon * h_cost, cuenta, vecino, nuevo_g))
+                if observador is not None:
+                    observador('abierto', (fila_v, col_v), nuevo_g, h_cost)
+
+    return ResultadoBusqueda(False, [], 0, {
+        'expandidos': pasos,
+        'generados': cuenta,
+        'chequeos_vision': chequeos,
+        'tiempo_ms': (time.perf_counter() - t0) * 1000,
+    })
@@ -0,0 +1,177 @@
+"""
+Grabación de la traza de una búsqueda para reproducirla después.
+
+La búsqueda corre a toda velocidad con un observador que solo anota cada
+evento ('abierto', 'cerrado' y al final el 'camino') en arreglos
+reservados de antemano: un byte de tipo, el id de la celda y g, h en
+float32 (13 bytes por evento). La interfaz reproduce la traza después, con
+pausa, retroceso y velocidad variable, sin frenar la búsqueda.
+
+Las trazas se guardan en un .npz junto con el mapa, el inicio y el fin,
+de modo que una consulta de producción se puede revisar sin el programa
+que la generó:
+
+    resultado, traza = grabar(a_estrella, mapa, inicio, fin)
+    traza.guardar('consulta.npz')
+    ...
+    traza = Traza.cargar('consulta.npz')
+    traza.mapa(), traza.eventos()
+"""
+
+import json
+from array import array
+
+import numpy as np
+
+from busqueda import Mapa, MapaBits, como_mapa
+
+# Códigos de evento
+ABIERTO = 0
+CERRADO = 1
+CAMINO = 2
+CODIGOS = {'abierto': ABIERTO, 'cerrado': CERRADO, 'camino': CAMINO}
+NOMBRES = {codigo: nombre for nombre, codigo in CODIGOS.items()}
+
+CAPACIDAD_INICIAL = 1 << 16
+
+# Filas de un MapaBits que se desempaquetan juntas al copiar sus paredes
+# (múltiplo de 8)
+FILAS_POR_BLOQUE = 1024
+
+
+class Traza:
+    """
+    Eventos de una búsqueda en arreglos paralelos (tipo, id, g, h).
+
+    `registrar` tiene la firma de observador de a_estrella, así que la
+    traza se pasa directamente como observador. Si se llena, la capacidad
+    se duplica.
+    """
+
+    def __init__(self, mapa, inicio, fin, capacidad=CAPACIDAD_INICIAL):
+        mapa = como_mapa(mapa)
+        # Copia de las paredes al momento de grabar (un bit por celda): la
+        # traza sigue siendo válida aunque después se edite el mapa
+        self.forma = (mapa.filas, mapa.cols)
+        self.paredes = _paredes_en_bits(mapa)
+        self.cols = mapa.cols
+        self.inicio = tuple(inicio)
+        self.fin = tuple(fin)
+        self.n = 0
+        self.capacidad = capacidad
+        self.tipo = array('B', bytes(capacidad))
+        self.ids = array('I', bytes(4 * capacidad))
+        self.g = array('f', bytes(4 * capacidad))
+        self.h = array('f', bytes(4 * capacidad))
+        self.info = {}  # Datos de la consulta (algoritmo, epsilon, costo...)
+
+    def __len__(self):
+        return self.n
+
+    def _crecer(self):
+        for arreglo in (self.tipo, self.ids, self.g, self.h):
+            arreglo.extend(arreglo)
+        self.capacidad *= 2
+
+    def registrar(self, evento, pos, g, h):
+        i = self.n
+        if i == self.capacidad:
+            self._crecer()
+        self.tipo[i] = CODIGOS[evento]
+        self.ids[i] = pos[0] * self.cols + pos[1]
+        self.g[i] = g
+        self.h[i] = h
+        self.n = i + 1
+
+    def agregar_camino(self, camino):
+        """Agrega el camino final como eventos 'camino' (g = paso dentro del camino)"""
+        for paso, pos in enumerate(camino):
+            self.registrar('camino', pos, paso, 0)
+
+    def evento(self, i):
+        """(tipo, (fila, col), g, h) del evento i"""
+        return self.tipo[i], divmod(self.ids[i], self.cols), self.g[i], self.h[i]
+
+    def eventos(self):
+        """Los eventos grabados como arreglos de numpy (sin copiar)"""
+        n = self.n
+        return {
+            'tipo': np.frombuffer(self.tipo, dtype=np.uint8)[:n],
+            'id': np.frombuffer(self.ids, dtype=np.uint32)[:n],
+            'g': np.frombuffer(self.g, dtype=np.float32)[:n],
+            'h': np.frombuffer(self.h, dtype=np.float32)[:n],
+        }
+
+    def mapa(self):
+        """Mapa tal como estaba al grabar la traza"""
+        filas, cols = self.forma
+        paredes = np.unpackbits(self.paredes, count=filas * cols)
+        return Mapa(celdas=paredes.reshape(filas, cols))
+
+    def guardar(self, ruta):
+        np.savez_compressed(
+            ruta,
+            **self.eventos(),
+            paredes=self.paredes,
+            forma=np.array(self.forma),
+            inicio=np.array(self.inicio),
+            fin=np.array(self.fin),
+            info=np.array(json.dumps(self.info)),
+        )
+
+    @classmethod
+    def cargar(cls, ruta):
+        datos = np.load(ruta)
+        filas, cols = (int(x) for x in datos['forma'])
+        paredes = np.unpackbits(datos['paredes'], count=filas * cols).reshape(filas, cols)
+        n = len(datos['tipo'])
+        inicio = tuple(int(x) for x in datos['inicio'])
+        fin = tuple(int(x) for x in datos['fin'])
+        traza = cls(Mapa(celdas=paredes), inicio, fin, capacidad=max(n, 1))
+        traza.tipo[:n] = array('B', datos['tipo'].tobytes())
+        traza.ids[:n] = array('I', datos['id'].astype(np.uint32).tobytes())
+        traza.g[:n] = array('f', datos['g'].astype(np.float32).tobytes())
+        traza.h[:n] = array('f', datos['h'].astype(np.float32).tobytes())
+        traza.n = n
+        traza.info = json.loads(str(datos['info']))
+        return traza
+
+
+def _paredes_en_bits(mapa):
+    """Paredes del mapa, un bit por celda empaquetado en orden plano (fila por fila)"""
+    if not isinstance(mapa, MapaBits):
+        return np.packbits(mapa.celdas.reshape(-1) != 0)
+    if mapa.cols % 8 == 0:
+        return np.array(mapa.bits).reshape(-1)  # Filas sin relleno: ya es el orden plano
+    # Cada fila de MapaBits termina en un byte con relleno: se quita por
+    # bloques de filas (un múltiplo de 8 de bits, que se empaquetan aparte)
+    partes = []
+    for fila in range(0, mapa.filas, FILAS_POR_BLOQUE):
+        bloque = np.unpackbits(mapa.bits[fila:fila + FILAS_POR_BLOQUE], axis=1, count=mapa.cols)
+        partes.append(np.packbits(bloque.reshape(-1)))
+    return np.concatenate(partes)
+
+
+def grabar(buscar, mapa, inicio, fin, epsilon=None, capacidad=CAPACIDAD_INICIAL):
+    """
+    Corre buscar(mapa, inicio, fin, epsilon, observador) grabando sus eventos.
+
+    Returns:
+        (ResultadoBusqueda, Traza); si hubo camino, la traza termina con él
+    """
+    mapa = como_mapa(mapa)
+    traza = Traza(mapa, inicio, fin, capacidad)
+    if epsilon is None:
+        resultado = buscar(mapa, inicio, fin, observador=traza.registrar)
+    else:
+        resultado = buscar(mapa, inicio, fin, epsilon, traza.registrar)
+    if resultado.encontrado:
+        traza.agregar_camino(resultado.camino)
+    traza.info = {
+        'algoritmo': getattr(buscar, '__name__', str(buscar)),
+        'epsilon': epsilon,
+        'encontrado': resultado.encontrado,
+        'costo': resultado.costo,
+        'expandidos': resultado.estadisticas.get('expandidos', 0),
+    }
+    return resultado, traza
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
 import matplotlib.pyplot as plt
 import seaborn as sns
 import warnings
@@ -16,6 +17,12 @@ INPUT_FILE = 'RAG//dataset_sin_duplicados.csv'  # Cambia esto por tu archivo Exc
 TEXT_COLUMN = 'texto'  # Nombre de la columna que contiene los textos a comparar
 OUTPUT_FILE = 'resultados_similitud.csv'  # Archivo de salida con los resultados
 UMBRAL_SIMILITUD = 0.5  # Umbral para considerar textos similares (0.0 a 1.0)
+MODO_DISPERSO = True  # True: solo top-k vecinos y pares sobre el umbral, sin matriz N×N
+TOP_K = 10  # Vecinos más similares que se guardan por texto en modo disperso
+TOP_PARES = 10  # Pares más similares que se muestran (en modo disperso se guardan al menos tantos vecinos)
+FILAS_POR_BLOQUE = 512  # Filas de la matriz TF-IDF que se comparan por vez
+BINS_HISTOGRAMA = 1000  # Resolución del histograma de similitudes en modo disperso
+VECINOS_FILE = 'vecinos_top_k.npz'  # Matriz dispersa de vecinos (modo disperso)
 
 def cargar_datos(archivo):
     """Carga datos desde Excel o CSV"""
@@ -40,11 +47,8 @@ def cargar_datos(archivo):
         print(f"❌ Error al cargar archivo: {e}")
         return None
 
-def calcular_similitud_coseno(textos):
-    """
-    Calcula la matriz de similitud coseno entre todos los textos
-    usando TF-IDF (Term Frequency-Inverse Document Frequency)
-    """
+def vectorizar_textos(textos):
+    """Convierte los textos en una matriz dispersa TF-IDF (filas normalizadas L2)"""
     print("🔄 Vectorizando textos con TF-IDF...")
     
     # Crear vectorizador TF-IDF
@@ -61,50 +65,192 @@ def calcular_similitud_coseno(textos):
     # Convertir textos a vectores TF-IDF
     tfidf_matrix = vectorizer.fit_transform(textos)
     
+    return tfidf_matrix, vectorizer
+
+def calcular_similitud_coseno(textos):
+    """
+    Calcula la matriz de similitud coseno entre todos los textos
+    usando TF-IDF (Term Frequency-Inverse Document Frequency)
+    """
+    tfidf_matrix, vectorizer = vectorizar_textos(textos)
+    
     print("🔄 Calculando similitudes coseno...")
     # Calcular matriz de similitud coseno
     similitud_matrix = cosine_similarity(tfidf_matrix)
     
     return similitud_matrix, vectorizer
 
-def encontrar_textos_similares(df, similitud_matrix, umbral=0.5):
+def calcular_similitud_dispersa(tfidf_matrix, top_k=TOP_K, umbral=UMBRAL_SIMILITUD,
+                                filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Calcula solo los top_k vecinos de cada texto y los pares con similitud
+    mayor o igual al umbral, sin armar la matriz N×N.
+    
+    Como las filas TF-IDF ya están normalizadas, la similitud coseno es el
+    producto punto: se multiplica un bloque de filas por la matriz
+    transpuesta, se toma lo necesario y se descarta el bloque. La memoria
+    queda en O(filas_por_bloque·N) por bloque más O(N·k) de resultados.
+    
+    Devuelve:
+    - vecinos: matriz dispersa N×N con los top_k vecinos de cada fila
+    - pares: DataFrame (indice_1, indice_2, similitud) con i < j sobre el umbral
+    - resumen: estadísticas de todos los pares i < j (la mediana es
+      aproximada, sale de un histograma de BINS_HISTOGRAMA intervalos)
+    """
+    print(f"🔄 Calculando similitudes por bloques de {filas_por_bloque} filas (top {top_k})...")
+    
+    X = sparse.csr_matrix(tfidf_matrix)
+    XT = X.T.tocsc()
+    n = X.shape[0]
+    k = min(top_k, n - 1)
+    columnas = np.arange(n)
+    
+    filas_vecinos, cols_vecinos, sims_vecinos = [], [], []
+    pares_i, pares_j, pares_sim = [], [], []
+    histograma = np.zeros(BINS_HISTOGRAMA, dtype=np.int64)
+    suma = suma_cuadrados = 0.0
+    minimo, maximo = np.inf, -np.inf
+    
+    for inicio in range(0, n, filas_por_bloque):
+        fin = min(inicio + filas_por_bloque, n)
+        filas = np.arange(inicio, fin)
+        bloque = (X[inicio:fin] @ XT).toarray()
+        
+        # Triángulo superior (j > i): estadísticas y pares sobre el umbral
+        superior = columnas[None, :] > filas[:, None]
+        valores = bloque[superior]
+        if len(valores):
+            suma += valores.sum()
+            suma_cuadrados += np.square(valores).sum()
+            minimo = min(minimo, valores.min())
+            maximo = max(maximo, valores.max())
+            intervalos = np.minimum((np.clip(valores, 0, 1) * BINS_HISTOGRAMA).astype(np.int64),
+                                    BINS_HISTOGRAMA - 1)
+            histograma += np.bincount(intervalos, minlength=BINS_HISTOGRAMA)
+        
+        i_local, j = np.nonzero(superior & (bloque >= umbral))
+        pares_i.append(i_local + inicio)
+        pares_j.append(j)
+        pares_sim.append(bloque[i_local, j])
+        
+        # Top-k de cada fila sin contarse a sí misma
+        if k > 0:
+            bloque[np.arange(fin - inicio), filas] = -np.inf
+            mejores = np.argpartition(-bloque, k - 1, axis=1)[:, :k]
+            sims = np.take_along_axis(bloque, mejores, axis=1)
+            positivas = sims > 0  # Similitud 0 no es un vecino
+            filas_vecinos.append(np.broadcast_to(filas[:, None], mejores.shape)[positivas])
+            cols_vecinos.append(mejores[positivas])
+            sims_vecinos.append(sims[positivas])
+    
+    vecinos = sparse.csr_matrix(
+        (np.concatenate(sims_vecinos) if sims_vecinos else [],
+         (np.concatenate(filas_vecinos) if filas_vecinos else [],
+          np.concatenate(cols_vecinos) if cols_vecinos else [])),
+        shape=(n, n)
+    )
+    pares = pd.DataFrame({
+        'indice_1': np.concatenate(pares_i),
+        'indice_2': np.concatenate(pares_j),
+        'similitud': np.concatenate(pares_sim),
+    }).sort_values(['indice_1', 'indice_2'], ignore_index=True)
+    
+    total = int(histograma.sum())
+    promedio = suma / total if total else 0.0
+    acumulado = np.cumsum(histograma)
+    resumen = {
+        'pares': total,
+        'promedio': promedio,
+        'desviacion': np.sqrt(max(suma_cuadrados / total - promedio ** 2, 0.0)) if total else 0.0,
+        'minimo': minimo if total else 0.0,
+        'maximo': maximo if total else 0.0,
+        'mediana': (np.searchsorted(acumulado, total / 2) + 0.5) / BINS_HISTOGRAMA if total else 0.0,
+        'histograma': histograma,
+    }
+    
+    return vecinos, pares, resumen
+
+def top_pares_dispersos(vecinos, top=TOP_PARES, top_k=TOP_K):
+    """
+    Los `top` pares (i, j, similitud) más similares a partir de la matriz de
+    vecinos, calculada con `top_k` vecinos por texto
+    """
+    # Un par está entre los más similares del total solo si cada texto lo
+    # tiene entre sus top-k vecinos (con top <= k), así que alcanza con ellos
+    if top > top_k:
+        raise ValueError(f"No se pueden sacar los {top} pares más similares de {top_k} vecinos por texto")
+    simetrica = sparse.triu(vecinos.maximum(vecinos.T), k=1).tocoo()
+    orden = np.argsort(-simetrica.data, kind='stable')[:top]
+    return list(zip(simetrica.row[orden].tolist(), simetrica.col[orden].tolist(),
+                    simetrica.data[orden].tolist()))
+
+def extraer_pares(similitud_matrix, umbral=UMBRAL_SIMILITUD, top=10):
+    """
+    Recorre una sola vez el triángulo superior de la matriz (sin la
+    diagonal) y devuelve todo lo que usan el reporte, las gráficas y el CSV:
+    
+    - valores: similitudes de los pares i < j, en orden de filas
+    - indice_1, indice_2, similitud: pares con similitud >= umbral
+    - top: lista de los `top` pares (i, j, similitud) más similares
+    """
+    n = similitud_matrix.shape[0]
+    valores = similitud_matrix[np.triu(np.ones((n, n), dtype=bool), k=1)]
+    
+    # Posición t del triángulo -> (i, j): la fila i empieza en inicios[i]
+    inicios = np.concatenate(([0], np.cumsum(np.arange(n - 1, 0, -1))))
+    
+    def a_pares(posiciones):
+        i = np.searchsorted(inicios, posiciones, side='right') - 1
+        return i, posiciones - inicios[i] + i + 1
+    
+    sobre_umbral = np.flatnonzero(valores >= umbral)
+    indice_1, indice_2 = a_pares(sobre_umbral)
+    
+    # Top: candidatos >= el top-ésimo valor (incluye empates), ordenados por
+    # similitud descendente y, a igual similitud, en orden de filas
+    mejores = []
+    if len(valores) and top > 0:
+        k = min(top, len(valores))
+        corte = np.partition(valores, -k)[-k]
+        candidatos = np.flatnonzero(valores >= corte)
+        candidatos = candidatos[np.lexsort((candidatos, -valores[candidatos]))][:top]
+        i, j = a_pares(candidatos)
+        mejores = list(zip(i.tolist(), j.tolist(), valores[candidatos].tolist()))
+    
+    return {
+        'valores': valores,
+        'indice_1': indice_1,
+        'indice_2': indice_2,
+        'similitud': valores[sobre_umbral],
+        'top': mejores,
+    }
+
+def encontrar_textos_similares(df, pares, umbral=UMBRAL_SIMILITUD):
     """
-    Encuentra pares de textos con similitud mayor al umbral
+    Arma la tabla de pares de textos con similitud mayor al umbral a partir
+    de los índices ya extraídos (extraer_pares o calcular_similitud_dispersa)
     """
     print(f"🔍 Buscando textos similares (umbral: {umbral})...")
     
-    resultados = []
-    n = len(df)
-    
-    # Recorrer la matriz triangular superior (evitar duplicados)
-    for i in range(n):
-        for j in range(i + 1, n):
-            similitud = similitud_matrix[i][j]
-            
-            if similitud >= umbral:
-                resultados.append({
-                    'indice_1': i,
-                    'indice_2': j,
-                    'texto_1': df.iloc[i][TEXT_COLUMN][:100] + '...',  # Primeros 100 chars
-                    'texto_2': df.iloc[j][TEXT_COLUMN][:100] + '...',
-                    'similitud': round(similitud, 4)
-                })
-    
-    return pd.DataFrame(resultados)
+    indice_1 = np.asarray(pares['indice_1'], dtype=np.int64)
+    indice_2 = np.asarray(pares['indice_2'], dtype=np.int64)
+    textos_cortos = (df[TEXT_COLUMN].astype(str).str[:100] + '...').to_numpy()  # Primeros 100 chars
+    
+    return pd.DataFrame({
+        'indice_1': indice_1,
+        'indice_2': indice_2,
+        'texto_1': textos_cortos[indice_1],
+        'texto_2': textos_cortos[indice_2],
+        'similitud': np.round(np.asarray(pares['similitud'], dtype=float), 4),
+    })
 
-def mostrar_estadisticas(similitud_matrix):
-    """Muestra estadísticas de la matriz de similitud"""
+def mostrar_estadisticas(pares):
+    """Muestra estadísticas de las similitudes de todos los pares i < j"""
     print("\n📊 ESTADÍSTICAS DE SIMILITUD:")
     print("=" * 50)
     
-    # Obtener valores sin la diagonal (similitud consigo mismo = 1.0)
-    n = similitud_matrix.shape[0]
-    valores = []
-    for i in range(n):
-        for j in range(i + 1, n):
-            valores.append(similitud_matrix[i][j])
-    
-    valores = np.array(valores)
+    # Valores sin la diagonal (similitud consigo mismo = 1.0)
+    valores = pares['valores']
     
     print(f"📈 Promedio de similitud: {valores.mean():.4f}")
     print(f"📈 Máxima similitud: {valores.max():.4f}")
@@ -115,12 +261,107 @@ def mostrar_estadisticas(similitud_matrix):
     
     return valores
 
-def visualizar_similitudes(similitud_matrix, valores, df):
-    """Genera visualizaciones de las similitudes"""
+def mostrar_estadisticas_dispersas(resumen):
+    """Muestra las estadísticas acumuladas por calcular_similitud_dispersa"""
+    print("\n📊 ESTADÍSTICAS DE SIMILITUD:")
+    print("=" * 50)
+    print(f"📈 Promedio de similitud: {resumen['promedio']:.4f}")
+    print(f"📈 Máxima similitud: {resumen['maximo']:.4f}")
+    print(f"📉 Mínima similitud: {resumen['minimo']:.4f}")
+    print(f"📊 Desviación estándar: {resumen['desviacion']:.4f}")
+    print(f"📊 Mediana (aprox.): {resumen['mediana']:.4f}")
+    print("=" * 50 + "\n")
+
+def _cuantil_histograma(histograma, q):
+    """Cuantil aproximado a partir de un histograma de [0, 1]"""
+    acumulado = np.cumsum(histograma)
+    return (np.searchsorted(acumulado, q * acumulado[-1]) + 0.5) / len(histograma)
+
+def visualizar_similitudes_dispersas(tfidf_matrix, resumen, vecinos, top_k=TOP_K):
+    """Las mismas gráficas que visualizar_similitudes, desde el resumen y los vecinos"""
+    print("📊 Generando visualizaciones...\n")
+    
+    plt.figure(figsize=(16, 12))
+    histograma = resumen['histograma']
+    
+    # 1. HEATMAP: solo los primeros 50 textos, calculados aparte
+    ax1 = plt.subplot(2, 2, 1)
+    n_mostrar = min(50, tfidf_matrix.shape[0])
+    primeros = tfidf_matrix[:n_mostrar]
+    im = ax1.imshow((primeros @ primeros.T).toarray(), cmap='YlOrRd', aspect='auto', vmin=0, vmax=1)
+    ax1.set_title(f'Heatmap de Similitud Coseno\n(primeros {n_mostrar} textos)', 
+                  fontsize=14, fontweight='bold', pad=20)
+    ax1.set_xlabel('Índice del Texto', fontsize=11)
+    ax1.set_ylabel('Índice del Texto', fontsize=11)
+    plt.colorbar(im, ax=ax1, label='Similitud')
+    
+    # 2. HISTOGRAMA: el acumulado, reagrupado en 50 intervalos
+    ax2 = plt.subplot(2, 2, 2)
+    agrupado = histograma.reshape(50, -1).sum(axis=1)
+    bordes = np.linspace(0, 1, 51)
+    ax2.hist(bordes[:-1], bins=bordes, weights=agrupado, color='steelblue', edgecolor='black', alpha=0.7)
+    ax2.axvline(resumen['promedio'], color='red', linestyle='--', linewidth=2, 
+                label=f"Media: {resumen['promedio']:.3f}")
+    ax2.axvline(resumen['mediana'], color='green', linestyle='--', linewidth=2, 
+                label=f"Mediana: {resumen['mediana']:.3f}")
+    ax2.set_title('Distribución de Similitudes', fontsize=14, fontweight='bold', pad=20)
+    ax2.set_xlabel('Similitud Coseno', fontsize=11)
+    ax2.set_ylabel('Frecuencia', fontsize=11)
+    ax2.legend()
+    ax2.grid(True, alpha=0.3)
+    
+    # 3. BOX PLOT con cuartiles aproximados del histograma
+    ax3 = plt.subplot(2, 2, 3)
+    q1, mediana, q3 = (_cuantil_histograma(histograma, q) for q in (0.25, 0.5, 0.75))
+    rango = q3 - q1
+    caja = {
+        'med': mediana, 'q1': q1, 'q3': q3,
+        'whislo': max(resumen['minimo'], q1 - 1.5 * rango),
+        'whishi': min(resumen['maximo'], q3 + 1.5 * rango),
+        'fliers': [], 'label': 'Todos los pares',
+    }
+    bp = ax3.bxp([caja], patch_artist=True)
+    bp['boxes'][0].set_facecolor('lightblue')
+    bp['boxes'][0].set_edgecolor('darkblue')
+    bp['medians'][0].set_color('red')
+    bp['medians'][0].set_linewidth(2)
+    ax3.set_title('Diagrama de Caja de Similitudes', fontsize=14, fontweight='bold', pad=20)
+    ax3.set_ylabel('Similitud Coseno', fontsize=11)
+    ax3.grid(True, alpha=0.3, axis='y')
+    
+    # 4. TOP 10 PARES MÁS SIMILARES
+    ax4 = plt.subplot(2, 2, 4)
+    top_10 = top_pares_dispersos(vecinos, 10, top_k)
+    etiquetas = [f'{i}-{j}' for i, j, _ in top_10]
+    similitudes = [sim for _, _, sim in top_10]
+    
+    bars = ax4.barh(range(len(etiquetas)), similitudes, color='coral', edgecolor='darkred')
+    ax4.set_yticks(range(len(etiquetas)))
+    ax4.set_yticklabels(etiquetas)
+    ax4.set_xlabel('Similitud Coseno', fontsize=11)
+    ax4.set_title('Top 10 Pares Más Similares', fontsize=14, fontweight='bold', pad=20)
+    ax4.invert_yaxis()
+    ax4.set_xlim(0, 1)
+    ax4.grid(True, alpha=0.3, axis='x')
+    
+    for i, (bar, sim) in enumerate(zip(bars, similitudes)):
+        ax4.text(sim + 0.01, i, f'{sim:.3f}', va='center', fontsize=9)
+    
+    plt.tight_layout()
+    plt.suptitle('Análisis de Similitud de Textos usando Coseno', 
+                 fontsize=16, fontweight='bold', y=1.00)
+    plt.subplots_adjust(top=0.96)
+    
+    print("✅ Mostrando gráficas...")
+    plt.show()
+
+def visualizar_similitudes(similitud_matrix, pares):
+    """Genera visualizaciones de las similitudes a partir de extraer_pares"""
     print("📊 Generando visualizaciones...\n")
     
     # Crear figura con múltiples subplots
     fig = plt.figure(figsize=(16, 12))
+    valores = pares['valores']
     
     # 1. HEATMAP de la matriz de similitud
     ax1 = plt.subplot(2, 2, 1)
@@ -162,14 +403,7 @@ def visualizar_similitudes(similitud_matrix, valores, df):
     
     # 4. TOP 10 PARES MÁS SIMILARES (Gráfico de barras)
     ax4 = plt.subplot(2, 2, 4)
-    n = similitud_matrix.shape[0]
-    pares = []
-    for i in range(n):
-        for j in range(i + 1, n):
-            pares.append((i, j, similitud_matrix[i][j]))
-    
-    pares.sort(key=lambda x: x[2], reverse=True)
-    top_10 = pares[:10]
+    top_10 = pares['top'][:10]
     
     etiquetas = [f'{i}-{j}' for i, j, _ in top_10]
     similitudes = [sim for _, _, sim in top_10]
@@ -195,22 +429,12 @@ def visualizar_similitudes(similitud_matrix, valores, df):
     print("✅ Mostrando gráficas...")
     plt.show()
 
-def mostrar_top_similares(df, similitud_matrix, top=10):
-    """Muestra los pares de textos más similares"""
-    print(f"\n🏆 TOP {top} PARES MÁS SIMILARES:")
+def mostrar_top_similares(df, top_pares):
+    """Muestra los pares de textos más similares, ya ordenados (i, j, similitud)"""
+    print(f"\n🏆 TOP {len(top_pares)} PARES MÁS SIMILARES:")
     print("=" * 80)
     
-    n = len(df)
-    pares = []
-    
-    for i in range(n):
-        for j in range(i + 1, n):
-            pares.append((i, j, similitud_matrix[i][j]))
-    
-    # Ordenar por similitud descendente
-    pares.sort(key=lambda x: x[2], reverse=True)
-    
-    for idx, (i, j, sim) in enumerate(pares[:top], 1):
+    for idx, (i, j, sim) in enumerate(top_pares, 1):
         print(f"\n{idx}. Similitud: {sim:.4f}")
         print(f"   Texto {i}: {df.iloc[i][TEXT_COLUMN][:80]}...")
         print(f"   Texto {j}: {df.iloc[j][TEXT_COLUMN][:80]}...")
@@ -237,20 +461,27 @@ def main():
     
     print(f"📝 Total de textos a analizar: {len(textos)}\n")
     
+    if MODO_DISPERSO:
+        analisis_disperso(df, textos)
+        return
+    
     # 4. Calcular similitud coseno
     similitud_matrix, vectorizer = calcular_similitud_coseno(textos)
     
-    # 5. Mostrar estadísticas
-    valores = mostrar_estadisticas(similitud_matrix)
+    # 5. Extraer una sola vez los pares (valores, umbral y top)
+    pares = extraer_pares(similitud_matrix, UMBRAL_SIMILITUD, top=10)
     
-    # 6. Visualizar gráficas
-    visualizar_similitudes(similitud_matrix, valores, df)
+    # 6. Mostrar estadísticas
+    mostrar_estadisticas(pares)
     
-    # 7. Mostrar top similares
-    mostrar_top_similares(df, similitud_matrix, top=10)
+    # 7. Visualizar gráficas
+    visualizar_similitudes(similitud_matrix, pares)
     
-    # 8. Encontrar y guardar textos similares
-    resultados_df = encontrar_textos_similares(df, similitud_matrix, UMBRAL_SIMILITUD)
+    # 8. Mostrar top similares
+    mostrar_top_similares(df, pares['top'])
+    
+    # 9. Encontrar y guardar textos similares
+    resultados_df = encontrar_textos_similares(df, pares, UMBRAL_SIMILITUD)
     
     if len(resultados_df) > 0:
         print(f"✅ Se encontraron {len(resultados_df)} pares de textos similares")
@@ -259,7 +490,7 @@ def main():
     else:
         print(f"⚠️  No se encontraron textos con similitud >= {UMBRAL_SIMILITUD}")
     
-    # 9. Opción: Guardar matriz completa
+    # 10. Opción: Guardar matriz completa
     print("\n💡 Guardando matriz de similitud completa...")
     matriz_df = pd.DataFrame(
         similitud_matrix,
@@ -271,5 +502,38 @@ def main():
     
     print("\n🎉 ¡Análisis completado!")
 
+def analisis_disperso(df, textos):
+    """
+    Mismo análisis que main pero sin la matriz N×N: top-k vecinos y pares
+    sobre el umbral por bloques. La matriz completa en CSV ocuparía ~200 MB
+    con 5000 textos; aquí se guardan solo los vecinos en formato disperso.
+    """
+    # 4. Vectorizar y calcular vecinos / pares por bloques
+    tfidf_matrix, vectorizer = vectorizar_textos(textos)
+    top_k = max(TOP_K, TOP_PARES, 10)  # Los top pares salen de los vecinos
+    vecinos, pares, resumen = calcular_similitud_dispersa(tfidf_matrix, top_k=top_k)
+    
+    # 5. Estadísticas y gráficas desde el resumen acumulado
+    mostrar_estadisticas_dispersas(resumen)
+    visualizar_similitudes_dispersas(tfidf_matrix, resumen, vecinos, top_k)
+    
+    # 6. Top similares
+    mostrar_top_similares(df, top_pares_dispersos(vecinos, TOP_PARES, top_k))
+    
+    # 7. Guardar los pares sobre el umbral
+    resultados_df = encontrar_textos_similares(df, pares, UMBRAL_SIMILITUD)
+    if len(resultados_df) > 0:
+        print(f"✅ Se encontraron {len(resultados_df)} pares de textos similares")
+        resultados_df.to_csv(OUTPUT_FILE, index=False, encoding='utf-8')
+        print(f"💾 Resultados guardados en: {OUTPUT_FILE}")
+    else:
+        print(f"⚠️  No se encontraron textos con similitud >= {UMBRAL_SIMILITUD}")
+    
+    # 8. Guardar los vecinos (sparse.load_npz para leerlos)
+    sparse.save_npz(VECINOS_FILE, vecinos)
+    print(f"💾 Top {top_k} vecinos por texto guardados en: {VECINOS_FILE}")
+    
+    print("\n🎉 ¡Análisis completado!")
+
 if __name__ == "__main__":
     main()
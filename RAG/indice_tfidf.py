@@ -0,0 +1,229 @@
+"""
+Índice TF-IDF persistente para recuperar documentos del corpus del RAG.
+
+Se construye una sola vez (vectorizador + matriz de documentos) y se guarda
+en un directorio con archivos .npy que se abren con memoria mapeada, así que
+cada pregunta solo lee las listas de los términos que contiene y no se
+vuelve a ajustar TfidfVectorizer.
+
+Contenido del directorio del índice:
+- config.json: parámetros del vectorizador, cantidad de documentos y fuentes
+- vocabulario.json: término -> columna
+- idf.npy: peso idf de cada término
+- inicio_termino.npy, documentos.npy, pesos.npy: la matriz TF-IDF por
+  columnas (para cada término, los documentos donde aparece y su peso)
+- textos.bin, inicio_texto.npy, fuente.npy: el texto de cada documento
+  (UTF-8 concatenado) y el archivo de donde salió
+
+Uso:
+    python RAG/indice_tfidf.py                  # construye si hace falta y pregunta en bucle
+    python RAG/indice_tfidf.py "algoritmos y autonomía"
+"""
+
+import json
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+
+# --- CONFIGURACIÓN ---
+# Los dataset_limpio*.csv no van: cada uno de sus textos ya está en un
+# registro de estos corpus (con fecha, usuario, tema y sentimiento), y
+# sumarlos duplicaría los documentos. Un .csv se puede agregar igual.
+ARCHIVOS_CORPUS = [
+    'RAG//limpieza//corpus_narrativo_tweets.txt',
+    'RAG//limpieza//corpus_narrativo_tweets_sinteticos.txt',
+]
+DIRECTORIO_INDICE = 'RAG//indice_tfidf'  # Donde se guarda el índice
+TEXT_COLUMN = 'texto'  # Columna indexada cuando el archivo es un CSV
+TOP_K = 5  # Documentos devueltos por pregunta
+
+# Parámetros del vectorizador (se guardan con el índice)
+PARAMETROS_TFIDF = {
+    'ngram_range': [1, 2],
+    'min_df': 1,
+    'strip_accents': 'unicode',  # 'autonomia' encuentra 'autonomía'
+    'lowercase': True,
+}
+
+def cargar_documentos(archivos):
+    """
+    Lee los archivos del corpus y devuelve (documentos, fuentes):
+    - .txt: cada registro que empieza con '## ' es un documento
+    - .csv: cada fila es un documento (columna TEXT_COLUMN)
+    """
+    documentos = []
+    fuentes = []
+    for archivo in archivos:
+        if archivo.endswith('.csv'):
+            df = pd.read_csv(archivo, encoding='utf-8')
+            registros = df[TEXT_COLUMN].dropna().astype(str).tolist()
+        else:
+            with open(archivo, encoding='utf-8') as f:
+                contenido = f.read()
+            # El texto antes del primer registro es la cabecera del archivo
+            registros = re.split(r'^(?=## )', contenido, flags=re.MULTILINE)[1:]
+            registros = [r.strip().removesuffix('---').strip() for r in registros]
+        documentos += registros
+        fuentes += [archivo] * len(registros)
+    return documentos, fuentes
+
+def construir_indice(documentos, fuentes, directorio=DIRECTORIO_INDICE, archivos=()):
+    """
+    Ajusta TF-IDF sobre los documentos y guarda el índice en `directorio`.
+    `archivos` son los archivos leídos, que quedan entre las fuentes aunque
+    no aporten documentos (para que indice_desactualizado los reconozca).
+    """
+    print(f"🔄 Vectorizando {len(documentos)} documentos con TF-IDF...")
+    parametros = dict(PARAMETROS_TFIDF, ngram_range=tuple(PARAMETROS_TFIDF['ngram_range']))
+    vectorizer = TfidfVectorizer(dtype=np.float32, **parametros)
+    matriz = vectorizer.fit_transform(documentos).tocsc()
+    matriz.sort_indices()
+
+    os.makedirs(directorio, exist_ok=True)
+    ruta = lambda nombre: os.path.join(directorio, nombre)
+
+    # Matriz por columnas: una lista de documentos por término
+    np.save(ruta('inicio_termino.npy'), matriz.indptr.astype(np.int64))
+    np.save(ruta('documentos.npy'), matriz.indices.astype(np.int32))
+    np.save(ruta('pesos.npy'), matriz.data.astype(np.float32))
+    np.save(ruta('idf.npy'), vectorizer.idf_.astype(np.float32))
+
+    # Textos concatenados con sus posiciones de inicio
+    codificados = [d.encode('utf-8') for d in documentos]
+    with open(ruta('textos.bin'), 'wb') as f:
+        f.write(b''.join(codificados))
+    np.save(ruta('inicio_texto.npy'), np.concatenate(([0], np.cumsum([len(c) for c in codificados]))).astype(np.int64))
+    lista_fuentes = sorted(set(fuentes) | set(archivos))
+    np.save(ruta('fuente.npy'), np.array([lista_fuentes.index(f) for f in fuentes], dtype=np.int32))
+
+    vocabulario = {termino: int(columna) for termino, columna in vectorizer.vocabulary_.items()}
+    with open(ruta('vocabulario.json'), 'w', encoding='utf-8') as f:
+        json.dump(vocabulario, f, ensure_ascii=False)
+    with open(ruta('config.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'parametros': PARAMETROS_TFIDF,
+            'documentos': len(documentos),
+            'terminos': len(vocabulario),
+            'fuentes': lista_fuentes,
+        }, f, ensure_ascii=False, indent=2)
+
+    print(f"💾 Índice guardado en: {directorio} ({len(vocabulario)} términos)")
+
+def cargar_indice(directorio=DIRECTORIO_INDICE):
+    """Abre un índice guardado; los arreglos quedan mapeados en memoria, sin leerlos"""
+    ruta = lambda nombre: os.path.join(directorio, nombre)
+    with open(ruta('config.json'), encoding='utf-8') as f:
+        config = json.load(f)
+    with open(ruta('vocabulario.json'), encoding='utf-8') as f:
+        vocabulario = json.load(f)
+
+    parametros = dict(config['parametros'], ngram_range=tuple(config['parametros']['ngram_range']))
+    parametros.pop('min_df', None)  # Con vocabulario fijo no se filtra
+    return {
+        'config': config,
+        # Con vocabulario fijo CountVectorizer no necesita fit: cuenta los
+        # términos de la pregunta y el idf se aplica aparte
+        'contador': CountVectorizer(vocabulary=vocabulario, dtype=np.float32, **parametros),
+        'idf': np.load(ruta('idf.npy'), mmap_mode='r'),
+        'inicio_termino': np.load(ruta('inicio_termino.npy'), mmap_mode='r'),
+        'documentos': np.load(ruta('documentos.npy'), mmap_mode='r'),
+        'pesos': np.load(ruta('pesos.npy'), mmap_mode='r'),
+        'textos': np.memmap(ruta('textos.bin'), dtype=np.uint8, mode='r')
+                  if os.path.getsize(ruta('textos.bin')) else np.zeros(0, dtype=np.uint8),
+        'inicio_texto': np.load(ruta('inicio_texto.npy'), mmap_mode='r'),
+        'fuente': np.load(ruta('fuente.npy'), mmap_mode='r'),
+    }
+
+def texto_documento(indice, doc):
+    """Texto original del documento `doc`"""
+    inicio, fin = indice['inicio_texto'][doc], indice['inicio_texto'][doc + 1]
+    return bytes(indice['textos'][inicio:fin]).decode('utf-8')
+
+def buscar(indice, consulta, top_k=TOP_K):
+    """
+    Devuelve los top_k documentos más similares (coseno TF-IDF) a la consulta,
+    como lista de dicts (documento, similitud, fuente, texto), de mayor a menor.
+    Solo se leen las listas de los términos de la consulta que están en el índice.
+    """
+    conteo = indice['contador'].transform([consulta])
+    terminos = conteo.indices
+    if len(terminos) == 0:
+        return []
+
+    # Vector TF-IDF de la consulta, normalizado L2 igual que los documentos
+    pesos_consulta = conteo.data * indice['idf'][terminos]
+    pesos_consulta /= np.linalg.norm(pesos_consulta)
+
+    inicio_termino = indice['inicio_termino']
+    docs, aportes = [], []
+    for termino, peso in zip(terminos, pesos_consulta):
+        inicio, fin = inicio_termino[termino], inicio_termino[termino + 1]
+        docs.append(indice['documentos'][inicio:fin])
+        aportes.append(indice['pesos'][inicio:fin] * peso)
+    puntajes = np.bincount(np.concatenate(docs), weights=np.concatenate(aportes),
+                           minlength=indice['config']['documentos'])
+
+    candidatos = np.flatnonzero(puntajes)
+    if len(candidatos) > top_k:
+        candidatos = candidatos[np.argpartition(-puntajes[candidatos], top_k - 1)[:top_k]]
+    candidatos = candidatos[np.argsort(-puntajes[candidatos], kind='stable')]
+
+    fuentes = indice['config']['fuentes']
+    return [{
+        'documento': int(doc),
+        'similitud': float(puntajes[doc]),
+        'fuente': fuentes[indice['fuente'][doc]],
+        'texto': texto_documento(indice, doc),
+    } for doc in candidatos]
+
+def indice_desactualizado(archivos, directorio=DIRECTORIO_INDICE, parametros=PARAMETROS_TFIDF):
+    """
+    True si no hay índice, si se construyó con otros archivos o con otros
+    parámetros del vectorizador, o si algún archivo del corpus es más nuevo
+    """
+    ruta_config = os.path.join(directorio, 'config.json')
+    if not os.path.exists(ruta_config):
+        return True
+    with open(ruta_config, encoding='utf-8') as f:
+        config = json.load(f)
+    # Pasar por JSON deja los parámetros como quedaron guardados (tuplas -> listas)
+    if config.get('parametros') != json.loads(json.dumps(parametros)):
+        return True
+    if config.get('fuentes') != sorted(set(archivos)):
+        return True
+    return any(os.path.getmtime(a) > os.path.getmtime(ruta_config) for a in archivos)
+
+def mostrar_resultados(resultados):
+    if not resultados:
+        print("⚠️  Ningún término de la pregunta está en el índice")
+        return
+    for idx, r in enumerate(resultados, 1):
+        print(f"\n{idx}. Similitud: {r['similitud']:.4f} ({os.path.basename(r['fuente'])}, doc {r['documento']})")
+        print(f"   {r['texto'][:300]}")
+    print()
+
+def main():
+    print("🚀 ÍNDICE TF-IDF DEL CORPUS\n")
+
+    if indice_desactualizado(ARCHIVOS_CORPUS):
+        documentos, fuentes = cargar_documentos(ARCHIVOS_CORPUS)
+        construir_indice(documentos, fuentes, archivos=ARCHIVOS_CORPUS)
+    indice = cargar_indice()
+    print(f"✅ Índice cargado: {indice['config']['documentos']} documentos\n")
+
+    if len(sys.argv) > 1:
+        mostrar_resultados(buscar(indice, ' '.join(sys.argv[1:])))
+        return
+
+    while True:
+        consulta = input("❓ Pregunta (vacío para salir): ").strip()
+        if not consulta:
+            break
+        mostrar_resultados(buscar(indice, consulta))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,31 @@
 """
 Script para eliminar filas duplicadas del dataset
 Opciones: duplicados exactos, duplicados de texto, duplicados normalizados
+y casi duplicados (MinHash + LSH)
+
+Para archivos más grandes que la memoria está eliminar_duplicados_streaming,
+que lee por bloques y solo guarda hashes de 64 bits de las claves.
 """
 
+import zlib
+from dataclasses import dataclass, field
+
+import numpy as np
 import pandas as pd
 import re
 
 
+# Parámetros del modo "similar" (casi duplicados)
+UMBRAL_JACCARD = 0.8      # Similitud de Jaccard mínima entre conjuntos de shingles
+NUM_PERMUTACIONES = 128   # Largo de la firma MinHash
+TAM_SHINGLE = 3           # Palabras por shingle
+PRIMO_MINHASH = (1 << 31) - 1  # Las permutaciones son (a*x + b) mod este primo
+VALORES_MINHASH = 200_000  # Hashes (shingles x permutaciones) que se calculan por vez
+
+# Filas por bloque en el modo streaming
+FILAS_POR_BLOQUE = 200_000
+
+
 def normalizar_para_comparacion(texto: str) -> str:
     """
     Normaliza texto para comparación de duplicados
@@ -21,29 +40,273 @@ def normalizar_para_comparacion(texto: str) -> str:
     return texto.strip()
 
 
-def eliminar_duplicados(archivo_entrada: str,
+def normalizar_serie(textos: pd.Series) -> pd.Series:
+    """
+    normalizar_para_comparacion sobre toda una columna con operaciones
+    vectorizadas de pandas (los valores que no son texto quedan en "")
+    """
+    es_texto = textos.map(type).eq(str)
+    return (textos.where(es_texto, "").astype(str)
+            .str.lower()
+            .str.replace(r'[^\w\s]', ' ', regex=True)
+            .str.replace(r'\s+', ' ', regex=True)
+            .str.strip())
+
+
+def shingles(texto: str, tam: int = TAM_SHINGLE, normalizado: bool = False) -> set:
+    """
+    Conjunto de secuencias de `tam` palabras del texto normalizado, como
+    enteros de 32 bits (crc32). Un texto más corto que `tam` es un solo shingle.
+    Con normalizado=True el texto ya viene normalizado.
+    """
+    palabras = (texto if normalizado else normalizar_para_comparacion(texto)).split()
+    if len(palabras) <= tam:
+        return {zlib.crc32(' '.join(palabras).encode('utf-8'))}
+    return {zlib.crc32(' '.join(palabras[i:i + tam]).encode('utf-8'))
+            for i in range(len(palabras) - tam + 1)}
+
+
+def firmas_minhash(textos, num_permutaciones: int = NUM_PERMUTACIONES,
+                   tam_shingle: int = TAM_SHINGLE, semilla: int = 1,
+                   normalizados: bool = False) -> np.ndarray:
+    """
+    Firma MinHash de cada texto: para cada una de las permutaciones
+    (a*x + b) mod PRIMO_MINHASH, el mínimo sobre sus shingles. La fracción
+    de posiciones iguales entre dos firmas estima su similitud de Jaccard.
+
+    Returns:
+        Arreglo (len(textos), num_permutaciones) de uint64
+    """
+    generador = np.random.default_rng(semilla)
+    a = generador.integers(1, PRIMO_MINHASH, num_permutaciones, dtype=np.uint64)
+    b = generador.integers(0, PRIMO_MINHASH, num_permutaciones, dtype=np.uint64)
+
+    if not normalizados:
+        textos = normalizar_serie(pd.Series(list(textos), dtype=object))
+    conjuntos = [np.fromiter(shingles(t, tam_shingle, normalizado=True), dtype=np.uint64) % PRIMO_MINHASH
+                 for t in textos]
+    firmas = np.full((len(conjuntos), num_permutaciones), PRIMO_MINHASH, dtype=np.uint64)
+    if not conjuntos:
+        return firmas
+
+    # Por tramos de shingles (no de textos, que pueden ser muy largos): los
+    # del tramo contra todas las permutaciones y el mínimo por texto con
+    # reduceat (cada texto tiene al menos un shingle). Un texto partido entre
+    # dos tramos se completa con el mínimo de ambos
+    valores = np.concatenate(conjuntos)
+    fines = np.cumsum([len(c) for c in conjuntos])  # Fin (exclusivo) de los shingles de cada texto
+    del conjuntos
+    tramo = max(1, VALORES_MINHASH // max(1, num_permutaciones))
+    for inicio in range(0, len(valores), tramo):
+        fin = min(inicio + tramo, len(valores))
+        primero = np.searchsorted(fines, inicio, side='right')
+        ultimo = np.searchsorted(fines, fin - 1, side='right')
+        cortes = np.concatenate(([inicio], fines[primero:ultimo])) - inicio
+        hashes = (valores[inicio:fin, None] * a + b) % PRIMO_MINHASH
+        destino = firmas[primero:ultimo + 1]
+        np.minimum(destino, np.minimum.reduceat(hashes, cortes, axis=0), out=destino)
+    return firmas
+
+
+def parametros_lsh(umbral: float, num_permutaciones: int = NUM_PERMUTACIONES):
+    """
+    Elige (bandas, filas por banda) con bandas * filas <= num_permutaciones
+    para que el punto de corte (1/bandas)^(1/filas) quede lo más cerca del
+    umbral sin pasarlo: así se pierden pocos pares, y los candidatos de más
+    se descartan al comparar las firmas.
+    """
+    mejor = (1, num_permutaciones)
+    mejor_distancia = float('inf')
+    for filas in range(1, num_permutaciones + 1):
+        bandas = num_permutaciones // filas
+        corte = (1 / bandas) ** (1 / filas)
+        if corte <= umbral and umbral - corte < mejor_distancia:
+            mejor, mejor_distancia = (bandas, filas), umbral - corte
+    return mejor
+
+
+def agrupar_similares(textos, umbral: float = UMBRAL_JACCARD,
+                      num_permutaciones: int = NUM_PERMUTACIONES,
+                      tam_shingle: int = TAM_SHINGLE,
+                      normalizados: bool = False,
+                      estadisticas: dict = None) -> np.ndarray:
+    """
+    Agrupa textos casi duplicados (Jaccard estimada >= umbral) en tiempo
+    aproximadamente lineal con MinHash + LSH por bandas.
+
+    Cada banda de la firma se usa como clave de un diccionario; solo los
+    textos que comparten alguna banda se comparan, y se unen si la
+    similitud estimada con la firma completa llega al umbral. Los grupos
+    son las componentes conexas de esas uniones.
+
+    Args:
+        normalizados: True si los textos ya pasaron por normalizar_serie
+        estadisticas: Diccionario opcional donde se deja 'comparaciones', la
+            cantidad de pares de firmas completas que se compararon
+
+    Returns:
+        Arreglo con el número de grupo de cada texto (el índice de su
+        primer texto), de modo que textos del mismo grupo tienen el mismo valor
+    """
+    firmas = firmas_minhash(textos, num_permutaciones, tam_shingle, normalizados=normalizados)
+    n = len(firmas)
+    padre = list(range(n))
+
+    def raiz(i):
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    def unir(i, j):
+        ri, rj = raiz(i), raiz(j)
+        if ri != rj:
+            padre[max(ri, rj)] = min(ri, rj)
+
+    # Firmas idénticas se unen directamente y se compara solo una de ellas:
+    # los duplicados exactos no llenan las cubetas de LSH
+    representantes = {}
+    for i in range(n):
+        j = representantes.setdefault(firmas[i].tobytes(), i)
+        if j != i:
+            unir(j, i)
+    unicos = np.fromiter(representantes.values(), dtype=np.int64)
+
+    bandas, filas = parametros_lsh(umbral, num_permutaciones)
+    comparaciones = 0
+    for banda in range(bandas):
+        cubetas = {}
+        for i in unicos:
+            cubetas.setdefault(firmas[i, banda * filas:(banda + 1) * filas].tobytes(), []).append(i)
+        for miembros in cubetas.values():
+            if len(miembros) < 2:
+                continue
+            # Cada texto se compara con los líderes de la cubeta (los que no
+            # se parecían a ningún líder anterior), no con todos los miembros,
+            # y se salta si ya está en el grupo de todos ellos. Solo un líder
+            # nuevo se compara con los miembros anteriores, así que una cubeta
+            # llena de paráfrasis de un mismo texto cuesta lineal
+            lideres = []
+            for posicion, i in enumerate(miembros):
+                ri = raiz(i)
+                if lideres and all(raiz(r) == ri for r in lideres):
+                    continue
+                similitud = (firmas[lideres] == firmas[i]).mean(axis=1)
+                comparaciones += len(lideres)
+                cercanos = [lideres[r] for r in np.flatnonzero(similitud >= umbral)]
+                if not cercanos:
+                    lideres.append(i)
+                    anteriores = miembros[:posicion]
+                    comparaciones += len(anteriores)
+                    similitud = (firmas[anteriores] == firmas[i]).mean(axis=1)
+                    cercanos = [anteriores[r] for r in np.flatnonzero(similitud >= umbral)]
+                for j in cercanos:
+                    unir(j, i)
+
+    if estadisticas is not None:
+        estadisticas['comparaciones'] = comparaciones
+    return np.array([raiz(i) for i in range(n)], dtype=np.int64)
+
+
+@dataclass
+class DatosDuplicados:
+    """
+    Dataset cargado una sola vez con sus claves de duplicado, compartido por
+    el análisis, los ejemplos y la eliminación.
+
+    Cada modo tiene una clave por fila (misma clave = duplicados):
+        - "exacto": número de grupo de la fila completa
+        - "texto": el texto tal cual
+        - "normalizado": el texto normalizado
+        - "similar": el grupo de casi duplicados (se calcula al pedirlo)
+    """
+    df: pd.DataFrame
+    columna_texto: str
+    claves: dict = field(default_factory=dict)
+    _repetidos: dict = field(default_factory=dict, repr=False)
+
+    def clave(self, modo: str, umbral_jaccard: float = UMBRAL_JACCARD) -> pd.Series:
+        if modo == "exacto":
+            return self.claves["exacto"]
+        if modo not in ("texto", "normalizado", "similar"):
+            raise ValueError(f"Modo '{modo}' no válido. Usa: 'exacto', 'texto', 'normalizado' o 'similar'")
+        if self.columna_texto not in self.df.columns:
+            raise ValueError(f"La columna '{self.columna_texto}' no existe en el dataset")
+        if modo != "similar":
+            return self.claves[modo]
+
+        nombre = f"similar_{umbral_jaccard}"
+        if nombre not in self.claves:
+            grupos = agrupar_similares(self.claves["normalizado"].tolist(), umbral_jaccard, normalizados=True)
+            self.claves[nombre] = pd.Series(grupos, index=self.df.index)
+        return self.claves[nombre]
+
+    def repetidos(self, modo: str) -> pd.Series:
+        """Máscara de las filas cuya clave aparece más de una vez"""
+        if modo not in self._repetidos:
+            self._repetidos[modo] = self.clave(modo).duplicated(keep=False)
+        return self._repetidos[modo]
+
+
+def cargar_datos(archivo_entrada: str, columna_texto: str = "texto") -> DatosDuplicados:
+    """
+    Lee el CSV una vez y calcula las claves exacta, de texto y normalizada
+
+    Args:
+        archivo_entrada: Ruta al archivo CSV de entrada
+        columna_texto: Nombre de la columna con el texto
+
+    Returns:
+        DatosDuplicados para pasar a analisis_completo,
+        mostrar_ejemplos_duplicados y eliminar_duplicados
+    """
+    print(f"📂 Cargando datos desde: {archivo_entrada}")
+    df = pd.read_csv(archivo_entrada)
+
+    claves = {
+        # Grupo de la fila completa (dropna=False: NaN cuenta como un valor más)
+        "exacto": df.groupby(list(df.columns), dropna=False, sort=False).ngroup()
+                  if len(df.columns) else pd.Series(0, index=df.index),
+    }
+    if columna_texto in df.columns:
+        claves["texto"] = df[columna_texto]
+        claves["normalizado"] = normalizar_serie(df[columna_texto])
+    return DatosDuplicados(df, columna_texto, claves)
+
+
+def _como_datos(datos, columna_texto: str) -> DatosDuplicados:
+    """Acepta un DatosDuplicados o la ruta del CSV (que se carga)"""
+    if isinstance(datos, DatosDuplicados):
+        return datos
+    return cargar_datos(datos, columna_texto)
+
+
+def eliminar_duplicados(datos,
                        archivo_salida: str = "dataset_sin_duplicados.csv",
                        modo: str = "texto",
                        columna_texto: str = "texto",
-                       mantener: str = "first") -> pd.DataFrame:
+                       mantener: str = "first",
+                       umbral_jaccard: float = UMBRAL_JACCARD) -> pd.DataFrame:
     """
     Elimina filas duplicadas del dataset
     
     Args:
-        archivo_entrada: Ruta al archivo CSV de entrada
+        datos: DatosDuplicados de cargar_datos, o la ruta al archivo CSV de entrada
         archivo_salida: Ruta al archivo CSV de salida
         modo: Modo de detección de duplicados:
             - "exacto": Duplicados en todas las columnas
             - "texto": Duplicados en la columna de texto (case-sensitive)
             - "normalizado": Duplicados de texto normalizado (case-insensitive)
-        columna_texto: Nombre de la columna con el texto
+            - "similar": Casi duplicados (Jaccard de shingles >= umbral_jaccard)
+        columna_texto: Nombre de la columna con el texto (si datos es una ruta)
         mantener: 'first' (mantener primera ocurrencia) o 'last' (mantener última)
+        umbral_jaccard: Similitud mínima para el modo "similar" (0.0 a 1.0)
         
     Returns:
         DataFrame sin duplicados
     """
-    print(f"📂 Cargando datos desde: {archivo_entrada}")
-    df = pd.read_csv(archivo_entrada)
+    datos = _como_datos(datos, columna_texto)
+    df = datos.df
     
     total_inicial = len(df)
     print(f"📊 Total de registros inicial: {total_inicial}")
@@ -51,30 +314,19 @@ def eliminar_duplicados(archivo_entrada: str,
     # Identificar duplicados según el modo
     if modo == "exacto":
         print("\n🔍 Buscando duplicados exactos (todas las columnas)...")
-        df_limpio = df.drop_duplicates(keep=mantener)
-        
     elif modo == "texto":
-        print(f"\n🔍 Buscando duplicados en columna '{columna_texto}' (exactos)...")
-        if columna_texto not in df.columns:
-            raise ValueError(f"La columna '{columna_texto}' no existe en el dataset")
-        df_limpio = df.drop_duplicates(subset=[columna_texto], keep=mantener)
-        
+        print(f"\n🔍 Buscando duplicados en columna '{datos.columna_texto}' (exactos)...")
     elif modo == "normalizado":
         print(f"\n🔍 Buscando duplicados de texto normalizado...")
-        if columna_texto not in df.columns:
-            raise ValueError(f"La columna '{columna_texto}' no existe en el dataset")
-        
-        # Crear columna temporal con texto normalizado
-        df['_texto_normalizado_temp'] = df[columna_texto].apply(normalizar_para_comparacion)
-        
-        # Eliminar duplicados basados en texto normalizado
-        df_limpio = df.drop_duplicates(subset=['_texto_normalizado_temp'], keep=mantener)
-        
-        # Eliminar columna temporal
-        df_limpio = df_limpio.drop(columns=['_texto_normalizado_temp'])
-        
-    else:
-        raise ValueError(f"Modo '{modo}' no válido. Usa: 'exacto', 'texto' o 'normalizado'")
+    elif modo == "similar":
+        print(f"\n🔍 Buscando casi duplicados (MinHash + LSH, Jaccard >= {umbral_jaccard})...")
+    
+    clave = datos.clave(modo, umbral_jaccard)
+    if modo == "similar":
+        print(f"  🧩 Grupos de textos casi iguales: {clave.nunique()}")
+    
+    # Una fila por clave, elegida igual que drop_duplicates
+    df_limpio = df[~clave.duplicated(keep=mantener)]
     
     total_final = len(df_limpio)
     duplicados_eliminados = total_inicial - total_final
@@ -96,28 +348,29 @@ def eliminar_duplicados(archivo_entrada: str,
     return df_limpio
 
 
-def mostrar_ejemplos_duplicados(archivo_entrada: str, 
+def mostrar_ejemplos_duplicados(datos,
                                 columna_texto: str = "texto",
                                 n: int = 5):
     """
     Muestra ejemplos de textos duplicados encontrados
     
     Args:
-        archivo_entrada: Ruta al archivo CSV
-        columna_texto: Nombre de la columna con el texto
+        datos: DatosDuplicados de cargar_datos, o la ruta al archivo CSV
+        columna_texto: Nombre de la columna con el texto (si datos es una ruta)
         n: Número de ejemplos a mostrar
     """
-    print(f"\n📋 Analizando duplicados en: {archivo_entrada}\n")
+    datos = _como_datos(datos, columna_texto)
+    df = datos.df
+    columna_texto = datos.columna_texto
+    print(f"\n📋 Analizando duplicados en la columna '{columna_texto}'\n")
     print("=" * 100)
     
-    df = pd.read_csv(archivo_entrada)
-    
     if columna_texto not in df.columns:
         print(f"❌ La columna '{columna_texto}' no existe")
         return
     
     # Encontrar duplicados exactos
-    duplicados_exactos = df[df.duplicated(subset=[columna_texto], keep=False)]
+    duplicados_exactos = df[datos.repetidos("texto")]
     
     if len(duplicados_exactos) == 0:
         print("✅ No se encontraron duplicados exactos")
@@ -137,42 +390,227 @@ def mostrar_ejemplos_duplicados(archivo_entrada: str,
             print(f"IDs: {list(grupo['id'].values) if 'id' in grupo.columns else 'N/A'}")
             print("-" * 100)
     
-    # Encontrar duplicados normalizados
-    df['_texto_norm'] = df[columna_texto].apply(normalizar_para_comparacion)
-    duplicados_norm = df[df.duplicated(subset=['_texto_norm'], keep=False)]
-    duplicados_solo_norm = duplicados_norm[~duplicados_norm.duplicated(subset=[columna_texto], keep=False)]
+    # Duplicados normalizados que no son duplicados exactos de texto
+    duplicados_solo_norm = datos.repetidos("normalizado") & ~datos.repetidos("texto")
     
-    if len(duplicados_solo_norm) > 0:
-        print(f"\n🔍 Duplicados normalizados (diferentes en mayúsculas/puntuación): {len(duplicados_solo_norm)} filas")
+    if duplicados_solo_norm.any():
+        print(f"\n🔍 Duplicados normalizados (diferentes en mayúsculas/puntuación): {duplicados_solo_norm.sum()} filas")
 
 
-def analisis_completo(archivo_entrada: str, columna_texto: str = "texto"):
+def analisis_completo(datos, columna_texto: str = "texto"):
     """
     Realiza un análisis completo de duplicados en el dataset
+
+    Args:
+        datos: DatosDuplicados de cargar_datos, o la ruta al archivo CSV
+        columna_texto: Nombre de la columna con el texto (si datos es una ruta)
     """
+    datos = _como_datos(datos, columna_texto)
     print("\n" + "="*100)
     print("📊 ANÁLISIS COMPLETO DE DUPLICADOS")
     print("="*100)
     
-    df = pd.read_csv(archivo_entrada)
-    total = len(df)
+    total = len(datos.df)
     
     # Duplicados exactos (todas las columnas)
-    dup_exactos = df.duplicated(keep=False).sum()
+    dup_exactos = datos.repetidos("exacto").sum()
     print(f"\n1️⃣ Duplicados exactos (todas las columnas): {dup_exactos} ({dup_exactos/total*100:.2f}%)")
     
     # Duplicados de texto
-    dup_texto = df.duplicated(subset=[columna_texto], keep=False).sum()
-    print(f"2️⃣ Duplicados de texto (columna '{columna_texto}'): {dup_texto} ({dup_texto/total*100:.2f}%)")
+    dup_texto = datos.repetidos("texto").sum()
+    print(f"2️⃣ Duplicados de texto (columna '{datos.columna_texto}'): {dup_texto} ({dup_texto/total*100:.2f}%)")
     
     # Duplicados normalizados
-    df['_texto_norm'] = df[columna_texto].apply(normalizar_para_comparacion)
-    dup_norm = df.duplicated(subset=['_texto_norm'], keep=False).sum()
+    dup_norm = datos.repetidos("normalizado").sum()
     print(f"3️⃣ Duplicados normalizados (case-insensitive): {dup_norm} ({dup_norm/total*100:.2f}%)")
     
     print("\n" + "="*100)
 
 
+class ConjuntoHashes:
+    """
+    Conjunto de hashes uint64 en arreglos ordenados (8 bytes por hash, en
+    lugar de los ~70 de un set de Python). Los hashes nuevos se agregan como
+    un arreglo más y los arreglos se fusionan cuando el último crece hasta
+    el tamaño del anterior, así que nunca hay más de log2(n) arreglos.
+    """
+
+    def __init__(self):
+        self.arreglos = []
+
+    def __len__(self):
+        return sum(len(a) for a in self.arreglos)
+
+    def contiene(self, hashes: np.ndarray) -> np.ndarray:
+        encontrados = np.zeros(len(hashes), dtype=bool)
+        for arreglo in self.arreglos:
+            posiciones = np.minimum(np.searchsorted(arreglo, hashes), len(arreglo) - 1)
+            encontrados |= arreglo[posiciones] == hashes
+        return encontrados
+
+    def agregar(self, hashes: np.ndarray):
+        """Agrega hashes que todavía no están (y sin repetir)"""
+        if len(hashes) == 0:
+            return
+        self.arreglos.append(np.sort(hashes))
+        while len(self.arreglos) > 1 and len(self.arreglos[-2]) <= 2 * len(self.arreglos[-1]):
+            ultimo = self.arreglos.pop()
+            self.arreglos[-1] = np.sort(np.concatenate((self.arreglos[-1], ultimo)), kind='stable')
+
+
+def hashes_bloque(bloque: pd.DataFrame, modo: str, columna_texto: str) -> np.ndarray:
+    """Hash de 64 bits de la clave de duplicado de cada fila del bloque"""
+    if modo == "exacto":
+        return pd.util.hash_pandas_object(bloque, index=False).to_numpy()
+    if columna_texto not in bloque.columns:
+        raise ValueError(f"La columna '{columna_texto}' no existe en el dataset")
+    if modo == "texto":
+        return pd.util.hash_pandas_object(bloque[columna_texto], index=False).to_numpy()
+    if modo == "normalizado":
+        return pd.util.hash_pandas_object(normalizar_serie(bloque[columna_texto]), index=False).to_numpy()
+    raise ValueError(f"Modo '{modo}' no válido en streaming. Usa: 'exacto', 'texto' o 'normalizado'")
+
+
+def _leer_bloques(archivo_entrada: str, filas_por_bloque: int):
+    # Todo como texto: las claves no dependen de los tipos que pandas
+    # deduzca en cada bloque, y las filas se escriben tal como se leyeron
+    return pd.read_csv(archivo_entrada, chunksize=filas_por_bloque, dtype=str,
+                       keep_default_na=False, na_filter=False)
+
+
+def _compactar(hashes: np.ndarray, ultimas: np.ndarray, veces: np.ndarray):
+    """
+    Un registro por hash (última fila, suma de apariciones), ordenado por
+    hash. Las filas deben venir en el orden del archivo.
+    """
+    orden = np.argsort(hashes, kind='stable')  # Estable: la última de cada hash queda al final
+    hashes, ultimas, veces = hashes[orden], ultimas[orden], veces[orden]
+    inicios = np.flatnonzero(np.r_[True, hashes[1:] != hashes[:-1]])
+    finales = np.r_[inicios[1:], len(hashes)] - 1
+    return hashes[finales], ultimas[finales], np.add.reduceat(veces, inicios)
+
+
+def _fusionar(anterior, siguiente):
+    """Fusiona dos tramos compactados; `siguiente` tiene las filas posteriores"""
+    return _compactar(*(np.concatenate((a, b)) for a, b in zip(anterior, siguiente)))
+
+
+def _ultimas_apariciones(archivo_entrada: str, modo: str, columna_texto: str,
+                         filas_por_bloque: int):
+    """
+    Primera pasada para mantener='last' o False: para cada hash distinto,
+    la última fila donde aparece y cuántas veces aparece. Devuelve tres
+    arreglos ordenados por hash (24 bytes por hash distinto).
+
+    Cada bloque se compacta solo y los tramos se fusionan como en
+    ConjuntoHashes (cuando el último crece hasta el tamaño del anterior),
+    así que cada hash se reordena O(log n) veces y no una vez por bloque.
+    """
+    tramos = []
+    fila = 0
+    for bloque in _leer_bloques(archivo_entrada, filas_por_bloque):
+        h = hashes_bloque(bloque, modo, columna_texto)
+        if len(h) == 0:
+            continue  # Archivo con solo el encabezado: reduceat no acepta vacíos
+        tramos.append(_compactar(h, np.arange(fila, fila + len(h)), np.ones(len(h), dtype=np.int64)))
+        fila += len(h)
+        while len(tramos) > 1 and len(tramos[-2][0]) <= 2 * len(tramos[-1][0]):
+            ultimo = tramos.pop()
+            tramos[-1] = _fusionar(tramos[-1], ultimo)
+    if not tramos:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    while len(tramos) > 1:
+        ultimo = tramos.pop()
+        tramos[-1] = _fusionar(tramos[-1], ultimo)
+    return tramos[0]
+
+
+def eliminar_duplicados_streaming(archivo_entrada: str,
+                                  archivo_salida: str = "dataset_sin_duplicados.csv",
+                                  modo: str = "normalizado",
+                                  columna_texto: str = "texto",
+                                  mantener: str = "first",
+                                  filas_por_bloque: int = FILAS_POR_BLOQUE) -> dict:
+    """
+    Elimina duplicados de un CSV que no entra en memoria
+
+    Lee el archivo de a `filas_por_bloque` filas, calcula un hash de 64 bits
+    de la clave de cada fila y escribe las filas que quedan a medida que
+    avanza. La memoria pico depende de la cantidad de claves distintas
+    (8 bytes por hash; 24 con 'last' / False, más los temporales de ordenar
+    al fusionar) y no del largo de los textos.
+
+    - mantener='first': una sola pasada, con el conjunto de hashes ya vistos
+    - mantener='last' o False: dos pasadas; la primera registra la última
+      fila y la cantidad de apariciones de cada hash, la segunda escribe
+
+    Los campos se comparan tal como están escritos en el CSV, y dos claves
+    distintas con el mismo hash (probabilidad ~n²/2⁶⁵) se tomarían como
+    duplicadas. El modo "similar" no está disponible en streaming.
+
+    Args:
+        archivo_entrada: Ruta al archivo CSV de entrada
+        archivo_salida: Ruta al archivo CSV de salida
+        modo: "exacto", "texto" o "normalizado" (ver eliminar_duplicados)
+        columna_texto: Nombre de la columna con el texto
+        mantener: 'first', 'last' o False (no mantener ninguna de las repetidas)
+        filas_por_bloque: Filas leídas por vez
+
+    Returns:
+        Diccionario con 'originales', 'unicos' y 'eliminados'
+    """
+    print(f"📂 Procesando por bloques de {filas_por_bloque} filas: {archivo_entrada}")
+    if mantener not in ("first", "last", False):
+        raise ValueError("mantener debe ser 'first', 'last' o False")
+
+    if mantener != "first":
+        print("🔄 Primera pasada: última aparición de cada clave...")
+        hashes, ultimas, veces = _ultimas_apariciones(archivo_entrada, modo, columna_texto, filas_por_bloque)
+        print(f"  🔑 Claves distintas: {len(hashes)}")
+    else:
+        vistos = ConjuntoHashes()
+
+    originales = unicos = 0
+    primer_bloque = True
+    for bloque in _leer_bloques(archivo_entrada, filas_por_bloque):
+        h = hashes_bloque(bloque, modo, columna_texto)
+        filas = np.arange(originales, originales + len(h))
+
+        if mantener == "first":
+            # Primera aparición dentro del bloque y no vista en bloques anteriores
+            _, primeras = np.unique(h, return_index=True)
+            quedan = np.zeros(len(h), dtype=bool)
+            quedan[primeras] = True
+            quedan &= ~vistos.contiene(h)
+            vistos.agregar(h[quedan])
+        else:
+            posiciones = np.searchsorted(hashes, h)
+            quedan = ultimas[posiciones] == filas
+            if mantener is False:
+                quedan &= veces[posiciones] == 1
+
+        bloque[quedan].to_csv(archivo_salida, mode='w' if primer_bloque else 'a',
+                              header=primer_bloque, index=False, encoding='utf-8')
+        primer_bloque = False
+        originales += len(h)
+        unicos += int(quedan.sum())
+
+    if primer_bloque:
+        # Archivo vacío: solo el encabezado
+        pd.read_csv(archivo_entrada, nrows=0).to_csv(archivo_salida, index=False, encoding='utf-8')
+
+    eliminados = originales - unicos
+    porcentaje = (eliminados / originales * 100) if originales > 0 else 0
+    print("\n📈 Resultados:")
+    print(f"  ✅ Registros originales:     {originales}")
+    print(f"  ❌ Duplicados eliminados:    {eliminados}")
+    print(f"  ✅ Registros únicos:         {unicos}")
+    print(f"  📊 Porcentaje eliminado:     {porcentaje:.2f}%")
+    print(f"💾 Dataset limpio guardado en: {archivo_salida}")
+
+    return {'originales': originales, 'unicos': unicos, 'eliminados': eliminados}
+
+
 if __name__ == "__main__":
     # Configuración
     ARCHIVO_ENTRADA = "RAG//dataset_sintetico_5000_ampliado.csv"
@@ -182,34 +620,48 @@ if __name__ == "__main__":
     # "exacto"      - Elimina filas 100% idénticas en todas las columnas
     # "texto"       - Elimina filas con texto idéntico (case-sensitive)
     # "normalizado" - Elimina filas con texto similar (ignora mayúsculas/puntuación)
+    # "similar"     - Elimina casi duplicados (paráfrasis, oraciones reordenadas)
     MODO = "normalizado"
     
+    # Similitud de Jaccard mínima para el modo "similar"
+    UMBRAL = UMBRAL_JACCARD
+    
     # Columna que contiene el texto
     COLUMNA_TEXTO = "texto"
     
     # Qué ocurrencia mantener: "first" (primera) o "last" (última)
     MANTENER = "first"
     
+    # True para archivos que no entran en memoria: procesa por bloques y
+    # solo elimina (sin análisis ni ejemplos, y sin el modo "similar")
+    STREAMING = False
+    
     try:
-        # Análisis completo de duplicados
-        analisis_completo(ARCHIVO_ENTRADA, COLUMNA_TEXTO)
-        
-        # Mostrar ejemplos de duplicados
-        mostrar_ejemplos_duplicados(ARCHIVO_ENTRADA, COLUMNA_TEXTO, n=3)
-        
-        # Eliminar duplicados
-        print("\n" + "="*100)
-        print("🧹 ELIMINANDO DUPLICADOS")
-        print("="*100)
-        
-        df_limpio = eliminar_duplicados(
-            archivo_entrada=ARCHIVO_ENTRADA,
-            archivo_salida=ARCHIVO_SALIDA,
-            modo=MODO,
-            columna_texto=COLUMNA_TEXTO,
-            mantener=MANTENER
-        )
-        
+        if STREAMING:
+            eliminar_duplicados_streaming(ARCHIVO_ENTRADA, ARCHIVO_SALIDA, MODO, COLUMNA_TEXTO, MANTENER)
+        else:
+            # Cargar una vez: las claves de duplicado se comparten entre los pasos
+            datos = cargar_datos(ARCHIVO_ENTRADA, COLUMNA_TEXTO)
+            
+            # Análisis completo de duplicados
+            analisis_completo(datos)
+            
+            # Mostrar ejemplos de duplicados
+            mostrar_ejemplos_duplicados(datos, n=3)
+            
+            # Eliminar duplicados
+            print("\n" + "="*100)
+            print("🧹 ELIMINANDO DUPLICADOS")
+            print("="*100)
+            
+            df_limpio = eliminar_duplicados(
+                datos,
+                archivo_salida=ARCHIVO_SALIDA,
+                modo=MODO,
+                mantener=MANTENER,
+                umbral_jaccard=UMBRAL
+            )
+            
         print("\n✨ ¡Proceso completado exitosamente!")
         
     except FileNotFoundError:
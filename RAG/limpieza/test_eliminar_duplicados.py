@@ -0,0 +1,200 @@
+import importlib.util
+import os
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# El nombre del script tiene paréntesis: se carga desde la ruta
+_spec = importlib.util.spec_from_file_location(
+    'eliminar_duplicados', os.path.join(DIRECTORIO, 'eliminar_duplicados(1).py'))
+dd = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(dd)
+
+
+def escribir_csv(ruta, filas):
+    pd.DataFrame(filas, columns=['id', 'texto', 'tema']).to_csv(ruta, index=False)
+    return str(ruta)
+
+
+def filas_con_duplicados(cantidad=60, semilla=0):
+    """Filas con copias exactas, variantes de mayúsculas/puntuación y textos vacíos"""
+    generador = random.Random(semilla)
+    bases = ["Hola mundo", "el gato duerme", "Otro texto más", "", "fin del día"]
+    filas = []
+    for i in range(cantidad):
+        texto = generador.choice(bases)
+        if texto and generador.random() < 0.3:
+            texto = texto.upper() + "!"
+        filas.append((generador.randrange(4), texto, generador.choice(["a", "b"])))
+    return filas
+
+
+def referencia(df, modo, mantener):
+    """Lo que hacía el script antes de compartir las claves: drop_duplicates directo"""
+    if modo == "exacto":
+        return df.drop_duplicates(keep=mantener)
+    if modo == "texto":
+        return df.drop_duplicates(subset=['texto'], keep=mantener)
+    normalizado = df['texto'].apply(dd.normalizar_para_comparacion)
+    return df[~normalizado.duplicated(keep=mantener)]
+
+
+def test_normalizar_serie_igual_que_por_texto():
+    textos = pd.Series(["Hola,  MUNDO!", "  ¿Qué   tal?  ", "ÁRBOL_ñandú", "", None, np.nan, 42,
+                        "tab\ty\nsalto", "¡¡¡", "ya normalizado"], dtype=object)
+    esperado = [dd.normalizar_para_comparacion(t) for t in textos]
+    assert dd.normalizar_serie(textos).tolist() == esperado
+
+
+@pytest.mark.parametrize('modo', ['exacto', 'texto', 'normalizado'])
+@pytest.mark.parametrize('mantener', ['first', 'last', False])
+def test_en_memoria_igual_que_drop_duplicates(tmp_path, modo, mantener):
+    # Textos vacíos: pandas los lee como NaN, que también se comparan
+    entrada = escribir_csv(tmp_path / 'entrada.csv', filas_con_duplicados(80, semilla=1))
+    datos = dd.cargar_datos(entrada)
+    esperado = referencia(pd.read_csv(entrada), modo, mantener)
+    obtenido = dd.eliminar_duplicados(datos, None, modo=modo, mantener=mantener)
+    pd.testing.assert_frame_equal(obtenido, esperado)
+    # Los datos compartidos dan lo mismo que cargar el archivo de nuevo
+    pd.testing.assert_frame_equal(dd.eliminar_duplicados(entrada, None, modo=modo, mantener=mantener), esperado)
+
+
+def test_repetidos_igual_que_duplicated():
+    # El dataset sintético repite casi todos los textos con otros campos
+    entrada = os.path.join(DIRECTORIO, '..', 'dataset_sintetico_5000_ampliado.csv')
+    datos = dd.cargar_datos(entrada)
+    df = pd.read_csv(entrada)
+    esperados = {
+        'exacto': df.duplicated(keep=False),
+        'texto': df.duplicated(subset=['texto'], keep=False),
+        'normalizado': df['texto'].apply(dd.normalizar_para_comparacion).duplicated(keep=False),
+    }
+    for modo, esperado in esperados.items():
+        pd.testing.assert_series_equal(datos.repetidos(modo), esperado, check_names=False)
+
+
+def particion(grupos):
+    """Grupos como conjunto de tuplas de índices, sin depender de la etiqueta"""
+    miembros = {}
+    for i, g in enumerate(grupos):
+        miembros.setdefault(g, []).append(i)
+    return {tuple(m) for m in miembros.values()}
+
+
+def pares_similares(textos, umbral):
+    """Referencia: todos los pares con firmas parecidas >= umbral, sin LSH"""
+    firmas = dd.firmas_minhash(textos)
+    for i in range(len(textos)):
+        similitud = (firmas[i + 1:] == firmas[i]).mean(axis=1)
+        for j in np.flatnonzero(similitud >= umbral) + i + 1:
+            yield i, j
+
+
+def parafrasis(cantidad, palabras=100, semilla=0):
+    """Una plantilla con una palabra distinta en cada texto"""
+    generador = random.Random(semilla)
+    plantilla = [f"palabra{k}" for k in range(palabras)]
+    textos = []
+    for i in range(cantidad):
+        texto = list(plantilla)
+        texto[generador.randrange(palabras)] = f"cambio{i}"
+        textos.append(' '.join(texto))
+    return textos
+
+
+def test_similares_contra_todos_los_pares():
+    datos = dd.cargar_datos(os.path.join(DIRECTORIO, 'dataset_limpio.csv'))
+    textos = datos.df['texto'].tolist()
+    grupos = dd.agrupar_similares(textos)
+    # Solo se unen pares que llegan al umbral: cada grupo es una unión de
+    # componentes de la referencia, y los pares bien por encima no se pierden
+    conexos = set(pares_similares(textos, dd.UMBRAL_JACCARD))
+    for miembros in particion(grupos):
+        for i in miembros[1:]:
+            assert any((min(i, k), max(i, k)) in conexos for k in miembros if k != i)
+    for i, j in pares_similares(textos, 0.9):
+        assert grupos[i] == grupos[j]
+
+
+def test_similares_con_duplicados_y_textos_distintos():
+    textos = ["el gato duerme en la casa toda la tarde"] * 3 + [
+        "El gato duerme en la casa, toda la tarde!",
+        "un texto que no tiene nada que ver con los otros",
+    ]
+    grupos = dd.agrupar_similares(textos)
+    assert list(grupos) == [0, 0, 0, 0, 4]
+
+
+@pytest.mark.parametrize('valores', [1, 300, 5000])
+def test_firmas_por_tramos_igual_que_de_una_vez(monkeypatch, valores):
+    # Un texto largo queda repartido entre varios tramos
+    textos = parafrasis(30, palabras=20) + [' '.join(f"larga{k}" for k in range(400)), "corto"]
+    esperado = dd.firmas_minhash(textos)
+    monkeypatch.setattr(dd, 'VALORES_MINHASH', valores)
+    np.testing.assert_array_equal(dd.firmas_minhash(textos), esperado)
+
+
+def test_similares_lineal_en_cubetas_de_parafrasis():
+    for cantidad in (500, 2000):
+        estadisticas = {}
+        grupos = dd.agrupar_similares(parafrasis(cantidad), estadisticas=estadisticas)
+        assert len(set(grupos)) == 1
+        # Comparar todos los pares de cada cubeta serían ~cantidad²/2 por banda
+        assert estadisticas['comparaciones'] < 2 * cantidad
+
+
+@pytest.mark.parametrize('modo', ['exacto', 'texto', 'normalizado'])
+@pytest.mark.parametrize('mantener', ['first', 'last', False])
+def test_streaming_igual_que_en_memoria(tmp_path, modo, mantener):
+    entrada = escribir_csv(tmp_path / 'entrada.csv', filas_con_duplicados())
+    en_memoria = dd.eliminar_duplicados(entrada, str(tmp_path / 'memoria.csv'), modo=modo, mantener=mantener)
+    # Bloques chicos: los duplicados quedan repartidos entre bloques
+    resumen = dd.eliminar_duplicados_streaming(entrada, str(tmp_path / 'bloques.csv'), modo=modo,
+                                               mantener=mantener, filas_por_bloque=7)
+    esperado = pd.read_csv(tmp_path / 'memoria.csv', dtype=str, keep_default_na=False)
+    obtenido = pd.read_csv(tmp_path / 'bloques.csv', dtype=str, keep_default_na=False)
+    pd.testing.assert_frame_equal(obtenido, esperado)
+    assert resumen['unicos'] == len(en_memoria)
+    assert resumen['originales'] == 60
+
+
+@pytest.mark.parametrize('mantener', ['first', 'last', False])
+def test_streaming_solo_encabezado(tmp_path, mantener):
+    entrada = tmp_path / 'vacio.csv'
+    entrada.write_text('id,texto,tema\n', encoding='utf-8')
+    salida = tmp_path / 'salida.csv'
+    resumen = dd.eliminar_duplicados_streaming(str(entrada), str(salida), mantener=mantener)
+    assert resumen == {'originales': 0, 'unicos': 0, 'eliminados': 0}
+    assert salida.read_text(encoding='utf-8') == 'id,texto,tema\n'
+
+
+@pytest.mark.parametrize('filas_por_bloque', [1, 3, 7, 100])
+def test_ultimas_apariciones(tmp_path, filas_por_bloque):
+    filas = filas_con_duplicados()
+    entrada = escribir_csv(tmp_path / 'entrada.csv', filas)
+    hashes, ultimas, veces = dd._ultimas_apariciones(entrada, 'texto', 'texto', filas_por_bloque)
+    todos = pd.util.hash_pandas_object(pd.Series([texto for _, texto, _ in filas]), index=False).to_numpy()
+    assert (hashes[1:] > hashes[:-1]).all()
+    esperado = {}
+    for fila, h in enumerate(todos.tolist()):
+        esperado[h] = (fila, esperado.get(h, (0, 0))[1] + 1)
+    assert dict(zip(hashes.tolist(), zip(ultimas.tolist(), veces.tolist()))) == esperado
+
+
+def test_conjunto_hashes():
+    conjunto = dd.ConjuntoHashes()
+    vistos = set()
+    generador = np.random.default_rng(0)
+    for _ in range(50):
+        hashes = generador.integers(0, 500, 20).astype(np.uint64)
+        esperado = np.array([h in vistos for h in hashes.tolist()])
+        np.testing.assert_array_equal(conjunto.contiene(hashes), esperado)
+        nuevos = np.unique(hashes[~esperado])
+        conjunto.agregar(nuevos)
+        vistos.update(nuevos.tolist())
+        assert len(conjunto) == len(vistos)
+    assert len(conjunto.arreglos) <= int(np.log2(len(vistos))) + 1
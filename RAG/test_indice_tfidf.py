@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+import indice_tfidf as it
+
+REGISTROS = [
+    "La autonomía de los algoritmos preocupa a la generación Z.",
+    "Los algoritmos deciden qué vemos en las redes.",
+    "El tiempo libre se volvió rendimiento y productividad.",
+    "Nadie habla de la autonomia frente a la productividad.",
+    "Redes, algoritmos y cansancio: una generación quemada.",
+]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    texto = tmp_path / 'corpus.txt'
+    texto.write_text('Cabecera del archivo\n\n' + ''.join(f'## {r}\n---\n' for r in REGISTROS[:3]),
+                     encoding='utf-8')
+    tabla = tmp_path / 'corpus.csv'
+    tabla.write_text('texto\n' + ''.join(f'"{r}"\n' for r in REGISTROS[3:]), encoding='utf-8')
+    return [str(texto), str(tabla)], str(tmp_path / 'indice')
+
+
+def test_cargar_documentos(corpus):
+    archivos, _ = corpus
+    documentos, fuentes = it.cargar_documentos(archivos)
+    assert [d.removeprefix('## ') for d in documentos] == REGISTROS
+    assert fuentes == [archivos[0]] * 3 + [archivos[1]] * 2
+
+
+@pytest.mark.parametrize('consulta', ['algoritmos y autonomía', 'productividad', 'redes generación', 'nada'])
+def test_buscar_igual_que_tfidf_vectorizer(corpus, consulta):
+    archivos, directorio = corpus
+    documentos, fuentes = it.cargar_documentos(archivos)
+    it.construir_indice(documentos, fuentes, directorio, archivos)
+    indice = it.cargar_indice(directorio)
+
+    parametros = dict(it.PARAMETROS_TFIDF, ngram_range=tuple(it.PARAMETROS_TFIDF['ngram_range']))
+    vectorizer = TfidfVectorizer(**parametros)
+    matriz = vectorizer.fit_transform(documentos)
+    similitudes = (matriz @ vectorizer.transform([consulta]).T).toarray().ravel()
+    esperados = [d for d in np.argsort(-similitudes, kind='stable') if similitudes[d] > 0][:3]
+
+    resultados = it.buscar(indice, consulta, top_k=3)
+    assert [r['documento'] for r in resultados] == [int(d) for d in esperados]
+    for r in resultados:
+        assert r['similitud'] == pytest.approx(similitudes[r['documento']], abs=1e-6)
+        assert r['texto'] == documentos[r['documento']]
+        assert r['fuente'] == fuentes[r['documento']]
+
+
+def test_indice_desactualizado(corpus, monkeypatch):
+    archivos, directorio = corpus
+    assert it.indice_desactualizado(archivos, directorio)
+    documentos, fuentes = it.cargar_documentos(archivos)
+    it.construir_indice(documentos, fuentes, directorio, archivos)
+    assert not it.indice_desactualizado(archivos, directorio)
+
+    # Otros archivos u otros parámetros del vectorizador
+    assert it.indice_desactualizado(archivos[:1], directorio)
+    otros = dict(it.PARAMETROS_TFIDF, ngram_range=[1, 1])
+    assert it.indice_desactualizado(archivos, directorio, parametros=otros)
+    monkeypatch.setitem(it.PARAMETROS_TFIDF, 'min_df', 2)
+    assert it.indice_desactualizado(archivos, directorio)
+    monkeypatch.undo()
+
+    # Un archivo editado después de construir
+    config = os.path.join(directorio, 'config.json')
+    os.utime(archivos[1], (os.path.getmtime(config) + 10,) * 2)
+    assert it.indice_desactualizado(archivos, directorio)
+
+
+def test_archivo_sin_documentos_no_lo_desactualiza(corpus, tmp_path):
+    archivos, directorio = corpus
+    vacio = tmp_path / 'vacio.txt'
+    vacio.write_text('Solo cabecera\n', encoding='utf-8')
+    archivos = archivos + [str(vacio)]
+    documentos, fuentes = it.cargar_documentos(archivos)
+    it.construir_indice(documentos, fuentes, directorio, archivos)
+    assert not it.indice_desactualizado(archivos, directorio)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+
+import Similitud_Coseno as sc
+
+
+def matriz_aleatoria(n, columnas=40, densidad=0.15, semilla=0):
+    """Filas dispersas normalizadas como las de TF-IDF, sin similitudes empatadas"""
+    X = sparse.random(n, columnas, density=densidad, format='csr', random_state=semilla)
+    # Ninguna fila vacía
+    X = X + sparse.csr_matrix((np.full(n, 0.01), (np.arange(n), np.arange(n) % columnas)), shape=X.shape)
+    return normalize(X)
+
+
+@pytest.mark.parametrize('filas_por_bloque', [1, 7, 512])
+def test_disperso_igual_que_la_matriz_completa(filas_por_bloque):
+    X = matriz_aleatoria(60)
+    densa = cosine_similarity(X)
+    n = densa.shape[0]
+    vecinos, pares, resumen = sc.calcular_similitud_dispersa(X, top_k=5, umbral=0.3,
+                                                             filas_por_bloque=filas_por_bloque)
+
+    i, j = np.nonzero(np.triu(densa >= 0.3, k=1))
+    np.testing.assert_array_equal(pares['indice_1'], i)
+    np.testing.assert_array_equal(pares['indice_2'], j)
+    np.testing.assert_allclose(pares['similitud'], densa[i, j])
+
+    # Cada fila guarda sus 5 vecinos más similares (sin sí misma)
+    vecinos = vecinos.toarray()
+    for fila in range(n):
+        otros = np.delete(np.arange(n), fila)
+        mejores = otros[np.argsort(-densa[fila, otros])[:5]]
+        mejores = mejores[densa[fila, mejores] > 0]
+        assert set(np.flatnonzero(vecinos[fila])) == set(mejores)
+        np.testing.assert_allclose(vecinos[fila, mejores], densa[fila, mejores])
+
+    valores = densa[np.triu_indices(n, k=1)]
+    assert resumen['pares'] == len(valores)
+    assert resumen['promedio'] == pytest.approx(valores.mean())
+    assert resumen['desviacion'] == pytest.approx(valores.std())
+    assert resumen['minimo'] == pytest.approx(valores.min())
+    assert resumen['maximo'] == pytest.approx(valores.max())
+    assert abs(resumen['mediana'] - np.median(valores)) <= 1 / sc.BINS_HISTOGRAMA
+
+
+def test_top_pares_dispersos_igual_que_denso():
+    X = matriz_aleatoria(50, semilla=1)
+    densa = cosine_similarity(X)
+    vecinos, _, _ = sc.calcular_similitud_dispersa(X, top_k=10, umbral=0.5, filas_por_bloque=16)
+    obtenidos = sc.top_pares_dispersos(vecinos, 10)
+    esperados = sorted(((i, j, densa[i, j]) for i, j in zip(*np.triu_indices(50, k=1))),
+                       key=lambda par: -par[2])[:10]
+    assert [(i, j) for i, j, _ in obtenidos] == [(i, j) for i, j, _ in esperados]
+    np.testing.assert_allclose([s for _, _, s in obtenidos], [s for _, _, s in esperados])
+    # Con menos vecinos por texto que pares pedidos el orden puede salir mal
+    vecinos, _, _ = sc.calcular_similitud_dispersa(X, top_k=3, umbral=0.5)
+    with pytest.raises(ValueError):
+        sc.top_pares_dispersos(vecinos, 10, top_k=3)
+
+
+def test_disperso_con_un_solo_texto():
+    vecinos, pares, resumen = sc.calcular_similitud_dispersa(matriz_aleatoria(1), top_k=5)
+    assert vecinos.shape == (1, 1) and vecinos.nnz == 0
+    assert len(pares) == 0
+    assert resumen['pares'] == 0
+
+
+def pares_con_bucles(similitud_matrix, umbral, top):
+    """Referencia: recorrer el triángulo superior par por par"""
+    n = similitud_matrix.shape[0]
+    todos = [(i, j, similitud_matrix[i, j]) for i in range(n) for j in range(i + 1, n)]
+    sobre_umbral = [par for par in todos if par[2] >= umbral]
+    mejores = sorted(todos, key=lambda par: -par[2])[:top]  # sorted es estable: empates en orden de filas
+    return todos, sobre_umbral, mejores
+
+
+@pytest.mark.parametrize('n', [2, 3, 17, 40])
+def test_extraer_pares_igual_que_bucles(n):
+    densa = cosine_similarity(matriz_aleatoria(n, semilla=n))
+    densa[0, n - 1] = densa[n - 1, 0] = densa[0, 1] = densa[1, 0] = 0.75  # Empates
+    todos, sobre_umbral, mejores = pares_con_bucles(densa, 0.3, 10)
+    pares = sc.extraer_pares(densa, umbral=0.3, top=10)
+    np.testing.assert_array_equal(pares['valores'], [s for _, _, s in todos])
+    assert list(zip(pares['indice_1'].tolist(), pares['indice_2'].tolist(), pares['similitud'].tolist())) \
+        == sobre_umbral
+    assert pares['top'] == mejores
+
+
+def test_extraer_pares_con_un_solo_texto():
+    pares = sc.extraer_pares(np.ones((1, 1)), umbral=0.3, top=10)
+    assert len(pares['valores']) == 0 and len(pares['indice_1']) == 0
+    assert pares['top'] == []